@@ -5,10 +5,33 @@ multiple policies on the same resource type.
 """
 import pickle  # nosec nosemgrep
 
+import base64
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta
+import hashlib
+import json
 import os
 import logging
 import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
 
 log = logging.getLogger('custodian.cache')
 
@@ -32,13 +55,164 @@ def factory(config):
             log.debug("Using in-memory cache")
             CACHE_NOTIFY = True
         return InMemoryCache(config)
+    elif getattr(config, 'cache_store', None) == 'resource':
+        return SqlResourceCache(config)
     return SqlKvCache(config)
 
 
+def _json_default(o):
+    if isinstance(o, datetime):
+        return {'__c7n_datetime__': o.isoformat()}
+    elif isinstance(o, bytes):
+        return {'__c7n_bytes__': base64.b64encode(o).decode('ascii')}
+    raise TypeError("Object of type %s is not JSON serializable" % type(o).__name__)
+
+
+def _json_object_hook(d):
+    if len(d) == 1:
+        if '__c7n_datetime__' in d:
+            return datetime.fromisoformat(d['__c7n_datetime__'])
+        elif '__c7n_bytes__' in d:
+            return base64.b64decode(d['__c7n_bytes__'])
+    return d
+
+
+def _json_dumps(value):
+    return json.dumps(value, default=_json_default, separators=(',', ':')).encode('utf8')
+
+
+def _json_loads(data):
+    return json.loads(data, object_hook=_json_object_hook)
+
+
+MSGPACK_DATETIME = 1
+
+
+def _msgpack_default(o):
+    if isinstance(o, datetime):
+        return msgpack.ExtType(MSGPACK_DATETIME, o.isoformat().encode('ascii'))
+    raise TypeError("Object of type %s is not msgpack serializable" % type(o).__name__)
+
+
+def _msgpack_ext_hook(code, data):
+    if code == MSGPACK_DATETIME:
+        return datetime.fromisoformat(data.decode('ascii'))
+    return msgpack.ExtType(code, data)
+
+
+def _msgpack_dumps(value):
+    return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+
+
+def _msgpack_loads(data):
+    return msgpack.unpackb(
+        data, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+
+
+def _pickle_dumps(value):
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)  # nosemgrep
+
+
+def _pickle_loads(data):
+    return pickle.loads(data)  # nosec nosemgrep
+
+
+class Codec:
+    """Serialization of cache values, with optional compression.
+
+    Codecs are named as format[+compression], ie. pickle, json+zlib,
+    or msgpack+zstd. Formats are pickle, json and msgpack, compressions
+    are zlib, zstd and lz4. msgpack, zstd and lz4 require their
+    respective (optional) libraries to be installed.
+    """
+
+    formats = {
+        'pickle': (lambda: True, _pickle_dumps, _pickle_loads),
+        'json': (lambda: True, _json_dumps, _json_loads),
+        'msgpack': (lambda: msgpack is not None, _msgpack_dumps, _msgpack_loads),
+    }
+
+    compressions = {
+        'zlib': (
+            lambda: True,
+            lambda data: zlib.compress(data, 3),
+            zlib.decompress),
+        'zstd': (
+            lambda: zstandard is not None,
+            lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data)),
+        'lz4': (
+            lambda: lz4 is not None,
+            lambda data: lz4.compress(data),
+            lambda data: lz4.decompress(data)),
+    }
+
+    def __init__(self, name):
+        self.name = name
+        fmt, _, compression = name.partition('+')
+        if fmt not in self.formats or (compression and compression not in self.compressions):
+            raise ValueError("Invalid cache codec %s" % name)
+        available, self._dumps, self._loads = self.formats[fmt]
+        if not available():
+            raise ValueError("Cache codec %s requires %s to be installed" % (name, fmt))
+        self._compress = self._decompress = None
+        if compression:
+            available, self._compress, self._decompress = self.compressions[compression]
+            if not available():
+                raise ValueError(
+                    "Cache codec %s requires %s to be installed" % (name, compression))
+
+    def encode(self, value):
+        data = self._dumps(value)
+        if self._compress:
+            data = self._compress(data)
+        return data
+
+    def decode(self, data):
+        if self._decompress:
+            data = self._decompress(data)
+        return self._loads(data)
+
+    @classmethod
+    def available(cls):
+        """Return the names of codecs usable in this environment."""
+        names = []
+        for fmt, (fmt_available, _, _) in cls.formats.items():
+            if not fmt_available():
+                continue
+            names.append(fmt)
+            names.extend(
+                "%s+%s" % (fmt, c) for c, (c_available, _, _) in cls.compressions.items()
+                if c_available())
+        return names
+
+
+_codecs = {}
+
+
+def get_codec(name):
+    codec = _codecs.get(name)
+    if codec is None:
+        codec = _codecs[name] = Codec(name)
+    return codec
+
+
+def key_hash(key):
+    """Return a stable hash of a cache key.
+
+    Unlike a pickled key, this is independent of the python version
+    and the value codec.
+    """
+    return hashlib.sha256(
+        json.dumps(key, sort_keys=True, default=str, separators=(',', ':')).encode('utf8')
+    ).hexdigest()
+
+
 class Cache:
 
     def __init__(self, config):
         self.config = config
+        self.stats = Counter()
 
     def load(self):
         return False
@@ -49,6 +223,29 @@ class Cache:
     def save(self, key, data):
         pass
 
+    def get_resources(self, key, ids, id_key):
+        """Get the cached resources of a resource set matching the given ids.
+
+        Returns None if the resource set is not cached.
+        """
+        resources = self.get(key)
+        if resources is None:
+            return None
+        id_set = set(ids)
+        return [r for r in resources if r[id_key] in id_set]
+
+    def save_resources(self, key, resources, id_key, partial=False):
+        """Save a resource set, with resources identified by id_key.
+
+        Partial refreshes of an extant set aren't supported, and return False.
+        """
+        if partial:
+            return False
+        self.save(key, resources)
+
+    def get_stats(self):
+        return dict(self.stats)
+
     def size(self):
         return 0
 
@@ -67,26 +264,96 @@ class NullCache(Cache):
     pass
 
 
+def approximate_size(value):
+    """Approximate the memory footprint in bytes of a value and its contents."""
+    seen = set()
+    stack = [value]
+    size = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return size
+
+
 class InMemoryCache(Cache):
+    """Process wide cache, bounded in size with least recently used eviction.
+
+    Entries are shared across all instances in the process, and expire
+    per entry after the configured cache period. The size budget in
+    bytes is set via the cache_max_size option.
+    """
     # Running in a temporary environment, so keep as a cache.
 
-    __shared_state = {}
+    max_size = 256 * 1024 * 1024
+
+    __shared_state = OrderedDict()
+    __shared_size = Counter()
+    __lock = threading.Lock()
 
     def __init__(self, config):
         super().__init__(config)
         self.data = self.__shared_state
+        # values are kept as is, unless a codec is explicitly configured.
+        codec = getattr(config, 'cache_codec', None)
+        self.codec = codec and get_codec(codec) or None
+        self.cache_period = getattr(config, 'cache_period', None)
+        self.max_size = getattr(config, 'cache_max_size', None) or self.max_size
 
     def load(self):
         return True
 
     def get(self, key):
-        return self.data.get(encode(key))
+        ekey = key_hash(key)
+        with self.__lock:
+            entry = self.data.get(ekey)
+            if entry is not None and self.cache_period and (
+                    time.time() - entry[2]) / 60.0 > self.cache_period:
+                self._remove(ekey)
+                entry = None
+            if entry is None:
+                self.stats['miss'] += 1
+                return None
+            self.data.move_to_end(ekey)
+        self.stats['hit'] += 1
+        value = entry[0]
+        if self.codec:
+            value = self.codec.decode(value)
+        return value
 
     def save(self, key, data):
-        self.data[encode(key)] = data
+        if self.codec:
+            data = self.codec.encode(data)
+            size = len(data)
+        else:
+            size = approximate_size(data)
+        ekey = key_hash(key)
+        with self.__lock:
+            if ekey in self.data:
+                self._remove(ekey)
+            if size > self.max_size:
+                log.debug("cache entry size:%d exceeds max size:%d", size, self.max_size)
+                return
+            while self.data and self.__shared_size['bytes'] + size > self.max_size:
+                self._remove(next(iter(self.data)))
+                self.stats['eviction'] += 1
+            self.data[ekey] = (data, size, time.time())
+            self.__shared_size['bytes'] += size
+
+    def _remove(self, ekey):
+        entry = self.data.pop(ekey)
+        self.__shared_size['bytes'] -= entry[1]
 
     def size(self):
-        return sum(map(len, self.data.values()))
+        """Approximate size in bytes of the cache contents."""
+        return self.__shared_size['bytes']
 
 
 def encode(key):
@@ -102,8 +369,9 @@ def resolve_path(path):
 class SqlKvCache(Cache):
 
     create_table = """
-    create table if not exists c7n_cache (
-        key blob primary key,
+    create table if not exists c7n_cache_v2 (
+        key text primary key,
+        codec text,
         value blob,
         create_date timestamp
     )
@@ -113,6 +381,7 @@ class SqlKvCache(Cache):
         super().__init__(config)
         self.cache_period = config.cache_period
         self.cache_path = resolve_path(config.cache)
+        self.codec = get_codec(getattr(config, 'cache_codec', None) or 'pickle')
         self.conn = None
 
     def init(self):
@@ -128,13 +397,36 @@ class SqlKvCache(Cache):
             os.makedirs(os.path.dirname(self.cache_path))
         self.conn = sqlite3.connect(self.cache_path)
         self.conn.execute(self.create_table)
+        self.migrate()
         with self.conn as cursor:
             result = cursor.execute(
-                'delete from c7n_cache where create_date < ?',
+                'delete from c7n_cache_v2 where create_date < ?',
                 [datetime.utcnow() - timedelta(minutes=self.cache_period)])
             if result.rowcount:
                 log.debug('expired %d stale cache entries', result.rowcount)
 
+    def migrate(self):
+        """Migrate entries from the pickled key cache table.
+
+        Values are carried over as is, and remain readable with the
+        pickle codec regardless of the configured codec.
+        """
+        with self.conn as cursor:
+            if not cursor.execute(
+                    "select name from sqlite_master where type = 'table' "
+                    "and name = 'c7n_cache'").fetchone():
+                return
+            rows = cursor.execute(
+                'select key, value, create_date from c7n_cache where create_date >= ?',
+                [datetime.utcnow() - timedelta(minutes=self.cache_period)]).fetchall()
+            for key, value, create_date in rows:
+                cursor.execute(
+                    'replace into c7n_cache_v2 (key, codec, value, create_date) '
+                    'values (?, ?, ?, ?)',
+                    (key_hash(_pickle_loads(key)), 'pickle', value, create_date))
+            cursor.execute('drop table c7n_cache')
+            log.debug('migrated %d cache entries', len(rows))
+
     def load(self):
         if not self.conn:
             self.init()
@@ -143,24 +435,28 @@ class SqlKvCache(Cache):
     def get(self, key):
         with self.conn as cursor:
             r = cursor.execute(
-                'select value, create_date from c7n_cache where key = ?',
-                [sqlite3.Binary(encode(key))]
+                'select codec, value, create_date from c7n_cache_v2 where key = ?',
+                [key_hash(key)]
             )
             row = r.fetchone()
-            if row is None:
+            if row is None or self.is_expired(row[2]):
+                self.stats['miss'] += 1
                 return None
-            value, create_date = row
-            create_date = sqlite3.converters['TIMESTAMP'](create_date.encode('utf8'))
-            if (datetime.utcnow() - create_date).total_seconds() / 60.0 > self.cache_period:
-                return None
-            return pickle.loads(value)  # nosec nosemgrep
+            self.stats['hit'] += 1
+            return get_codec(row[0]).decode(row[1])
+
+    def is_expired(self, create_date):
+        create_date = sqlite3.converters['TIMESTAMP'](create_date.encode('utf8'))
+        return (datetime.utcnow() - create_date).total_seconds() / 60.0 > self.cache_period
 
     def save(self, key, data, timestamp=None):
         with self.conn as cursor:
             timestamp = timestamp or datetime.utcnow()
             cursor.execute(
-                'replace into c7n_cache (key, value, create_date) values (?, ?, ?)',
-                (sqlite3.Binary(encode(key)), sqlite3.Binary(encode(data)), timestamp))
+                'replace into c7n_cache_v2 (key, codec, value, create_date) '
+                'values (?, ?, ?, ?)',
+                (key_hash(key), self.codec.name,
+                 sqlite3.Binary(self.codec.encode(data)), timestamp))
 
     def size(self):
         return os.path.exists(self.cache_path) and os.path.getsize(self.cache_path) or 0
@@ -169,3 +465,160 @@ class SqlKvCache(Cache):
         if self.conn:
             self.conn.close()
             self.conn = None
+
+
+class SqlResourceCache(SqlKvCache):
+    """Resource cache storing one row per resource.
+
+    Each cached resource set (ie. the result of a resource manager's
+    query) is recorded in a set table, with its resources stored as
+    individual rows keyed by the set's cache key and resource id. This
+    allows lookups of a few resources by id to only deserialize the
+    requested resources, and individual resources to be refreshed
+    without rewriting the whole set.
+    """
+
+    create_tables = (
+        """
+        create table if not exists c7n_resource_sets (
+            key text primary key,
+            id_key text,
+            create_date timestamp
+        )
+        """,
+        """
+        create table if not exists c7n_resources (
+            key text,
+            position integer,
+            account text,
+            region text,
+            resource_type text,
+            resource_id text,
+            codec text,
+            value blob,
+            create_date timestamp,
+            primary key (key, position)
+        )
+        """,
+        """
+        create index if not exists c7n_resources_id
+            on c7n_resources (key, resource_id)
+        """,
+        """
+        create index if not exists c7n_resources_type
+            on c7n_resources (account, region, resource_type, resource_id)
+        """,
+        """
+        create index if not exists c7n_resources_date
+            on c7n_resources (create_date)
+        """,
+    )
+
+    def init(self):
+        super().init()
+        for statement in self.create_tables:
+            self.conn.execute(statement)
+        with self.conn as cursor:
+            result = cursor.execute(
+                'delete from c7n_resource_sets where create_date < ?',
+                [datetime.utcnow() - timedelta(minutes=self.cache_period)])
+            if result.rowcount:
+                log.debug('expired %d stale cached resource sets', result.rowcount)
+            cursor.execute(
+                'delete from c7n_resources where key not in '
+                '(select key from c7n_resource_sets)')
+
+    def _get_set(self, cursor, key):
+        row = cursor.execute(
+            'select id_key, create_date from c7n_resource_sets where key = ?',
+            [key]).fetchone()
+        if row is None or self.is_expired(row[1]):
+            return None
+        return row
+
+    def get(self, key):
+        with self.conn as cursor:
+            ekey = key_hash(key)
+            if self._get_set(cursor, ekey) is None:
+                self.stats['miss'] += 1
+                return None
+            self.stats['hit'] += 1
+            rows = cursor.execute(
+                'select codec, value from c7n_resources where key = ? order by position',
+                [ekey])
+            return [get_codec(codec).decode(value) for codec, value in rows]
+
+    def get_resources(self, key, ids, id_key):
+        with self.conn as cursor:
+            ekey = key_hash(key)
+            rset = self._get_set(cursor, ekey)
+            if rset is None:
+                self.stats['miss'] += 1
+                return None
+            if rset[0] != id_key:
+                # set saved without resource ids, filter client side.
+                return super().get_resources(key, ids, id_key)
+            self.stats['hit'] += 1
+            results = []
+            # stay within sqlite's max bound parameters
+            ids = list(ids)
+            for idx in range(0, len(ids), 500):
+                batch = ids[idx:idx + 500]
+                rows = cursor.execute(
+                    'select codec, value from c7n_resources where key = ? '
+                    'and resource_id in (%s) order by position' % ', '.join('?' * len(batch)),
+                    [ekey, *batch])
+                results.extend(get_codec(codec).decode(value) for codec, value in rows)
+            self.stats['rows'] += len(results)
+            return results
+
+    def save(self, key, data, timestamp=None):
+        self.save_resources(key, data, None, timestamp)
+
+    def save_resources(self, key, resources, id_key, timestamp=None, partial=False):
+        """Save a resource set.
+
+        With partial, the given resources are refreshed in an extant
+        set, replacing the resources with the same id and appending
+        new ones, while leaving the rest of the set and its creation
+        time as is.
+        """
+        timestamp = timestamp or datetime.utcnow()
+        ekey = key_hash(key)
+        meta = isinstance(key, dict) and key or {}
+        with self.conn as cursor:
+            if partial:
+                rset = self._get_set(cursor, ekey)
+                if rset is None or id_key is None or rset[0] != id_key:
+                    return False
+                position = cursor.execute(
+                    'select coalesce(max(position), -1) from c7n_resources where key = ?',
+                    [ekey]).fetchone()[0]
+            else:
+                cursor.execute('delete from c7n_resources where key = ?', [ekey])
+                cursor.execute(
+                    'replace into c7n_resource_sets (key, id_key, create_date) '
+                    'values (?, ?, ?)', (ekey, id_key, timestamp))
+                position = -1
+
+            for r in resources:
+                rid = id_key and isinstance(r, dict) and r.get(id_key) or None
+                if partial:
+                    existing = cursor.execute(
+                        'select position from c7n_resources where key = ? and resource_id = ?',
+                        [ekey, rid]).fetchone()
+                    if existing is not None:
+                        cursor.execute(
+                            'update c7n_resources set codec = ?, value = ?, create_date = ? '
+                            'where key = ? and position = ?',
+                            (self.codec.name, sqlite3.Binary(self.codec.encode(r)),
+                             timestamp, ekey, existing[0]))
+                        continue
+                position += 1
+                cursor.execute(
+                    'insert into c7n_resources (key, position, account, region, resource_type, '
+                    'resource_id, codec, value, create_date) values (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (ekey, position, meta.get('account'), meta.get('region'),
+                     meta.get('resource'), rid, self.codec.name,
+                     sqlite3.Binary(self.codec.encode(r)), timestamp))
+        return True
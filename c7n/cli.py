@@ -10,6 +10,7 @@ import importlib
 import logging
 import os
 import pdb
+import re
 import sys
 import traceback
 from datetime import datetime
@@ -97,6 +98,17 @@ def _default_options(p, exclude=[]):
         p.add_argument(
             "--cache-period", default=15, type=int,
             help="Cache validity in minutes (default %(default)i)")
+        p.add_argument(
+            "--cache-store", default="kv", choices=["kv", "resource"],
+            help="Cache storage layout, resource stores a row per resource "
+            "(default %(default)s)")
+        p.add_argument(
+            "--cache-max-size", default=None, type=int,
+            help="Max size in bytes of the in memory cache (--cache memory)")
+        p.add_argument(
+            "--cache-codec", default="pickle",
+            help="Cache value serialization as format[+compression], formats are "
+            "pickle, json, msgpack and compressions zlib, zstd, lz4 (default %(default)s)")
     else:
         p.add_argument("--cache", default=None, help=argparse.SUPPRESS)
     if 'session-policy' not in exclude:
@@ -197,6 +209,16 @@ def _key_val_pair(value):
     return value
 
 
+def _augment_option(value):
+    """
+    Type checker to ensure that --augment values are of the format resource=workers[:chunk]
+    """
+    if not re.match(r'^[\w.-]+=[1-9]\d*(:[1-9]\d*)?$', value):
+        msg = 'values must be of the form `resource=workers[:chunk]`, with workers and chunk >= 1'
+        raise argparse.ArgumentTypeError(msg)
+    return value
+
+
 def setup_parser():
     c7n_desc = "Cloud Custodian - Cloud fleet management"
     parser = argparse.ArgumentParser(description=c7n_desc)
@@ -240,6 +262,33 @@ def setup_parser():
         "-m", "--metrics-enabled", metavar="PROVIDER",
         default=None, nargs="?", const="aws",
         help=metrics_help)
+    run.add_argument(
+        "--shared-enumeration", action="store_true", default=False,
+        help="Fetch resources once for policies sharing a resource type, "
+        "account, region, and query, and filter private copies per policy.")
+    run.add_argument(
+        "--stream", action="store_true", default=False,
+        help="Fetch, augment, and filter resources a page at a time up to the first "
+        "filter operating on the whole resource set.")
+    run.add_argument(
+        "--reference-store", default=None, metavar="PATH",
+        help="Persist resource references used by unused/used filters to this file, "
+        "and update them from CloudTrail for resources changed since the last run.")
+    run.add_argument(
+        "--reference-rescan", type=int, default=24, metavar="HOURS",
+        help="Hours between full scans of persisted references (default %(default)i)")
+    run.add_argument(
+        "--augment", action="append", default=[], type=_augment_option,
+        metavar="RESOURCE=WORKERS[:CHUNK]",
+        help="Fix the concurrency, and optionally chunk size, of a resource type's "
+        "detail calls, rather than adapting them to observed latency and throttling.")
+    run.add_argument(
+        "--parallel", type=int, default=0, metavar="N",
+        help="Execute pull mode policies concurrently on N workers.")
+    run.add_argument(
+        "--parallel-service-limit", type=int, default=2, metavar="N",
+        help="Max policies concurrently querying a service in a region "
+        "with --parallel (default %(default)i)")
     run.add_argument(
         "--trace",
         dest="tracer",
@@ -16,6 +16,7 @@ from yaml.constructor import ConstructorError
 
 from c7n import deprecated
 from c7n.exceptions import ClientError, PolicyValidationError
+from c7n.graph import ResourceGraph
 from c7n.loader import SourceLocator
 from c7n.provider import clouds
 from c7n.policy import Policy, PolicyCollection, load as policy_load
@@ -227,8 +228,7 @@ def validate(options):
             continue
 
         load_resources(structure.get_resource_types(data))
-        schm = schema.generate()
-        errors += schema.validate(data, schm)
+        errors += schema.validate(data)
         conf_policy_names = {
             p.get('name', 'unknown') for p in data.get('policies', ())}
         dupes = conf_policy_names.intersection(used_policy_names)
@@ -302,18 +302,41 @@ def run(options, policies: List[Policy]) -> None:
             log.exception("Unable to assume role %s", options.assume_role)
             sys.exit(1)
 
+    graph = ResourceGraph()
+    for p in policies:
+        p.ctx.graph = graph
+
+    if getattr(options, 'shared_enumeration', False):
+        from c7n.planner import EnumerationPlanner
+        EnumerationPlanner(policies).execute()
+
     errored_policies: List[str] = []
-    for policy in policies:
-        try:
-            policy()
-        except Exception:
+    if getattr(options, 'parallel', 0) > 1:
+        from c7n.scheduler import PolicyScheduler
+        scheduler = PolicyScheduler(
+            policies, options.parallel, options.parallel_service_limit)
+        for policy, f in scheduler.run(lambda p: p()):
+            if not f.exception():
+                continue
             exit_code = 2
             errored_policies.append(policy.name)
             if options.debug:
-                raise
-            log.exception(
+                raise f.exception()
+            log.error(
                 "Error while executing policy %s, continuing" % (
-                    policy.name))
+                    policy.name), exc_info=f.exception())
+    else:
+        for policy in policies:
+            try:
+                policy()
+            except Exception:
+                exit_code = 2
+                errored_policies.append(policy.name)
+                if options.debug:
+                    raise
+                log.exception(
+                    "Error while executing policy %s, continuing" % (
+                        policy.name))
     if exit_code != 0:
         log.error("The following policies had errors while executing\n - %s" % (
             "\n - ".join(errored_policies)))
@@ -6,11 +6,13 @@ Authentication utilities
 import threading
 import os
 
+from botocore.config import Config
 from botocore.credentials import RefreshableCredentials
 from botocore.session import get_session
 from boto3 import Session
 import json
 
+from c7n import ratelimit
 from c7n.version import version
 from c7n.utils import get_retry
 
@@ -20,6 +22,29 @@ from c7n.utils import get_retry
 USE_STS_REGIONAL = os.environ.get(
     'C7N_USE_STS_REGIONAL', '').lower() in ('yes', 'true')
 
+# keep idle pooled connections alive, rather than renegotiating tls
+TCP_KEEPALIVE = os.environ.get(
+    'C7N_TCP_KEEPALIVE', 'yes').lower() not in ('no', 'false')
+
+# botocore's default connection pool size per client
+POOL_SIZE = 10
+MAX_POOL_SIZE = 100
+
+
+def get_pool_size(max_workers=None):
+    return min(MAX_POOL_SIZE, max(POOL_SIZE, max_workers or 0))
+
+
+def get_client_config(max_workers=None):
+    """Client config with a connection pool sized for max_workers threads.
+
+    A client shared by more threads than its pool size discards and
+    reopens connections.
+    """
+    return Config(
+        max_pool_connections=get_pool_size(max_workers),
+        tcp_keepalive=TCP_KEEPALIVE)
+
 
 class CustodianSession(Session):
 
@@ -97,10 +122,17 @@ class SessionFactory:
 
     def update(self, session):
         session._session.user_agent_name = "c7n"
+        config = get_client_config()
+        if session._session.get_default_client_config():
+            config = config.merge(session._session.get_default_client_config())
+        session._session.set_default_client_config(config)
         session._session.user_agent_version = version
         if self._policy_name:
             session._session.user_agent_extra = f"c7n/policy#{self._policy_name}"
 
+        if ratelimit.RATE_LIMIT:
+            ratelimit.RATE_LIMITER.install(session)
+
         for s in self._subscribers:
             s(session)
 
@@ -5,6 +5,7 @@ import uuid
 import os
 
 
+from c7n.graph import ResourceGraph
 from c7n.output import (
     api_stats_outputs,
     blob_outputs,
@@ -21,6 +22,9 @@ from c7n.version import version
 class ExecutionContext:
     """Policy Execution Context."""
 
+    cache_metrics = (
+        ('hit', 'CacheHits'), ('miss', 'CacheMisses'), ('eviction', 'CacheEvictions'))
+
     def __init__(self, session_factory, policy, options):
         self.policy = policy
         self.options = options
@@ -35,6 +39,13 @@ class ExecutionContext:
         self.api_stats = None
         self.sys_stats = None
 
+        # Resource sets prefetched across policies, see c7n.planner
+        self.shared_resources = None
+
+        # Related resource sets and indexes, shared across a run's
+        # policies, see c7n.graph
+        self.graph = ResourceGraph()
+
         # A few tests patch on metrics flush
         # For backward compatibility, accept both 'metrics' and 'metrics_enabled' params (PR #4361)
         metrics = self.options.metrics or self.options.metrics_enabled
@@ -92,6 +103,10 @@ class ExecutionContext:
     def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
         if exc_type is not None and self.metrics:
             self.metrics.put_metric('PolicyException', 1, "Count")
+        cache_stats = self.get_cache_stats()
+        for stat, metric_name in self.cache_metrics:
+            if cache_stats.get(stat):
+                self.metrics.put_metric(metric_name, cache_stats[stat], "Count")
         self.output.write_file('metadata.json', dumps(self.get_metadata(), indent=2))
         self.api_stats.__exit__(exc_type, exc_value, exc_traceback)
 
@@ -112,7 +127,7 @@ class ExecutionContext:
         if os.environ.get('C7N_TEST_RUN'):
             reset_session_cache()
 
-    def get_metadata(self, include=('sys-stats', 'api-stats', 'metrics')):
+    def get_metadata(self, include=('sys-stats', 'api-stats', 'metrics', 'cache-stats')):
         t = time.time()
         md = {
             'policy': self.policy.data,
@@ -130,6 +145,22 @@ class ExecutionContext:
             md['sys-stats'] = self.sys_stats.get_metadata()
         if 'api-stats' in include and self.api_stats:
             md['api-stats'] = self.api_stats.get_metadata()
+            if getattr(self.api_stats, 'get_connection_stats', None):
+                md['connection-stats'] = self.api_stats.get_connection_stats()
+            if getattr(self.api_stats, 'get_operation_stats', None):
+                md['operation-stats'] = self.api_stats.get_operation_stats()
+            if getattr(self.api_stats, 'get_augment_stats', None):
+                md['augment-stats'] = self.api_stats.get_augment_stats()
+            if getattr(self.api_stats, 'get_rate_limit_stats', None):
+                md['rate-limits'] = self.api_stats.get_rate_limit_stats()
         if 'metrics' in include and self.metrics:
             md['metrics'] = self.metrics.get_metadata()
+        if 'cache-stats' in include and self.get_cache_stats():
+            md['cache-stats'] = self.get_cache_stats()
         return md
+
+    def get_cache_stats(self):
+        cache = getattr(getattr(self.policy, 'resource_manager', None), '_cache', None)
+        if cache is None:
+            return {}
+        return cache.get_stats()
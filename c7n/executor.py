@@ -1,10 +1,23 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
-from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor)  # noqa
+from concurrent import futures
+from concurrent.futures import ProcessPoolExecutor  # noqa
 
+import contextvars
 import threading
 
 
+class ThreadPoolExecutor(futures.ThreadPoolExecutor):
+    """Thread pool which runs functions in the context they were submitted from.
+
+    Context variables, such as the policy whose log records are being
+    captured, carry over to the worker threads.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
 class MainThreadExecutor:
     """ For running tests.
 
@@ -32,6 +32,11 @@ from c7n.utils import (
 )
 from c7n.manager import iter_filters
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class FilterValidationError(Exception):
     pass
@@ -235,6 +240,67 @@ class Filter(Element):
                 r.get(self.matched_annotation_key))
 
 
+def is_streamable(f):
+    """Determine if a filter can be applied to chunks of a resource set.
+
+    Filters evaluating each resource independently (ie. value, tag and
+    age filters) are streamable, filters operating on the whole set
+    (ie. reduce, resource_count, or most filters fetching related
+    resources) are not. Filter classes can declare `streamable`
+    explicitly, else it's inferred from the filter not overriding
+    per resource processing.
+    """
+    if isinstance(f, BooleanGroupFilter):
+        return all(is_streamable(gf) for gf in f.filters)
+    streamable = getattr(f, 'streamable', None)
+    if streamable is not None:
+        return streamable
+    if isinstance(f, ValueFilter):
+        return (type(f).process is ValueFilter.process and
+                f.data.get('value_type') != 'resource_count')
+    return type(f).process is Filter.process
+
+
+def get_pushdown(f, mapping):
+    """Translate a value filter into a server side api filter.
+
+    Returns a `{'Name': ..., 'Values': [...]}` api filter for a plain
+    value filter doing string equality or membership on a key present
+    in the mapping of resource keys to api filter names, or None. A
+    mapping key of `tag:` denotes support for tag filters.
+    """
+    if type(f) is not ValueFilter:
+        return None
+    data = f.data
+    if len(data) == 1:
+        [(key, value)], op = data.items(), 'eq'
+    else:
+        if set(data) - {'type', 'key', 'value', 'op'}:
+            return None
+        key, value, op = data.get('key'), data.get('value'), data.get('op', 'eq')
+    if not isinstance(key, str):
+        return None
+
+    if key.startswith('tag:') and 'tag:' in mapping:
+        name = key
+    else:
+        name = mapping.get(key)
+    if name is None:
+        return None
+
+    if op in ('eq', 'equal') and isinstance(value, str):
+        values = [value]
+    elif op == 'in' and isinstance(value, list) and value and all(
+            isinstance(v, str) for v in value):
+        values = list(value)
+    else:
+        return None
+    # sentinel values are evaluated client side.
+    if set(values) & {'absent', 'present', 'not-null', 'empty'}:
+        return None
+    return {'Name': name, 'Values': values}
+
+
 class BaseValueFilter(Filter):
     expr = None
 
@@ -349,6 +415,9 @@ class Or(BooleanGroupFilter):
 
     def process(self, resources, event=None):
         if self.manager:
+            match = resources and compile_filter(self)
+            if match:
+                return list(filter(match, resources))
             return self.process_set(resources, event)
         return super(Or, self).process(resources, event)
 
@@ -382,6 +451,9 @@ class And(BooleanGroupFilter):
 
     def process(self, resources, events=None):
         if self.manager:
+            match = resources and compile_filter(self)
+            if match:
+                return list(filter(match, resources))
             sweeper = AnnotationSweeper(self.get_resource_type_id(), resources)
 
         for f in self.filters:
@@ -399,6 +471,9 @@ class Not(BooleanGroupFilter):
 
     def process(self, resources, event=None):
         if self.manager:
+            match = resources and compile_filter(self)
+            if match:
+                return list(filter(match, resources))
             return self.process_set(resources, event)
         return super(Not, self).process(resources, event)
 
@@ -513,6 +588,8 @@ class ValueFilter(BaseValueFilter):
     schema_alias = True
     annotate = True
     required_keys = {'value', 'key'}
+    # minimum resource set size for vectorized evaluation, if numpy is available.
+    vector_min_size = 1000
 
     def _validate_resource_count(self):
         """ Specific validation for `resource_count` type
@@ -597,6 +674,17 @@ class ValueFilter(BaseValueFilter):
                 return resources
             return []
 
+        if (numpy is not None and isinstance(resources, list) and
+                len(resources) >= self.vector_min_size):
+            matched = self.process_vector(resources)
+            if matched is not None:
+                return matched
+
+        match = resources and self.is_compilable() and self.compile()
+        if match:
+            if self.annotate:
+                match = _annotate_match(match, self.k)
+            return list(filter(match, resources))
         return super(ValueFilter, self).process(resources, event)
 
     def get_resource_value(self, k, i):
@@ -628,7 +716,7 @@ class ValueFilter(BaseValueFilter):
         """
         return jmespath_search(self.data.get('value_path'), i)
 
-    def match(self, i):
+    def _init_value(self, i=None):
         if self.v is None and len(self.data) == 1:
             [(self.k, self.v)] = self.data.items()
         elif self.v is None and not hasattr(self, 'content_initialized'):
@@ -644,6 +732,9 @@ class ValueFilter(BaseValueFilter):
             self.content_initialized = True
             self.vtype = self.data.get('value_type')
 
+    def match(self, i):
+        self._init_value(i)
+
         if i is None:
             return False
 
@@ -751,6 +842,415 @@ class ValueFilter(BaseValueFilter):
 
         return sentinel, value
 
+    def is_compilable(self):
+        klass = type(self)
+        return (
+            all(getattr(klass, m) is getattr(ValueFilter, m) for m in (
+                '__call__', 'match', 'get_resource_value', 'process_value_type')) and
+            'value_path' not in self.data and
+            self.data.get('value_type') != 'resource_count')
+
+    def compile(self):
+        """Compile the filter to a function of a resource returning whether it matched.
+
+        The sentinel value, value type conversion, operator, and key
+        accessor are resolved once rather than per resource. Annotation
+        is left to the caller. Returns None for filters which customize
+        matching.
+        """
+        if not self.is_compilable():
+            return None
+        self._init_value()
+        get_value = self.compile_accessor(self.k)
+        if get_value is None:
+            return None
+        if self.op in ('in', 'not-in'):
+            get_value = _default_accessor(get_value, ())
+        sentinel, convert_value, convert = self.compile_value_type(self.v)
+        op = self.op and OPERATORS[self.op]
+
+        if convert is not None:
+            def match(i):
+                v, r = convert(get_value(i), i)
+                return _compare(op, r, v)
+            return match
+
+        if convert_value is not None:
+            get_value = _convert_accessor(get_value, convert_value)
+        if self.op in ('regex', 'regex-case') and isinstance(sentinel, str):
+            op = _regex_operator(sentinel, self.op == 'regex' and re.IGNORECASE or 0)
+        return _compile_comparison(get_value, op, sentinel)
+
+    def compile_vector(self):
+        """Compile the filter to a function evaluating a resource set as a column.
+
+        The returned function extracts the key's values for the whole
+        set into a numpy array and returns a boolean match mask, or None
+        if the values don't form a homogenous column comparable with the
+        sentinel. Returns None if the filter can't be vectorized, ie.
+        regex or list operators, value types other than numbers, sizes
+        and dates, or list operators without a list value.
+        """
+        if numpy is None or not self.is_compilable():
+            return None
+        self._init_value()
+        op = self.op or 'eq'
+        if op not in VECTOR_OPERATORS or self.vtype not in VECTOR_VALUE_TYPES:
+            return None
+        get_value = self.compile_accessor(self.k)
+        if get_value is None:
+            return None
+        sentinel, convert_value, _ = self.compile_value_type(self.v)
+        if _is_special_value(sentinel):
+            return None
+        # list operators only vectorize over list values, the others over
+        # scalars, e.g. in with a string value is a substring match.
+        if (op in VECTOR_LIST_OPERATORS) != isinstance(sentinel, (list, tuple)):
+            return None
+        compare = VECTOR_OPERATORS[op]
+        if self.vtype == 'age':
+            # age compares the threshold to the resource value.
+            if op not in REFLECTED_OPERATORS:
+                return None
+            compare = VECTOR_OPERATORS[REFLECTED_OPERATORS[op]]
+            convert_value = _parse_date_or_zero
+        if convert_value is not None:
+            get_value = _convert_accessor(get_value, convert_value)
+
+        def evaluate(resources):
+            column, value = _vector_column([get_value(r) for r in resources], sentinel)
+            if column is None:
+                return None
+            return compare(column, value)
+        return evaluate
+
+    def process_vector(self, resources):
+        evaluate = self.compile_vector()
+        mask = evaluate and evaluate(resources)
+        if mask is None:
+            return None
+        matched = [r for r, m in zip(resources, mask) if m]
+        if self.annotate:
+            for r in matched:
+                set_annotation(r, ANNOTATION_KEY, self.k)
+        return matched
+
+    def compile_accessor(self, k):
+        """Return a function of a resource returning the value of key k."""
+        if k.startswith('tag:') and not self.data.get('value_regex'):
+            tk = k.split(':', 1)[1]
+
+            # the common aws tag list form is inlined.
+            def get_value(i):
+                if 'Tags' not in i:
+                    return self.get_resource_value(k, i)
+                for t in i['Tags'] or ():
+                    if t.get('Key') == tk:
+                        return t.get('Value')
+            return get_value
+        elif k.startswith('tag:'):
+            return lambda i: self.get_resource_value(k, i)
+
+        try:
+            expr = jmespath_compile(k)
+        except Exception:
+            # keys which aren't valid expressions can only be looked up directly.
+            return None
+
+        def get_value(i):
+            if k in i:
+                return i.get(k)
+            return expr.search(i)
+
+        if self.data.get('value_regex'):
+            return _convert_accessor(
+                get_value, ValueRegex(self.data['value_regex']).get_resource_value)
+        return get_value
+
+    def compile_value_type(self, sentinel):
+        """Return the converted sentinel, and a conversion for resource values.
+
+        Most value types convert the sentinel and resource value
+        independently, the resource value conversion is returned as a
+        function of the value. Value types comparing against values
+        computed per resource instead return a function of the value and
+        resource, returning the (sentinel, value) to compare.
+        """
+        vtype = self.vtype
+        if vtype == 'expr':
+            return sentinel, None, lambda r, i: (self.get_resource_value(sentinel, i), r)
+        elif vtype == 'swap':
+            return sentinel, None, lambda r, i: (r, sentinel)
+        elif vtype == 'age':
+            if not isinstance(sentinel, datetime.datetime):
+                sentinel = datetime.datetime.now(tz=tzutc()) - timedelta(sentinel)
+            return sentinel, None, lambda r, i: (_parse_date_or_zero(r), sentinel)
+        elif vtype == 'cidr':
+            sentinel = parse_cidr(sentinel)
+            return sentinel, None, lambda r, i: _order_cidr(sentinel, parse_cidr(r))
+        elif vtype == 'date':
+            sentinel = parse_date(sentinel)
+        elif vtype == 'expiration' and not isinstance(sentinel, datetime.datetime):
+            sentinel = datetime.datetime.now(tz=tzutc()) + timedelta(sentinel)
+        elif vtype == 'version':
+            sentinel = ComparableVersion(sentinel)
+        return sentinel, VALUE_CONVERTERS.get(vtype), None
+
+
+def _annotate_match(match, key):
+    def annotate(i):
+        if match(i):
+            set_annotation(i, ANNOTATION_KEY, key)
+            return True
+        return False
+    return annotate
+
+
+def _convert_accessor(get_value, convert):
+    return lambda i: convert(get_value(i))
+
+
+def _default_accessor(get_value, default):
+    def get_default_value(i):
+        r = get_value(i)
+        return default if r is None else r
+    return get_default_value
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def _to_int(value):
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return 0
+
+
+def _to_float(value):
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return 0.0
+
+
+def _size(value):
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+def _unique_size(value):
+    try:
+        return len(set(value))
+    except TypeError:
+        return 0
+
+
+def _cidr_size(value):
+    cidr = parse_cidr(value)
+    return cidr.prefixlen if cidr else 0
+
+
+def _parse_date_or_zero(value):
+    value = parse_date(value)
+    return 0 if value is None else value
+
+
+def _order_cidr(s, v):
+    if isinstance(s, ipaddress._BaseAddress) and isinstance(v, ipaddress._BaseNetwork):
+        return v, s
+    return s, v
+
+
+VALUE_CONVERTERS = {
+    'normalize': _normalize,
+    'integer': _to_int,
+    'float': _to_float,
+    'size': _size,
+    'unique_size': _unique_size,
+    'date': parse_date,
+    'cidr_size': _cidr_size,
+    'expiration': _parse_date_or_zero,
+    'version': ComparableVersion,
+}
+
+
+def _regex_operator(pattern, flags):
+    regex = re.compile(pattern, flags)
+
+    def match(value, _):
+        if not isinstance(value, str):
+            return False
+        return bool(regex.match(value))
+    return match
+
+
+def _compare(op, r, v):
+    if r is None and v == 'absent':
+        return True
+    elif r is not None and v == 'present':
+        return True
+    elif v == 'not-null' and r:
+        return True
+    elif v == 'empty' and not r:
+        return True
+    elif op:
+        try:
+            return op(r, v)
+        except TypeError:
+            return False
+    return r == v
+
+
+def _is_special_value(v):
+    try:
+        return any(v == s for s in ('absent', 'present', 'not-null', 'empty'))
+    except TypeError:
+        return False
+
+
+def _compile_comparison(get_value, op, v):
+    """Specialize the value match for a constant sentinel."""
+    if _is_special_value(v):
+        return lambda i: _compare(op, get_value(i), v)
+    elif op:
+        def match(i):
+            r = get_value(i)
+            try:
+                return op(r, v)
+            except TypeError:
+                return False
+        return match
+    return lambda i: get_value(i) == v
+
+
+def _vector_in(column, values):
+    return numpy.isin(column, values)
+
+
+def _vector_not_in(column, values):
+    return ~numpy.isin(column, values)
+
+
+VECTOR_OPERATORS = {
+    k: OPERATORS[k] for k in (
+        'eq', 'equal', 'ne', 'not-equal', 'gt', 'greater-than', 'ge', 'gte',
+        'le', 'lte', 'lt', 'less-than')}
+VECTOR_OPERATORS.update({'in': _vector_in, 'not-in': _vector_not_in, 'ni': _vector_not_in})
+VECTOR_LIST_OPERATORS = ('in', 'not-in', 'ni')
+
+REFLECTED_OPERATORS = {
+    'eq': 'eq', 'equal': 'eq', 'ne': 'ne', 'not-equal': 'ne',
+    'gt': 'lt', 'greater-than': 'lt', 'ge': 'le', 'gte': 'le',
+    'lt': 'gt', 'less-than': 'gt', 'le': 'ge', 'lte': 'ge'}
+
+VECTOR_VALUE_TYPES = (
+    None, 'integer', 'float', 'size', 'unique_size', 'date', 'age', 'expiration')
+
+_NUMBER_TYPES = {int, float}
+
+
+def _vector_column(values, sentinel):
+    """Return the values as an array comparable with the sentinel, or (None, None).
+
+    Numbers (with missing values as nan), strings and timezone aware
+    datetimes (as timestamps) are supported, mixed columns are not.
+    """
+    sentinels = sentinel if isinstance(sentinel, (list, tuple)) else [sentinel]
+    kinds = {type(v) for v in values}
+    skinds = {type(s) for s in sentinels}
+    if not values or not sentinels:
+        return None, None
+
+    if skinds <= _NUMBER_TYPES and kinds - {type(None)} <= _NUMBER_TYPES:
+        if type(None) in kinds:
+            values = [numpy.nan if v is None else v for v in values]
+        return numpy.array(values), sentinel
+    elif skinds == {str} and kinds == {str}:
+        return numpy.array(values, dtype=str), sentinel
+    elif skinds == {datetime.datetime} and kinds == {datetime.datetime}:
+        if not all(v.tzinfo for v in values) or not all(s.tzinfo for s in sentinels):
+            return None, None
+        stamps = [s.timestamp() for s in sentinels]
+        return (numpy.array([v.timestamp() for v in values]),
+                stamps if sentinels is sentinel else stamps[0])
+    return None, None
+
+
+def _compile_node(f):
+    """Compile a filter tree to a function returning matched annotation keys or None.
+    """
+    if type(f) in (And, Or, Not):
+        # without a manager, groups evaluate and annotate per resource.
+        if f.manager is None:
+            return None
+        nodes = [_compile_node(gf) for gf in f.filters]
+        if None in nodes:
+            return None
+        return {And: _and_node, Or: _or_node, Not: _not_node}[type(f)](nodes)
+    elif isinstance(f, ValueFilter) and type(f).process is ValueFilter.process:
+        match = f.compile()
+        if match is None:
+            return None
+        keys = f.annotate and [f.k] or []
+        return lambda i: keys if match(i) else None
+    return None
+
+
+def _and_node(nodes):
+    def match(i):
+        keys = []
+        for n in nodes:
+            matched = n(i)
+            if matched is None:
+                return None
+            keys.extend(matched)
+        return keys
+    return match
+
+
+def _or_node(nodes):
+    # every branch is evaluated, as each matching branch annotates.
+    def match(i):
+        keys = None
+        for n in nodes:
+            matched = n(i)
+            if matched is not None:
+                keys = (keys or []) + matched
+        return keys
+    return match
+
+
+def _not_node(nodes):
+    match_all = _and_node(nodes)
+    return lambda i: [] if match_all(i) is None else None
+
+
+def compile_filter(f):
+    """Compile a tree of value and boolean filters to a resource predicate.
+
+    Equivalent to processing the resources through the filter tree,
+    including annotation of matched keys. Returns None if any filter in
+    the tree can't be compiled.
+    """
+    node = _compile_node(f)
+    if node is None:
+        return None
+
+    def match(i):
+        keys = node(i)
+        if keys is None:
+            return False
+        if keys:
+            set_annotation(i, ANNOTATION_KEY, list(keys))
+        return True
+    return match
+
 
 FilterRegistry.value_filter_class = ValueFilter
 
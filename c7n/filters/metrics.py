@@ -3,12 +3,14 @@
 """
 CloudWatch Metrics suppport for resources
 """
+import math
 import re
 
 from collections import namedtuple
 from concurrent.futures import as_completed
 from datetime import datetime, timedelta
 
+from c7n.cache import NullCache
 from c7n.exceptions import PolicyValidationError
 from c7n.filters.core import Filter, OPERATORS
 from c7n.utils import local_session, type_schema, chunks
@@ -67,6 +69,14 @@ class MetricsFilter(Filter):
     policy to treat their request counts as 0.
 
     Note the default statistic for metrics is Average.
+
+    Larger resource sets are retrieved in batches with GetMetricData,
+    packing many resources' metric queries into a single request.
+
+    Retrieved datapoints are saved to the configured cache, keyed by
+    metric, dimensions, statistic, period and metric window, so that
+    other policies querying the same metric within the cache period
+    reuse them.
     """
 
     schema = type_schema(
@@ -88,11 +98,19 @@ class MetricsFilter(Filter):
            'missing-value': {'type': 'number'},
            'required': ('value', 'name')})
     schema_alias = True
-    permissions = ("cloudwatch:GetMetricStatistics",)
+    permissions = ("cloudwatch:GetMetricStatistics", "cloudwatch:GetMetricData")
 
     MAX_QUERY_POINTS = 50850
     MAX_RESULT_POINTS = 1440
 
+    # GetMetricData request limits
+    MAX_DATA_QUERIES = 500
+    MAX_DATA_POINTS = 100800
+
+    # Resource count at which we switch from per resource
+    # GetMetricStatistics calls to batched GetMetricData requests.
+    batch_min_size = 50
+
     # Default per service, for overloaded services like ec2
     # we do type specific default namespace annotation
     # specifically AWS/EBS and AWS/EC2Spot
@@ -193,12 +211,23 @@ class MetricsFilter(Filter):
         self.namespace = ns
 
         self.log.debug("Querying metrics for %d", len(resources))
+        if len(resources) >= self.batch_min_size:
+            process_set, set_size = self.process_metric_data, self.get_batch_size()
+        else:
+            process_set, set_size = self.process_resource_set, 50
+
+        # cache access stays on this thread, as sqlite connections
+        # aren't shared across threads.
+        cache, uncached = self.manager._cache, ()
+        if not isinstance(cache, NullCache):
+            with cache:
+                uncached = self.load_cached_metrics(cache, resources)
+
         matched = []
         with self.executor_factory(max_workers=3) as w:
             futures = []
-            for resource_set in chunks(resources, 50):
-                futures.append(
-                    w.submit(self.process_resource_set, resource_set))
+            for resource_set in chunks(resources, set_size):
+                futures.append(w.submit(process_set, resource_set))
 
             for f in as_completed(futures):
                 if f.exception():
@@ -206,8 +235,55 @@ class MetricsFilter(Filter):
                         "CW Retrieval error: %s" % f.exception())
                     continue
                 matched.extend(f.result())
+
+        if uncached:
+            with cache:
+                self.save_cached_metrics(cache, uncached)
         return matched
 
+    def get_metric_cache_key(self, resource):
+        return {
+            'account': self.manager.config.get('account_id'),
+            'region': self.manager.config.get('region'),
+            'namespace': self.namespace,
+            'metric': self.metric,
+            'dimensions': sorted(
+                (d['Name'], d['Value']) for d in self.get_resource_dimensions(resource)),
+            'statistic': self.statistics,
+            'period': self.period,
+            'window': [self.start, self.end],
+        }
+
+    def load_cached_metrics(self, cache, resources):
+        """Annotate resources with cached datapoints.
+
+        Returns the (resource, cache key) pairs not found in the cache.
+        """
+        key = self.get_metric_key()
+        uncached = []
+        for r in resources:
+            collected_metrics = r.setdefault('c7n.metrics', {})
+            if key in collected_metrics:
+                continue
+            cache_key = self.get_metric_cache_key(r)
+            datapoints = cache.get(cache_key)
+            if datapoints is None:
+                uncached.append((r, cache_key))
+            else:
+                # caches without a codec return the stored value, which
+                # match_metrics may append a missing value fill to.
+                collected_metrics[key] = [dict(d) for d in datapoints]
+        return uncached
+
+    def save_cached_metrics(self, cache, uncached):
+        key = self.get_metric_key()
+        for r, cache_key in uncached:
+            if key not in r['c7n.metrics']:
+                continue
+            # missing value fills are policy specific.
+            cache.save(cache_key, [
+                dict(d) for d in r['c7n.metrics'][key] if 'c7n:detail' not in d])
+
     def get_dimensions(self, resource):
         return [{'Name': self.model.dimension,
                  'Value': resource[self.model.dimension]}]
@@ -220,78 +296,128 @@ class MetricsFilter(Filter):
             dims.append({'Name': k, 'Value': v})
         return dims
 
+    def get_metric_key(self):
+        # Note this annotation cache is policy scoped, not across
+        # policies, still the lack of full qualification on the key
+        # means multiple filters within a policy using the same metric
+        # across different periods or dimensions would be problematic.
+        return "%s.%s.%s.%s" % (self.namespace, self.metric, self.statistics, str(self.days))
+
+    def get_resource_dimensions(self, resource):
+        # if we overload dimensions with multiple resources we get
+        # the statistics/average over those resources.
+        dimensions = self.get_dimensions(resource)
+        # Merge in any filter specified metrics, get_dimensions is
+        # commonly overridden so we can't do it there.
+        dimensions.extend(self.get_user_dimensions())
+        return dimensions
+
+    def get_batch_size(self):
+        """Number of resources to query per GetMetricData request."""
+        points = max(1, math.ceil((self.end - self.start).total_seconds() / self.period))
+        return max(1, min(self.MAX_DATA_QUERIES, self.MAX_DATA_POINTS // points))
+
     def process_resource_set(self, resource_set):
         client = local_session(
             self.manager.session_factory).client('cloudwatch')
+        key = self.get_metric_key()
 
         matched = []
         for r in resource_set:
-            # if we overload dimensions with multiple resources we get
-            # the statistics/average over those resources.
-            dimensions = self.get_dimensions(r)
-            # Merge in any filter specified metrics, get_dimensions is
-            # commonly overridden so we can't do it there.
-            dimensions.extend(self.get_user_dimensions())
-
             collected_metrics = r.setdefault('c7n.metrics', {})
-            # Note this annotation cache is policy scoped, not across
-            # policies, still the lack of full qualification on the key
-            # means multiple filters within a policy using the same metric
-            # across different periods or dimensions would be problematic.
-            key = "%s.%s.%s.%s" % (self.namespace, self.metric, self.statistics, str(self.days))
-
-            params = dict(
-                Namespace=self.namespace,
-                MetricName=self.metric,
-                StartTime=self.start,
-                EndTime=self.end,
-                Period=self.period,
-                Dimensions=dimensions
-            )
-
-            stats_key = (self.statistics in self.standard_stats
-                         and 'Statistics' or 'ExtendedStatistics')
-            params[stats_key] = [self.statistics]
-
             if key not in collected_metrics:
+                params = dict(
+                    Namespace=self.namespace,
+                    MetricName=self.metric,
+                    StartTime=self.start,
+                    EndTime=self.end,
+                    Period=self.period,
+                    Dimensions=self.get_resource_dimensions(r)
+                )
+                stats_key = (self.statistics in self.standard_stats
+                             and 'Statistics' or 'ExtendedStatistics')
+                params[stats_key] = [self.statistics]
                 collected_metrics[key] = client.get_metric_statistics(
                     **params)['Datapoints']
-
-            # In certain cases CloudWatch reports no data for a metric.
-            # If the policy specifies a fill value for missing data, add
-            # that here before testing for matches. Otherwise, skip
-            # matching entirely.
-            if len(collected_metrics[key]) == 0:
-                if 'missing-value' not in self.data:
-                    continue
-                collected_metrics[key].append({
-                    'Timestamp': self.start,
-                    self.statistics: self.data['missing-value'],
-                    'c7n:detail': 'Fill value for missing data'
-                })
-
-            if self.data.get('percent-attr'):
-                rvalue = r[self.data.get('percent-attr')]
-                if self.data.get('attr-multiplier'):
-                    rvalue = rvalue * self.data['attr-multiplier']
-                all_meet_condition = True
-                for data_point in collected_metrics[key]:
-                    percent = (data_point[self.statistics] / rvalue * 100)
-                    if not self.op(percent, self.value):
-                        all_meet_condition = False
-                        break
-                if all_meet_condition:
-                    matched.append(r)
-            else:
-                all_meet_condition = True
-                for data_point in collected_metrics[key]:
-                    if not self.op(data_point[self.statistics], self.value):
-                        all_meet_condition = False
-                        break
-                if all_meet_condition:
-                    matched.append(r)
+            if self.match_metrics(r, collected_metrics[key]):
+                matched.append(r)
         return matched
 
+    def process_metric_data(self, resource_set):
+        """Retrieve metrics for a resource set with batched GetMetricData requests.
+
+        Results are demultiplexed by query id back into the same
+        datapoint format GetMetricStatistics returns.
+        """
+        client = local_session(
+            self.manager.session_factory).client('cloudwatch')
+        key = self.get_metric_key()
+
+        queries = {}
+        for r in resource_set:
+            if key in r.get('c7n.metrics', {}):
+                continue
+            queries['m%d' % len(queries)] = r
+
+        if queries:
+            datapoints = self.get_metric_data(client, {
+                qid: self.get_resource_dimensions(r) for qid, r in queries.items()})
+            for qid, r in queries.items():
+                r.setdefault('c7n.metrics', {})[key] = datapoints.get(qid, [])
+
+        return [r for r in resource_set if self.match_metrics(r, r['c7n.metrics'][key])]
+
+    def get_metric_data(self, client, dimensions):
+        """Query a metric for each set of dimensions keyed by query id."""
+        metric_queries = [{
+            'Id': qid,
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': self.namespace,
+                    'MetricName': self.metric,
+                    'Dimensions': dims},
+                'Period': self.period,
+                'Stat': self.statistics}}
+            for qid, dims in dimensions.items()]
+
+        results = {}
+        paginator = client.get_paginator('get_metric_data')
+        for page in paginator.paginate(
+                MetricDataQueries=metric_queries,
+                StartTime=self.start,
+                EndTime=self.end,
+                ScanBy='TimestampAscending'):
+            for result in page['MetricDataResults']:
+                results.setdefault(result['Id'], []).extend(
+                    {'Timestamp': ts, self.statistics: v}
+                    for ts, v in zip(result['Timestamps'], result['Values']))
+        return results
+
+    def match_metrics(self, r, datapoints):
+        # In certain cases CloudWatch reports no data for a metric.
+        # If the policy specifies a fill value for missing data, add
+        # that here before testing for matches. Otherwise, skip
+        # matching entirely.
+        if len(datapoints) == 0:
+            if 'missing-value' not in self.data:
+                return False
+            datapoints.append({
+                'Timestamp': self.start,
+                self.statistics: self.data['missing-value'],
+                'c7n:detail': 'Fill value for missing data'
+            })
+
+        if self.data.get('percent-attr'):
+            rvalue = r[self.data.get('percent-attr')]
+            if self.data.get('attr-multiplier'):
+                rvalue = rvalue * self.data['attr-multiplier']
+            return all(
+                self.op(data_point[self.statistics] / rvalue * 100, self.value)
+                for data_point in datapoints)
+        return all(
+            self.op(data_point[self.statistics], self.value)
+            for data_point in datapoints)
+
 
 class ShieldMetrics(MetricsFilter):
     """Specialized metrics filter for shield
@@ -45,7 +45,8 @@ class RelatedResourceFilter(ValueFilter):
         if len(related_ids) < self.FetchThreshold:
             related = resource_manager.get_resources(list(related_ids))
         else:
-            related = resource_manager.resources()
+            related = self.manager.ctx.graph.get_resource_map(resource_manager)
+            return {rid: related[rid] for rid in related_ids if rid in related}
 
         if related is None:
             return {}
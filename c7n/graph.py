@@ -0,0 +1,277 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Per run index of resources and the references between them.
+
+Filters evaluating a resource's relation to, or usage by, other
+resource types (ie. unused security groups, snapshots or images)
+typically enumerate each of those related types in full. The resource
+graph fetches each related resource set once per run, and builds
+lookup indexes over it on demand, shared by all filters and policies
+in the run.
+
+Resource sets are a point in time snapshot, actions taken by earlier
+policies in the run are not reflected.
+
+With a reference store configured, the ids referenced by a resource
+type are also persisted across runs, and subsequent runs only refetch
+the referencing resources changed since, as found in CloudTrail,
+with a periodic full scan as a consistency check.
+"""
+import copy
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from c7n.cache import key_hash, resolve_path
+from c7n.exceptions import ClientError
+from c7n.utils import local_session
+
+log = logging.getLogger('custodian.graph')
+
+
+class ReferenceStore:
+    """Persisted references of resources to other resources' ids.
+
+    References are recorded per scope (ie. a resource type and kind
+    of reference in an account and region), and per referencing
+    resource so they can be updated for changed resources only.
+    """
+
+    create_tables = (
+        """
+        create table if not exists c7n_references (
+            scope text,
+            resource_id text,
+            ref_id text
+        )
+        """,
+        """
+        create index if not exists c7n_references_resource
+            on c7n_references (scope, resource_id)
+        """,
+        """
+        create table if not exists c7n_reference_scans (
+            scope text primary key,
+            scanned real,
+            updated real
+        )
+        """,
+    )
+
+    def __init__(self, path):
+        self.path = resolve_path(path)
+        self.conn = None
+
+    def __enter__(self):
+        if not os.path.exists(os.path.dirname(self.path)):
+            os.makedirs(os.path.dirname(self.path))
+        self.conn = sqlite3.connect(self.path)
+        for statement in self.create_tables:
+            self.conn.execute(statement)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.conn.close()
+        self.conn = None
+
+    def get_scan(self, scope):
+        """Return the (full scan, last update) times of a scope, or None."""
+        return self.conn.execute(
+            'select scanned, updated from c7n_reference_scans where scope = ?',
+            [scope]).fetchone()
+
+    def get_referenced(self, scope):
+        return {ref_id for ref_id, in self.conn.execute(
+            'select distinct ref_id from c7n_references where scope = ?', [scope])}
+
+    def _insert(self, cursor, scope, references):
+        cursor.executemany(
+            'insert into c7n_references (scope, resource_id, ref_id) values (?, ?, ?)',
+            [(scope, rid, ref_id) for rid, ref_ids in references.items()
+             for ref_id in ref_ids])
+
+    def replace(self, scope, references, timestamp):
+        """Record a full scan's references, a mapping of resource id to referenced ids."""
+        with self.conn as cursor:
+            cursor.execute('delete from c7n_references where scope = ?', [scope])
+            self._insert(cursor, scope, references)
+            cursor.execute(
+                'replace into c7n_reference_scans (scope, scanned, updated) values (?, ?, ?)',
+                (scope, timestamp, timestamp))
+
+    def update(self, scope, references, removed, timestamp):
+        """Update the references of changed resources, and drop removed ones."""
+        with self.conn as cursor:
+            cursor.executemany(
+                'delete from c7n_references where scope = ? and resource_id = ?',
+                [(scope, rid) for rid in set(references).union(removed)])
+            self._insert(cursor, scope, references)
+            cursor.execute(
+                'update c7n_reference_scans set updated = ? where scope = ?',
+                (timestamp, scope))
+
+
+class ResourceGraph:
+    """Fetch resource sets once per run and index them.
+
+    Resource sets are keyed by their manager's cache key (account,
+    region, resource type and source), so only unfiltered managers
+    are tracked, others are enumerated as is on each request.
+    """
+
+    # Hours between full scans of persisted references
+    rescan_period = 24
+    # Seconds of lookback for CloudTrail event delivery delays
+    event_delay = 900
+    # Number of changed resources past which we do a full scan
+    max_changes = 1000
+
+    def __init__(self):
+        self.sets = {}
+        self.indexes = {}
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def get_key(self, manager, augment):
+        get_cache_key = getattr(manager, 'get_cache_key', None)
+        if get_cache_key is None or manager.data.get('filters'):
+            return None
+        return key_hash((get_cache_key(None), augment))
+
+    def _key_lock(self, key):
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.RLock())
+
+    def _fetch(self, manager, augment):
+        if augment:
+            return manager.resources()
+        return manager.resources(augment=False)
+
+    def resources(self, manager, augment=True):
+        """Return all of a manager's resources."""
+        key = self.get_key(manager, augment)
+        if key is None:
+            return self._fetch(manager, augment)
+        with self._key_lock(key):
+            if key not in self.sets:
+                self.sets[key] = self._fetch(manager, augment)
+            return self.sets[key]
+
+    def children(self, manager, parent_id, query, fetch):
+        """Return a child resource type's resources for a parent.
+
+        Children are fetched once per run for a parent and query,
+        regardless of the child manager's filters. As they're a policy's
+        own resources, which filters and actions annotate, each request
+        gets a copy.
+        """
+        key = key_hash((manager.get_cache_key(None), parent_id, query))
+        with self._key_lock(key):
+            if key not in self.sets:
+                self.sets[key] = fetch()
+            return copy.deepcopy(self.sets[key])
+
+    def index(self, manager, name, builder, augment=True):
+        """Return a named index built with builder over all of a manager's resources."""
+        key = self.get_key(manager, augment)
+        resources = self.resources(manager, augment)
+        if key is None:
+            return builder(resources)
+        with self._key_lock(key):
+            indexes = self.indexes.setdefault(key, {})
+            if name not in indexes:
+                indexes[name] = builder(resources)
+            return indexes[name]
+
+    def get_resource_map(self, manager, augment=True):
+        """Return a mapping of resource id to resource."""
+        id_key = manager.get_model().id
+        return self.index(
+            manager, 'id', lambda resources: {r[id_key]: r for r in resources}, augment)
+
+    def get_references(self, manager, name, refs, augment=True):
+        """Return a reverse index of referenced ids to the resources referencing them.
+
+        refs returns the ids a resource references.
+        """
+        def build(resources):
+            index = {}
+            for r in resources:
+                for rid in refs(r) or ():
+                    index.setdefault(rid, []).append(r)
+            return index
+        return self.index(manager, name, build, augment)
+
+    def get_referenced(self, manager, name, refs, augment=True):
+        """Return the set of ids referenced by any of a manager's resources.
+
+        refs returns the ids a resource references. With a reference
+        store configured, references are persisted and only resources
+        changed since the last run are refetched, until the last full
+        scan is older than the rescan period.
+        """
+        path = manager.config.get('reference_store')
+        key = self.get_key(manager, augment)
+        if not path or key is None:
+            return set(self.get_references(manager, name, refs, augment))
+        with self._key_lock(key):
+            indexes = self.indexes.setdefault(key, {})
+            if ('referenced', name) not in indexes:
+                with ReferenceStore(path) as store:
+                    indexes[('referenced', name)] = self._load_referenced(
+                        store, manager, name, refs, augment)
+            return indexes[('referenced', name)]
+
+    def _load_referenced(self, store, manager, name, refs, augment):
+        scope = key_hash((manager.get_cache_key(None), name))
+        id_key = manager.get_model().id
+        now = time.time()
+        rescan = manager.config.get('reference_rescan') or self.rescan_period
+        scan = store.get_scan(scope)
+
+        if scan and now - scan[0] < rescan * 3600:
+            changed = self.get_changed_ids(manager, scan[1] - self.event_delay)
+            if changed is not None:
+                resources = changed and manager.get_resources(
+                    list(changed), cache=False) or []
+                references = {r[id_key]: refs(r) or () for r in resources}
+                store.update(scope, references, changed.difference(references), now)
+                log.debug("Updated %s %s references for %d changed resources",
+                          manager.type, name, len(changed))
+                return store.get_referenced(scope)
+
+        resources = self.resources(manager, augment)
+        store.replace(scope, {r[id_key]: refs(r) or () for r in resources}, now)
+        return store.get_referenced(scope)
+
+    def get_changed_ids(self, manager, since):
+        """Return the ids of a manager's resources changed since a time per CloudTrail.
+
+        Returns None if changes can't be determined, or are too
+        numerous to refetch individually.
+        """
+        cfn_type = getattr(manager.get_model(), 'cfn_type', None)
+        if not cfn_type:
+            return None
+        client = local_session(manager.session_factory).client('cloudtrail')
+        paginator = client.get_paginator('lookup_events')
+        changed = set()
+        try:
+            for page in paginator.paginate(
+                    LookupAttributes=[{
+                        'AttributeKey': 'ResourceType', 'AttributeValue': cfn_type}],
+                    StartTime=since):
+                for event in page['Events']:
+                    changed.update(
+                        r['ResourceName'] for r in event.get('Resources', ())
+                        if r.get('ResourceType') == cfn_type and r.get('ResourceName'))
+                if len(changed) > self.max_changes:
+                    return None
+        except ClientError as e:
+            log.warning("Unable to lookup %s changes, doing a full scan: %s",
+                        manager.type, e)
+            return None
+        return set(manager.match_ids(list(changed)))
@@ -1,11 +1,6 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 
-try:
-    from functools import lru_cache
-except ImportError:
-    from backports.functools_lru_cache import lru_cache
-
 import logging
 import re
 import os
@@ -31,6 +26,7 @@ class SchemaValidator:
         # mostly useful for interactive debugging
         self.schema = None
         self.validator = None
+        self.resource_types = ()
 
     def validate(self, policy_data, resource_types=None):
         # before calling validate, gen_schema needs to be invoked
@@ -42,17 +38,15 @@ class SchemaValidator:
         return errors or []
 
     def _validate(self, policy_data):
-        errors = list(self.validator.iter_errors(policy_data))
+        errors = list(schema.iter_errors(policy_data, self.resource_types))
         if not errors:
             return schema.check_unique(policy_data) or []
         try:
             resp = schema.policy_error_scope(
                 schema.specific_error(errors[0]), policy_data)
-            name = isinstance(
-                errors[0].instance,
-                dict) and errors[0].instance.get(
-                    'name',
-                    'unknown') or 'unknown'
+            # errors are specific to a policy's resource type, rather
+            # than an anyOf across resource types of the policy instance.
+            name = schema.policy_error_name(errors[0], policy_data)
             return [resp, name]
         except Exception:
             logging.exception(
@@ -60,23 +54,18 @@ class SchemaValidator:
 
         return list(filter(None, [
             errors[0],
-            schema.best_match(self.validator.iter_errors(policy_data)),
+            schema.best_match(schema.iter_errors(policy_data, self.resource_types)),
         ]))
 
     def gen_schema(self, resource_types):
-        self.validator = v = self._gen_schema(resource_types)
+        if schema is None:
+            raise RuntimeError("missing jsonschema dependency")
+        self.resource_types = resource_types
+        self.validator = v = schema.get_validator(resource_types)
         # alias for debugging
         self.schema = v.schema
         return self.validator
 
-    @lru_cache(maxsize=32)
-    def _gen_schema(self, resource_types):
-        if schema is None:
-            raise RuntimeError("missing jsonschema dependency")
-        rt_schema = schema.generate(resource_types)
-        schema.JsonSchemaValidator.check_schema(rt_schema)
-        return schema.JsonSchemaValidator(rt_schema)
-
 
 class PolicyLoader:
 
@@ -187,8 +176,7 @@ class DirectoryLoader(PolicyLoader):
                 return errors
             rtypes = structure.get_resource_types(data)
             load_resources(rtypes)
-            schm = schema.generate(rtypes)
-            errors += schema.validate(data, schm)
+            errors += schema.validate(data, resource_types=rtypes)
             return errors
 
         def _load(path, raw_policies, errors, do_validate):
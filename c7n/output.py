@@ -8,6 +8,7 @@ See docs/usage/outputs.rst
 
 """
 import contextlib
+import contextvars
 import datetime
 import gzip
 import logging
@@ -314,6 +315,26 @@ class LogMetrics(Metrics):
         return res
 
 
+# The log output capturing records of the executing policy, c7n's thread
+# pools carry it over to the threads a policy submits work to.
+log_context = contextvars.ContextVar('c7n_log_context', default=None)
+
+
+class ContextLogFilter(logging.Filter):
+    """Only pass log records emitted within the given log output's context.
+
+    Used to keep per policy logs isolated when policies are executing
+    concurrently, see c7n.scheduler.
+    """
+
+    def __init__(self, output):
+        super().__init__()
+        self.output = output
+
+    def filter(self, record):
+        return log_context.get() is self.output
+
+
 class LogOutput:
 
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -322,6 +343,7 @@ class LogOutput:
         self.ctx = ctx
         self.config = config or {}
         self.handler = None
+        self.context_token = None
 
     def get_handler(self):
         raise NotImplementedError()
@@ -342,6 +364,10 @@ class LogOutput:
             return
         self.handler.setLevel(logging.DEBUG)
         self.handler.setFormatter(logging.Formatter(self.log_format))
+        # concurrently executing policies, see c7n.scheduler
+        if (getattr(getattr(self.ctx, 'options', None), 'parallel', 0) or 0) > 1:
+            self.context_token = log_context.set(self)
+            self.handler.addFilter(ContextLogFilter(self))
         mlog = logging.getLogger('custodian')
         mlog.addHandler(self.handler)
 
@@ -352,6 +378,9 @@ class LogOutput:
         mlog.removeHandler(self.handler)
         self.handler.flush()
         self.handler.close()
+        if self.context_token is not None:
+            log_context.reset(self.context_token)
+            self.context_token = None
 
 
 @log_outputs.register('default')
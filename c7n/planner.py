@@ -0,0 +1,132 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Cross policy planning of resource enumeration.
+
+When running a large number of pull mode policies, several of them
+will typically target the same resource type in the same account and
+region with the same query. The planner groups those policies, fetches
+and augments each distinct resource set once (concurrently across
+groups), and hands each policy a private copy to filter and act upon.
+"""
+from concurrent.futures import as_completed
+import copy
+import logging
+import threading
+
+from c7n.cache import key_hash
+from c7n.executor import ThreadPoolExecutor
+from c7n.query import QueryResourceManager
+
+log = logging.getLogger('custodian.planner')
+
+
+class SharedResources:
+    """Process local store of prefetched resource sets.
+
+    Lookups return a deep copy, as filters and actions annotate
+    resources in place and policies must not observe each other's
+    annotations.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            resources = self.data.get(key_hash(key))
+        if resources is None:
+            return None
+        return copy.deepcopy(resources)
+
+    def save(self, key, resources):
+        with self.lock:
+            self.data[key_hash(key)] = resources
+
+    def __len__(self):
+        return len(self.data)
+
+
+class EnumerationPlanner:
+    """Group policies by resource set and fetch each set once.
+
+    Only policies that would execute in pull mode against a query
+    resource manager using the default enumeration are planned, other
+    policies continue to enumerate their own resources at execution
+    time. Policies whose resource set is not shared with any other
+    policy are left alone as well.
+    """
+
+    executor_factory = ThreadPoolExecutor
+
+    def __init__(self, policies, max_workers=4):
+        self.policies = policies
+        self.max_workers = max_workers
+        self.shared = SharedResources()
+
+    @staticmethod
+    def is_plannable(policy):
+        if not (policy.execution_mode == 'pull' or policy.options.dryrun):
+            return False
+        manager = policy.resource_manager
+        if not isinstance(manager, QueryResourceManager):
+            return False
+        # resource managers with custom enumeration can't be fetched
+        # generically on their behalf.
+        return type(manager).resources is QueryResourceManager.resources
+
+    def plan(self):
+        """Return a list of (cache key, policies) groups with shared resource sets."""
+        groups = {}
+        for p in self.policies:
+            if not self.is_plannable(p):
+                continue
+            manager = p.resource_manager
+            try:
+                key = manager.get_cache_key(manager.source.get_query_params(None))
+            except Exception:
+                log.debug("policy:%s unable to plan enumeration", p.name, exc_info=True)
+                continue
+            groups.setdefault(key_hash((p.provider_name, key)), (key, []))[1].append(p)
+        return [(key, policies) for key, policies in groups.values() if len(policies) > 1]
+
+    def fetch(self, key, policies):
+        manager = policies[0].resource_manager
+        with manager._cache:
+            resources = manager._cache.get(key)
+            if resources is None:
+                resources = manager.source.resources(key['q'] or {})
+                resources = manager.augment(resources)
+                manager._cache.save_resources(key, resources, manager.get_model().id)
+        return resources
+
+    def execute(self):
+        """Prefetch all shared resource sets and attach the store to each policy."""
+        groups = self.plan()
+        if not groups:
+            return self.shared
+
+        log.info("Prefetching %d shared resource sets for %d policies",
+                 len(groups), sum(len(policies) for _, policies in groups))
+
+        with self.executor_factory(max_workers=self.max_workers) as w:
+            futures = {}
+            for key, policies in groups:
+                futures[w.submit(self.fetch, key, policies)] = (key, policies)
+
+            for f in as_completed(futures):
+                key, policies = futures[f]
+                if f.exception():
+                    # policies will enumerate (and error) on their own.
+                    log.warning(
+                        "Error prefetching %s resources in %s, policies will fetch "
+                        "individually: %s", key['resource'], key['region'], f.exception())
+                    continue
+                resources = f.result()
+                log.debug("Prefetched %d %s resources in %s for %d policies",
+                          len(resources), key['resource'], key['region'], len(policies))
+                self.shared.save(key, resources)
+                for p in policies:
+                    p.ctx.shared_resources = self.shared
+        return self.shared
@@ -2,8 +2,10 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import abc
+import functools
 import importlib
 import logging
+import sys
 
 from c7n.registry import PluginRegistry
 
@@ -16,6 +18,12 @@ log = logging.getLogger('c7n.providers')
 class Provider(metaclass=abc.ABCMeta):
     """Provider Base Class"""
 
+    # Modes, filters and actions registered across resource types by
+    # modules that are otherwise not needed, as a mapping of module to
+    # registry to names. The modules are imported on first lookup of
+    # one of their names.
+    lazy_elements = {}
+
     @abc.abstractproperty
     def display_name(self):
         """display name for the provider in docs"""
@@ -56,8 +64,36 @@ class Provider(metaclass=abc.ABCMeta):
             cls.resource_map, resource_types)
         for r in resource_classes:
             cls.resources.notify(r)
+            cls.register_lazy_elements(r)
         return resource_classes, not_found
 
+    @classmethod
+    def register_lazy_modes(cls):
+        from c7n.policy import execution
+        for module, elements in cls.lazy_elements.items():
+            if module in sys.modules:
+                continue
+            for name in elements.get('modes', ()):
+                execution.register_lazy(
+                    name, functools.partial(importlib.import_module, module))
+
+    @classmethod
+    def register_lazy_elements(cls, resource_class):
+        for module, elements in cls.lazy_elements.items():
+            if module in sys.modules:
+                continue
+            loader = functools.partial(cls._load_elements, module, resource_class)
+            for name in elements.get('filters', ()):
+                resource_class.filter_registry.register_lazy(name, loader)
+            for name in elements.get('actions', ()):
+                resource_class.action_registry.register_lazy(name, loader)
+
+    @classmethod
+    def _load_elements(cls, module, resource_class):
+        importlib.import_module(module)
+        # the module's subscribers register its elements on the resource
+        cls.resources.notify(resource_class)
+
 
 def import_resource_classes(resource_map, resource_types):
     if '*' in resource_types:
@@ -6,17 +6,28 @@ Query capability built on skew metamodel
 tags_spec -> s3, elb, rds
 """
 from concurrent.futures import as_completed
+import copy
 import functools
 import itertools
 import json
+import math
+import threading
+import time
 from typing import List
 
 import os
 
-from c7n.actions import ActionRegistry
-from c7n.exceptions import ClientError, ResourceLimitExceeded, PolicyExecutionError
+from c7n.actions import ActionRegistry, BaseNotify
+from c7n.cache import NullCache
+from c7n.credentials import get_client_config
+from c7n.exceptions import (
+    ClientError, ResourceLimitExceeded, PolicyExecutionError, PolicyValidationError)
 from c7n.filters import FilterRegistry, MetricsFilter
+from c7n.filters.core import (
+    BooleanGroupFilter, EventFilter, ListItemFilter, ValueFilter, get_pushdown,
+    is_streamable)
 from c7n.manager import ResourceManager
+from c7n.ratelimit import THROTTLE_CODES
 from c7n.registry import PluginRegistry
 from c7n.tags import register_ec2_tags, register_universal_tags, universal_augment
 from c7n.utils import (
@@ -61,8 +72,19 @@ class ResourceQuery:
 
         return data
 
-    def filter(self, resource_manager, **params):
-        """Query a set of resources."""
+    def _iter_client_enum(self, client, enum_op, params, path, retry=None):
+        """Yield resources a page at a time."""
+        if not path or not client.can_paginate(enum_op):
+            yield self._invoke_client_enum(client, enum_op, params, path, retry) or []
+            return
+        p = client.get_paginator(enum_op)
+        if retry:
+            p.PAGE_ITERATOR_CLS = RetryPageIterator
+        path = jmespath_compile(path)
+        for page in p.paginate(**params):
+            yield path.search(page) or []
+
+    def _get_enum_args(self, resource_manager, params):
         m = self.resolve(resource_manager.resource_type)
         if resource_manager.get_client:
             client = resource_manager.get_client()
@@ -72,9 +94,16 @@ class ResourceQuery:
         enum_op, path, extra_args = m.enum_spec
         if extra_args:
             params = {**extra_args, **params}
+        return client, enum_op, params, path, getattr(resource_manager, 'retry', None)
+
+    def filter(self, resource_manager, **params):
+        """Query a set of resources."""
         return self._invoke_client_enum(
-            client, enum_op, params, path,
-            getattr(resource_manager, 'retry', None)) or []
+            *self._get_enum_args(resource_manager, params)) or []
+
+    def iter_filter(self, resource_manager, **params):
+        """Query a set of resources, yielding them a page at a time."""
+        return self._iter_client_enum(*self._get_enum_args(resource_manager, params))
 
     def get(self, resource_manager, identities):
         """Get resources by identities
@@ -108,6 +137,11 @@ class ResourceQuery:
         return resources
 
 
+def _is_not_found(error):
+    code = error.response.get('Error', {}).get('Code', '')
+    return code.startswith('NoSuch') or code.endswith(('NotFound', 'NotFoundException'))
+
+
 class ChildResourceQuery(ResourceQuery):
     """A resource query for resources that must be queried with parent information.
 
@@ -129,7 +163,8 @@ class ChildResourceQuery(ResourceQuery):
         if resource_manager.get_client:
             client = resource_manager.get_client()
         else:
-            client = local_session(self.session_factory).client(m.service)
+            client = local_session(self.session_factory).client(
+                m.service, config=get_client_config(self.manager.max_workers))
 
         enum_op, path, extra_args = m.enum_spec
         if extra_args:
@@ -155,21 +190,60 @@ class ChildResourceQuery(ResourceQuery):
             return self._invoke_client_enum(client, enum_op, params, path)
 
         # Have to query separately for each parent's children.
-        results = []
-        for parent_id in parent_ids:
-            merged_params = self.get_parent_parameters(params, parent_id, parent_key)
-            subset = self._invoke_client_enum(
-                client, enum_op, merged_params, path, retry=self.manager.retry)
+        def get_children(parent_id):
+            subset = self.get_children(
+                client, enum_op, self.get_parent_parameters(params, parent_id, parent_key),
+                path, parent_id)
             if annotate_parent:
                 for r in subset:
                     r[self.parent_key] = parent_id
-            if subset:
-                if self.capture_parent_id:
-                    results.extend([(parent_id, s) for s in subset])
-                else:
-                    results.extend(subset)
+            return subset
+
+        results = []
+        for parent_id, subset in zip(parent_ids, self.map_parents(get_children, parent_ids)):
+            if self.capture_parent_id:
+                results.extend([(parent_id, s) for s in subset])
+            else:
+                results.extend(subset)
         return results
 
+    def map_parents(self, func, parents):
+        """Apply func to each parent, returning results in parent order.
+
+        As with augmentation, parents are processed in chunks of the
+        manager's chunk size, with chunks processed concurrently.
+        """
+        def map_chunk(parent_set):
+            return [func(p) for p in parent_set]
+
+        with self.manager.executor_factory(max_workers=self.manager.max_workers) as w:
+            return list(itertools.chain(*w.map(
+                map_chunk, chunks(parents, self.manager.chunk_size))))
+
+    def get_children(self, client, enum_op, params, path, parent_id):
+        """Return a parent's children, enumerated once per run.
+
+        Children are shared via the execution context's resource graph,
+        so child managers used by other policies, or as related
+        resources, reuse them. Parents removed since they were
+        enumerated are treated as having no children.
+        """
+        def fetch():
+            try:
+                return self._invoke_client_enum(
+                    client, enum_op, params, path, retry=self.manager.retry) or []
+            except ClientError as e:
+                if not _is_not_found(e):
+                    raise
+                self.manager.log.warning(
+                    "%s parent %s not found: %s", self.manager.type, parent_id, e)
+                return []
+
+        graph = getattr(self.manager.ctx, 'graph', None)
+        if graph is None:
+            return fetch()
+        return graph.children(self.manager, parent_id, (enum_op, params), fetch)
+
     def get_parent_parameters(self, params, parent_id, parent_key):
         return dict(params, **{parent_key: parent_id})
 
@@ -229,6 +303,18 @@ class DescribeSource:
     def resources(self, query):
         return self.query.filter(self.manager, **query)
 
+    def iter_resources(self, query):
+        """Yield resources a page at a time.
+
+        Sources or queries with custom enumeration yield a single page
+        of all resources.
+        """
+        if (type(self).resources is DescribeSource.resources and
+                type(self.query).filter is ResourceQuery.filter):
+            yield from self.query.iter_filter(self.manager, **query)
+        else:
+            yield self.resources(query)
+
     def get_query(self):
         return self.resource_query_factory(self.manager.session_factory)
 
@@ -263,17 +349,22 @@ class DescribeSource:
             _augment = _batch_augment
         else:
             return resources
+        # throttling limits are per account and region
+        key = (self.manager.config.account_id, self.manager.config.region,
+               model.service, detail_spec[0])
+        chunk_size, max_workers = AUGMENT_SCHEDULER.schedule(
+            self.manager, key, len(resources), batch=_augment is _batch_augment)
         if self.manager.get_client:
             client = self.manager.get_client()
         else:
             client = local_session(self.manager.session_factory).client(
-                model.service, region_name=self.manager.config.region)
+                model.service, region_name=self.manager.config.region,
+                config=get_client_config(max_workers))
         _augment = functools.partial(
-            _augment, self.manager, model, detail_spec, client)
-        with self.manager.executor_factory(
-                max_workers=self.manager.max_workers) as w:
-            results = list(w.map(
-                _augment, chunks(resources, self.manager.chunk_size)))
+            _augment, self.manager, model, detail_spec, client,
+            stats=AUGMENT_SCHEDULER.get_stats(key, self.manager.max_workers))
+        with self.manager.executor_factory(max_workers=max_workers) as w:
+            results = list(w.map(_augment, chunks(resources, chunk_size)))
             return list(itertools.chain(*results))
 
 
@@ -298,28 +389,122 @@ class ConfigSource:
 
     retry = staticmethod(get_retry(('ThrottlingException',)))
 
+    # resources per batch get, the api maximum.
+    batch_size = 100
+    # resources per tag select, keeping the expression within its size limit.
+    tag_batch_size = 20
+    select_fields = "resourceId, configuration, supplementaryConfiguration"
+
     def __init__(self, manager):
         self.manager = manager
         self.titleCase = self.manager.resource_type.id[0].isupper()
 
     def get_permissions(self):
-        return ["config:GetResourceConfigHistory",
-                "config:ListDiscoveredResources"]
+        if self.get_aggregator():
+            return ["config:BatchGetAggregateResourceConfig",
+                    "config:SelectAggregateResourceConfig"]
+        return ["config:BatchGetResourceConfig",
+                "config:ListDiscoveredResources",
+                "config:SelectResourceConfig"]
+
+    def validate(self):
+        # a full select expression can't be scoped to the policy's
+        # account and region within the aggregator.
+        if self.get_aggregator() and any(
+                'expr' in q for q in self.manager.data.get('query', ())):
+            raise PolicyValidationError(
+                "policy:%s config source aggregator queries only support clauses" % (
+                    self.manager.data.get('name')))
+
+    def get_aggregator(self):
+        """Return the name of the config aggregator to query, if any.
+
+        With an aggregator, resources of the policy's account and region
+        are queried from the aggregator's account.
+        """
+        for q in self.manager.data.get('query', ()):
+            if 'aggregator' in q:
+                return q['aggregator']
 
     def get_resources(self, ids, cache=True):
-        client = local_session(self.manager.session_factory).client('config')
-        results = []
-        m = self.manager.get_model()
-        for i in ids:
-            revisions = self.retry(
-                client.get_resource_config_history,
-                resourceId=i,
-                resourceType=m.config_type,
-                limit=1).get('configurationItems')
-            if not revisions:
-                continue
-            results.append(self.load_resource(revisions[0]))
-        return list(filter(None, results))
+        return list(itertools.chain.from_iterable(self.iter_resource_batches(ids)))
+
+    def iter_resource_batches(self, ids, ignore_errors=False):
+        """Yield resources by id a batch at a time, as they are retrieved.
+
+        Errors retrieving a batch are raised, unless ignore_errors is set
+        in which case they're logged and the batch skipped.
+        """
+        client = local_session(self.manager.session_factory).client(
+            'config', config=get_client_config(self.manager.max_workers))
+        with self.manager.executor_factory(max_workers=self.manager.max_workers) as w:
+            futures = [
+                w.submit(self.get_resource_batch, client, resource_set)
+                for resource_set in chunks(ids, self.batch_size)]
+            for f in as_completed(futures):
+                if f.exception():
+                    if not ignore_errors:
+                        raise f.exception()
+                    self.manager.log.error(
+                        "Exception getting resources from config \n %s" % (
+                            f.exception()))
+                    continue
+                yield list(filter(None, map(self.load_resource, f.result())))
+
+    def get_resource_batch(self, client, ids):
+        config_type = self.manager.get_model().config_type
+        aggregator = self.get_aggregator()
+        if aggregator:
+            op = functools.partial(
+                client.batch_get_aggregate_resource_config,
+                ConfigurationAggregatorName=aggregator)
+            keys = [{'SourceAccountId': self.manager.config.account_id,
+                     'SourceRegion': self.manager.config.region,
+                     'ResourceId': i, 'ResourceType': config_type} for i in ids]
+            key_param, result_key, unprocessed_key = (
+                'ResourceIdentifiers', 'BaseConfigurationItems',
+                'UnprocessedResourceIdentifiers')
+        else:
+            op = client.batch_get_resource_config
+            keys = [{'resourceType': config_type, 'resourceId': i} for i in ids]
+            key_param, result_key, unprocessed_key = (
+                'resourceKeys', 'baseConfigurationItems', 'unprocessedResourceKeys')
+
+        items = []
+        while keys:
+            response = self.retry(op, **{key_param: keys})
+            items.extend(response.get(result_key, ()))
+            unprocessed = response.get(unprocessed_key) or []
+            if len(unprocessed) == len(keys):
+                self.manager.log.warning(
+                    "config did not return %d %s resources", len(keys), config_type)
+                break
+            keys = unprocessed
+
+        # batch get configuration items don't include the resource tags.
+        tags = self.get_resource_tags(client, [i['resourceId'] for i in items])
+        for i in items:
+            i.setdefault('tags', tags.get(i['resourceId'], {}))
+        return items
+
+    def get_resource_tags(self, client, ids):
+        """Return a mapping of resource id to the resource's tags."""
+        tags = {}
+        aggregator = self.get_aggregator()
+        for resource_set in chunks(ids, self.tag_batch_size):
+            query = {'expr': (
+                "select resourceId, tags where resourceType = '{}' "
+                "AND resourceId IN ({})").format(
+                    self.manager.get_model().config_type,
+                    ", ".join("'%s'" % i for i in resource_set))}
+            if aggregator:
+                query['expr'] += self.get_aggregator_clause()
+                query['aggregator'] = aggregator
+            for page in self.get_select_pages(client, query):
+                for r in map(json.loads, page['Results']):
+                    tags[r['resourceId']] = {
+                        t['key']: t['value'] for t in r.get('tags', ())}
+        return tags
 
     def get_query_params(self, query):
         """Parse config select expression from policy and parameter.
@@ -346,18 +531,29 @@ class ConfigSource:
             if _c:
                 _c = _c.pop()
         elif query:
+            aggregator = self.get_aggregator()
+            if aggregator:
+                return dict(query, aggregator=aggregator)
             return query
         else:
             _c = None
 
-        s = ("select resourceId, configuration, supplementaryConfiguration "
-             "where resourceType = '{}'").format(self.manager.resource_type.config_type)
+        s = "select {} where resourceType = '{}'".format(
+            self.select_fields, self.manager.resource_type.config_type)
 
         if _c:
             s += "AND {}".format(_c)
 
+        aggregator = self.get_aggregator()
+        if aggregator:
+            s += self.get_aggregator_clause()
+            return {'expr': s, 'aggregator': aggregator}
         return {'expr': s}
 
+    def get_aggregator_clause(self):
+        return " AND accountId = '{}' AND awsRegion = '{}'".format(
+            self.manager.config.account_id, self.manager.config.region)
+
     def load_resource(self, item):
         item_config = self._load_item_config(item)
         resource = camelResource(
@@ -393,60 +589,144 @@ class ConfigSource:
                 resource['Tags'] = [{u'Key': k, u'Value': v} for k, v in stags.items()]
 
     def get_listed_resources(self, client):
+        return list(itertools.chain.from_iterable(self.iter_listed_resources(client)))
+
+    def iter_listed_resources(self, client):
         # fallback for when config decides to arbitrarily break select
         # resource for a given resource type.
         paginator = client.get_paginator('list_discovered_resources')
         paginator.PAGE_ITERATOR_CLS = RetryPageIterator
         pages = paginator.paginate(
             resourceType=self.manager.get_model().config_type)
-        results = []
-
-        with self.manager.executor_factory(max_workers=2) as w:
-            ridents = pages.build_full_result()
-            resource_ids = [
-                r['resourceId'] for r in ridents.get('resourceIdentifiers', ())]
-            self.manager.log.debug(
-                "querying %d %s resources",
-                len(resource_ids),
-                self.manager.__class__.__name__.lower())
-
-            for resource_set in chunks(resource_ids, 50):
-                futures = []
-                futures.append(w.submit(self.get_resources, resource_set))
-                for f in as_completed(futures):
-                    if f.exception():
-                        self.manager.log.error(
-                            "Exception getting resources from config \n %s" % (
-                                f.exception()))
-                    results.extend(f.result())
-        return results
-
-    def resources(self, query=None):
-        client = local_session(self.manager.session_factory).client('config')
-        query = self.get_query_params(query)
+        ridents = pages.build_full_result()
+        resource_ids = [
+            r['resourceId'] for r in ridents.get('resourceIdentifiers', ())]
+        self.manager.log.debug(
+            "querying %d %s resources",
+            len(resource_ids),
+            self.manager.__class__.__name__.lower())
+        return self.iter_resource_batches(resource_ids, ignore_errors=True)
+
+    def get_select_pages(self, client, query):
+        if query.get('aggregator'):
+            op, op_name, params = (
+                client.select_aggregate_resource_config, 'SelectAggregateResourceConfig',
+                {'ConfigurationAggregatorName': query['aggregator']})
+        else:
+            op, op_name, params = client.select_resource_config, 'SelectResourceConfig', {}
         pager = Paginator(
-            client.select_resource_config,
+            op,
             {'input_token': 'NextToken', 'output_token': 'NextToken',
              'result_key': 'Results'},
-            client.meta.service_model.operation_model('SelectResourceConfig'))
+            client.meta.service_model.operation_model(op_name))
         pager.PAGE_ITERATOR_CLS = RetryPageIterator
+        return pager.paginate(Expression=query['expr'], **params)
 
-        results = []
-        for page in pager.paginate(Expression=query['expr']):
-            results.extend([
-                self.load_resource(json.loads(r)) for r in page['Results']])
+    def iter_resources(self, query=None):
+        """Yield resources a page at a time, as config returns them."""
+        client = local_session(self.manager.session_factory).client('config')
+        query = self.get_query_params(query)
+        resource_count = 0
+        for page in self.get_select_pages(client, query):
+            resources = [self.load_resource(json.loads(r)) for r in page['Results']]
+            resource_count += len(resources)
+            yield resources
 
         # Config arbitrarily breaks which resource types its supports for query/select
         # on any given day, if we don't have a user defined query, then fallback
         # to iteration mode.
-        if not results and query == self.get_query_params({}):
-            results = self.get_listed_resources(client)
-        return results
+        if not resource_count and query == self.get_query_params({}) and (
+                not query.get('aggregator')):
+            yield from self.iter_listed_resources(client)
+
+    def resources(self, query=None):
+        return list(itertools.chain.from_iterable(self.iter_resources(query)))
 
     def augment(self, resources):
         return resources
 
 
+@sources.register('config-aggregator')
+class ConfigAggregatorSource(ConfigSource):
+    """Query resources across all the accounts and regions of a config aggregator.
+
+    A single select against the aggregator replaces enumerating each
+    account and region. Resources are normalized by the resource type's
+    config source, and annotated with the account and region they
+    belong to, which are used for their arns.
+
+    As filters and actions otherwise operate in the policy's own account
+    and region, only notify actions are supported.
+
+    :example:
+
+    .. code-block:: yaml
+
+        policies:
+          - name: org-unencrypted-volumes
+            resource: aws.ebs
+            source: config-aggregator
+            query:
+              - aggregator: org-aggregator
+              - clause: "configuration.encrypted = false"
+    """
+
+    select_fields = (
+        "resourceId, accountId, awsRegion, configuration, supplementaryConfiguration")
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.source = manager.get_source('config')
+
+    def validate(self):
+        if not self.get_aggregator():
+            raise PolicyValidationError(
+                "policy:%s config-aggregator source requires an aggregator query" % (
+                    self.manager.data.get('name')))
+        for a in self.manager.actions:
+            if not isinstance(a, BaseNotify):
+                raise PolicyValidationError(
+                    "policy:%s config-aggregator source only supports notify actions" % (
+                        self.manager.data.get('name')))
+        if not self.is_local_filters(self.manager.filters):
+            raise PolicyValidationError(
+                "policy:%s config-aggregator source only supports value filters" % (
+                    self.manager.data.get('name')))
+
+    def is_local_filters(self, filters):
+        """Check filters only evaluate the resource itself, other filters
+        would query the policy's own account and region.
+        """
+        for f in filters:
+            if isinstance(f, BooleanGroupFilter):
+                if not self.is_local_filters(f.filters):
+                    return False
+            elif type(f) not in (ValueFilter, ListItemFilter, EventFilter):
+                return False
+        return True
+
+    def get_aggregator_clause(self):
+        return ""
+
+    def get_resource_sets(self, resources):
+        """Group resources by their account and region."""
+        resource_sets = {}
+        for r in resources:
+            resource_sets.setdefault(
+                (r['c7n:account-id'], r['c7n:region']), []).append(r)
+        return resource_sets
+
+    def iter_resources(self, query=None):
+        for page in super().iter_resources(query):
+            yield from self.get_resource_sets(page).values()
+
+    def load_resource(self, item):
+        resource = self.source.load_resource(item)
+        resource['c7n:account-id'] = item['accountId']
+        resource['c7n:region'] = item['awsRegion']
+        return resource
+
+
 class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
 
     resource_type = ""
@@ -454,6 +734,7 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
     # TODO Check if we can move to describe source
     max_workers = 3
     chunk_size = 20
+    stream_chunk_size = 1000
 
     _generate_arn = None
 
@@ -484,6 +765,10 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
             return sources[source_type](self)
         raise KeyError("Invalid Source %s" % source_type)
 
+    def validate(self):
+        if hasattr(self.source, 'validate'):
+            self.source.validate()
+
     @classmethod
     def has_arn(cls):
         if cls.resource_type.arn is not None:
@@ -523,36 +808,137 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
 
     def resources(self, query=None, augment=True) -> List[dict]:
         query = self.source.get_query_params(query)
+        # shared resource sets are enumerated without a policy's filters.
+        if self.ctx.shared_resources is None:
+            query = self.get_pushdown_query(query)
         cache_key = self.get_cache_key(query)
         resources = None
 
-        with self._cache:
-            resources = self._cache.get(cache_key)
+        if self.ctx.shared_resources is not None:
+            resources = self.ctx.shared_resources.get(cache_key)
             if resources is not None:
-                self.log.debug("Using cached %s: %d" % (
+                self.log.debug("Using shared %s: %d" % (
                     "%s.%s" % (self.__class__.__module__, self.__class__.__name__),
                     len(resources)))
 
+        with self._cache:
+            if resources is None:
+                resources = self._cache.get(cache_key)
+                if resources is not None:
+                    self.log.debug("Using cached %s: %d" % (
+                        "%s.%s" % (self.__class__.__module__, self.__class__.__name__),
+                        len(resources)))
+
+            filters, resource_count = self.filters, None
             if resources is None:
                 if query is None:
                     query = {}
-                with self.ctx.tracer.subsegment('resource-fetch'):
-                    resources = self.source.resources(query)
-                if augment:
-                    with self.ctx.tracer.subsegment('resource-augment'):
-                        resources = self.augment(resources)
-                    # Don't pollute cache with unaugmented resources.
-                    self._cache.save(cache_key, resources)
-
-        resource_count = len(resources)
+                if augment and self.is_streaming():
+                    resources, resource_count, filters = self._stream_resources(
+                        query, cache_key)
+                else:
+                    with self.ctx.tracer.subsegment('resource-fetch'):
+                        resources = self.source.resources(query)
+                    if augment:
+                        with self.ctx.tracer.subsegment('resource-augment'):
+                            resources = self.augment(resources)
+                        # Don't pollute cache with unaugmented resources.
+                        self._cache.save_resources(cache_key, resources, self.get_model().id)
+
+        if resource_count is None:
+            resource_count = len(resources)
         with self.ctx.tracer.subsegment('filter'):
-            resources = self.filter_resources(resources)
+            resources = self.filter_resources(resources, filters=filters)
 
         # Check if we're out of a policies execution limits.
         if self.data == self.ctx.policy.data:
             self.check_resource_limit(len(resources), resource_count)
         return resources
 
+    def get_pushdown_filters(self, query=None):
+        """Return api filters translated from the policy's leading value filters.
+
+        Translated filters are still evaluated client side, pushdown only
+        reduces the resources fetched. Keys already present in the query's
+        filters are left alone, as multiple values for a filter name are
+        or'd by the api.
+        """
+        mapping = getattr(self.get_model(), 'filter_pushdown', None)
+        if not mapping or self.source_type != 'describe':
+            return []
+        # percentage limits are relative to the unfiltered population.
+        if self.data == self.ctx.policy.data and MaxResourceLimit(
+                self.ctx.policy, 0, 0).percent:
+            return []
+
+        names = {f['Name'] for f in (query or {}).get('Filters', ())}
+        pushdown = []
+        for f in self.get_stream_filters():
+            api_filter = get_pushdown(f, mapping)
+            if api_filter is None or api_filter['Name'] in names:
+                continue
+            names.add(api_filter['Name'])
+            pushdown.append(api_filter)
+        return pushdown
+
+    def get_pushdown_query(self, query):
+        pushdown = self.get_pushdown_filters(query)
+        if not pushdown:
+            return query
+        query = dict(query or {})
+        query['Filters'] = list(query.get('Filters', ())) + pushdown
+        self.log.debug("Pushing down %d filters to %s api", len(pushdown),
+                       self.__class__.__name__.lower())
+        return query
+
+    def is_streaming(self):
+        return bool(self.config.get('stream')) and hasattr(self.source, 'iter_resources')
+
+    def get_stream_filters(self):
+        """Return the leading filters which can be applied to chunks of resources.
+
+        The first filter operating on the whole resource set acts as a
+        barrier, it and all subsequent filters are applied once all
+        resources have been fetched.
+        """
+        filters = []
+        for f in self.filters:
+            if not is_streamable(f):
+                break
+            filters.append(f)
+        return filters
+
+    def _stream_resources(self, query, cache_key):
+        """Fetch, augment and filter resources a page and chunk at a time.
+
+        Returns the resources matched by the streamable filters, the
+        population count, and the remaining filters to apply.
+        """
+        stream_filters = self.get_stream_filters()
+        # the full set is only retained if there's a cache to save it to.
+        retain = not isinstance(self._cache, NullCache)
+        population, matched, resource_count = [], [], 0
+
+        for page in self.source.iter_resources(query):
+            for chunk in chunks(page, self.stream_chunk_size):
+                with self.ctx.tracer.subsegment('resource-augment'):
+                    chunk = self.augment(chunk)
+                resource_count += len(chunk)
+                if retain:
+                    population.extend(chunk)
+                    # filters annotate in place, keep cached resources pristine.
+                    chunk = copy.deepcopy(chunk)
+                with self.ctx.tracer.subsegment('filter'):
+                    matched.extend(
+                        self.filter_resources(chunk, filters=stream_filters))
+
+        if retain:
+            self._cache.save_resources(cache_key, population, self.get_model().id)
+        self.log.debug("Streamed %d %s, %d matched %d filters" % (
+            resource_count, self.__class__.__name__.lower(), len(matched),
+            len(stream_filters)))
+        return matched, resource_count, self.filters[len(stream_filters):]
+
     def check_resource_limit(self, selection_count, population_count):
         """Check if policy's execution affects more resources then its limit.
 
@@ -566,12 +952,10 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
     def _get_cached_resources(self, ids):
         key = self.get_cache_key(None)
         with self._cache:
-            resources = self._cache.get(key)
+            resources = self._cache.get_resources(key, ids, self.get_model().id)
             if resources is not None:
                 self.log.debug("Using cached results for get_resources")
-                m = self.get_model()
-                id_set = set(ids)
-                return [r for r in resources if r[m.id] in id_set]
+                return resources
         return None
 
     def get_resources(self, ids, cache=True, augment=True):
@@ -585,11 +969,20 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
             resources = self.source.get_resources(ids)
             if augment:
                 resources = self.augment(resources)
+                self._refresh_cached_resources(resources)
             return resources
         except ClientError as e:
             self.log.warning("event ids not resolved: %s error:%s" % (ids, e))
             return []
 
+    def _refresh_cached_resources(self, resources):
+        # update the refetched resources in the cached set, if any.
+        key = self.get_cache_key(None)
+        with self._cache:
+            if self._cache.save_resources(
+                    key, copy.deepcopy(resources), self.get_model().id, partial=True):
+                self.log.debug("Refreshed %d cached resources", len(resources))
+
     def augment(self, resources):
         """subclasses may want to augment resources with additional information.
 
@@ -630,6 +1023,11 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
 
                 if 'arn' in _id[:3]:
                     arns.append(_id)
+                elif 'c7n:account-id' in r:
+                    # resources of other accounts and regions, via a config aggregator
+                    arns.append(self.generate_arn(
+                        _id, account_id=r['c7n:account-id'],
+                        region=self.generate_arn.keywords['region'] and r['c7n:region']))
                 else:
                     arns.append(self.generate_arn(_id))
 
@@ -719,9 +1117,143 @@ class ChildResourceManager(QueryResourceManager):
         return self.get_resource_manager(self.resource_type.parent_spec[0])
 
 
-def _batch_augment(manager, model, detail_spec, client, resource_set):
+class DetailStats:
+    """Observed latency and throttling of a detail operation."""
+
+    # weight of the latest call in the average latency
+    alpha = 0.2
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.latency = None
+        # calls and throttles since the operation was last scheduled
+        self.calls = 0
+        self.throttles = 0
+        self.lock = threading.Lock()
+
+    def record(self, elapsed, throttled=False):
+        with self.lock:
+            self.calls += 1
+            if throttled:
+                self.throttles += 1
+            if elapsed is None:
+                return
+            if self.latency is None:
+                self.latency = elapsed
+            else:
+                self.latency += self.alpha * (elapsed - self.latency)
+
+    def timed(self, func):
+        """Wrap an api call to record its latency and throttling."""
+        @functools.wraps(func)
+        def call(*args, **kw):
+            t = time.monotonic()
+            try:
+                response = func(*args, **kw)
+            except ClientError as e:
+                if e.response['Error']['Code'] in THROTTLE_CODES:
+                    self.record(None, throttled=True)
+                raise
+            # botocore retried throttled or transient errors
+            retries = response.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+            self.record(time.monotonic() - t, throttled=bool(retries))
+            return response
+        return call
+
+
+class AugmentScheduler:
+    """Size augment chunks and concurrency per detail operation.
+
+    Operations are tracked process wide per account, region, service and
+    operation. Concurrency starts at the resource type's max_workers,
+    and on each augment is halved if the operation was throttled since
+    it was last scheduled, or otherwise grows by one up to max_workers.
+
+    Batch operations keep the resource type's chunk size, typically
+    the api's maximum. Scalar operations make a call per resource, so
+    populations larger than the chunk size are spread across workers
+    in chunks of about target_duration seconds of calls.
+
+    Either may be set for a resource type in the augment option, as
+    RESOURCE=WORKERS[:CHUNK], ie. ``--augment lambda=8:5``.
+
+    Adaptation only happens across repeated augments of the same
+    operation, ie. in long running processes or with stream chunking,
+    the first augment of an operation uses the resource type's defaults.
+    """
+
+    max_workers = 12
+    # seconds of calls per scalar chunk
+    target_duration = 2.0
+
+    def __init__(self):
+        self.ops = {}
+        self.lock = threading.Lock()
+
+    def get_stats(self, key, workers):
+        stats = self.ops.get(key)
+        if stats is None:
+            with self.lock:
+                stats = self.ops.setdefault(key, DetailStats(workers))
+        return stats
+
+    def schedule(self, manager, key, count, batch=False):
+        """Return the chunk size and concurrency to augment count resources with."""
+        stats = self.get_stats(key, manager.max_workers)
+        with stats.lock:
+            if stats.throttles:
+                stats.workers = max(1, stats.workers // 2)
+            elif stats.calls:
+                stats.workers = min(self.max_workers, stats.workers + 1)
+            stats.calls = stats.throttles = 0
+            workers, latency = stats.workers, stats.latency
+
+        chunk_size = manager.chunk_size
+        if not batch and count > chunk_size:
+            chunk_size = min(chunk_size, math.ceil(count / workers))
+            if latency:
+                chunk_size = min(chunk_size, int(self.target_duration / latency))
+            chunk_size = max(1, chunk_size)
+
+        override = get_augment_override(manager)
+        return override.get('chunk_size', chunk_size), override.get('max_workers', workers)
+
+    def get_snapshot(self, account_id=None, region=None):
+        """Return the current concurrency and latency of detail operations.
+
+        Optionally only those of the given account and region.
+        """
+        return {'.'.join(filter(None, k)): {'workers': s.workers, 'latency': s.latency}
+                for k, s in list(self.ops.items())
+                if account_id in (None, k[0]) and region in (None, k[1])}
+
+
+def get_augment_override(manager):
+    """Return a resource type's augment chunk size and workers from config."""
+    names = (manager.type, 'aws.%s' % manager.type)
+    for value in manager.config.get('augment') or ():
+        rtype, settings = value.split('=', 1)
+        if rtype not in names:
+            continue
+        workers, _, chunk_size = settings.partition(':')
+        override = {'max_workers': int(workers)}
+        if chunk_size:
+            override['chunk_size'] = int(chunk_size)
+        if min(override.values()) < 1:
+            raise PolicyExecutionError(
+                "invalid augment option %s, workers and chunk size must be at least 1" % value)
+        return override
+    return {}
+
+
+AUGMENT_SCHEDULER = AugmentScheduler()
+
+
+def _batch_augment(manager, model, detail_spec, client, resource_set, stats=None):
     detail_op, param_name, param_key, detail_path, detail_args = detail_spec
     op = getattr(client, detail_op)
+    if stats is not None:
+        op = stats.timed(op)
     if manager.retry:
         args = (op,)
         op = manager.retry
@@ -734,9 +1266,11 @@ def _batch_augment(manager, model, detail_spec, client, resource_set):
     return response[detail_path]
 
 
-def _scalar_augment(manager, model, detail_spec, client, resource_set):
+def _scalar_augment(manager, model, detail_spec, client, resource_set, stats=None):
     detail_op, param_name, param_key, detail_path = detail_spec
     op = getattr(client, detail_op)
+    if stats is not None:
+        op = stats.timed(op)
     if manager.retry:
         args = (op,)
         op = manager.retry
@@ -909,6 +1443,9 @@ class TypeInfo(metaclass=TypeMeta):
         if not provided then whole response is merged into the results
 
     :param batch_detail_spec: Used when the api supports getting resource details enmasse
+    :param filter_pushdown: Mapping of resource keys to enum op api filter names, value
+        filters on these keys doing string equality are also sent to the api to reduce
+        the resources fetched. A key of `tag:` denotes support for `tag:<key>` filters.
 
     **Misc - Optional**
 
@@ -972,6 +1509,7 @@ class TypeInfo(metaclass=TypeMeta):
     filter_type = None
     detail_spec = None
     batch_detail_spec = None
+    filter_pushdown = None
 
     # Misc
     default_report_fields = ()
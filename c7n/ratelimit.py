@@ -0,0 +1,166 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Client side rate limiting of aws api calls.
+
+Many threads (resource augmentation, tagging, metrics retrieval) and
+policies call the same apis concurrently, and retry independently
+with backoff once throttled. Instead we track a token bucket per
+credentials, region, service and operation, shared by all threads in
+the process. Buckets are unlimited until an operation is throttled,
+then learn a sustainable rate by additive increase on success and
+multiplicative decrease on throttling.
+
+Rate limits are installed on sessions via botocore event hooks, and
+can be disabled by setting C7N_RATE_LIMIT=no in the environment.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+
+
+log = logging.getLogger('custodian.ratelimit')
+
+RATE_LIMIT = os.environ.get('C7N_RATE_LIMIT', 'yes').lower() not in ('no', 'false')
+
+# as per botocore's standard retry mode
+THROTTLE_CODES = (
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'TransactionInProgressException',
+    'RequestLimitExceeded',
+    'BandwidthLimitExceeded',
+    'LimitExceededException',
+    'RequestThrottled',
+    'SlowDown',
+    'PriorRequestNotComplete',
+    'EC2ThrottledException',
+)
+
+
+class TokenBucket:
+    """Token bucket with an additive increase, multiplicative decrease rate.
+
+    The bucket is unlimited (rate None) until first throttled, at which
+    point its rate starts at a fraction of the recently observed call rate.
+    """
+
+    min_rate = 0.5
+    max_rate = 1000.0
+    # rate increase per second of successful calls
+    increase = 1.0
+    # rate multiplier on throttling
+    decrease = 0.5
+
+    def __init__(self):
+        self.rate = None
+        self.tokens = 0.0
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+        # calls in the current and previous second, for the initial rate.
+        self.window = (int(self.last), 0, 0)
+
+    def _refill(self, now):
+        self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def _count(self, now):
+        second, count, previous = self.window
+        if int(now) == second:
+            self.window = (second, count + 1, previous)
+        else:
+            self.window = (int(now), 1, int(now) == second + 1 and count or 0)
+
+    def acquire(self):
+        """Take a token, blocking until one is available."""
+        with self.lock:
+            now = time.monotonic()
+            self._count(now)
+            if self.rate is None:
+                return 0
+            self._refill(now)
+            self.tokens -= 1
+            # tokens go negative to queue waiters in order
+            delay = self.tokens < 0 and -self.tokens / self.rate or 0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def succeeded(self):
+        with self.lock:
+            if self.rate is not None:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def throttled(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.rate is None:
+                observed = max(self.window[1:])
+                self.rate = max(self.min_rate, observed * self.decrease)
+                self.tokens = 0.0
+                self.last = now
+            else:
+                self._refill(now)
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """Process wide registry of token buckets per api operation."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def get_bucket(self, key):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.setdefault(key, TokenBucket())
+        return bucket
+
+    def get_stats(self):
+        """Return the learned rates of throttled operations."""
+        return {'.'.join(k[1:]): b.rate for k, b in list(self.buckets.items())
+                if b.rate is not None}
+
+    def install(self, session):
+        """Register rate limiting on a boto3 session's clients."""
+        credentials = session.get_credentials()
+        identity = credentials and credentials.access_key or None
+        session.events.register(
+            'before-call.*.*', functools.partial(self._before_call, identity),
+            unique_id='c7n-rate-limit-call')
+        session.events.register(
+            'needs-retry.*.*', functools.partial(self._needs_retry, identity),
+            unique_id='c7n-rate-limit-retry')
+
+    def _get_key(self, identity, model, context):
+        return (identity, context.get('client_region') or '',
+                model.service_model.endpoint_prefix, model.name)
+
+    def _before_call(self, identity, model, context, **kwargs):
+        self.get_bucket(self._get_key(identity, model, context)).acquire()
+
+    def _needs_retry(self, identity, operation, request_dict, response=None, **kwargs):
+        if response is None:
+            return
+        bucket = self.get_bucket(
+            self._get_key(identity, operation, request_dict.get('context', {})))
+        if response[1].get('Error', {}).get('Code') in THROTTLE_CODES:
+            log.debug("throttled on %s.%s", operation.service_model.endpoint_prefix,
+                      operation.name)
+            bucket.throttled()
+            # retries go through the bucket as well
+            bucket.acquire()
+        elif response[0].status_code < 400:
+            bucket.succeeded()
+
+
+RATE_LIMITER = RateLimiter()
@@ -41,10 +41,26 @@ class PluginRegistry:
         self.plugin_type = plugin_type
         self._factories = {}
         self._subscribers = []
+        self._lazy = {}
 
     def subscribe(self, func):
         self._subscribers.append(func)
 
+    def register_lazy(self, name, loader):
+        """Register a loader to invoke on first lookup of a name.
+
+        The loader is expected to register the name, ie. by importing
+        the module that defines it.
+        """
+        if name not in self._factories:
+            self._lazy[name] = loader
+
+    def _load_lazy(self, name=None):
+        for n in (name is None and list(self._lazy) or (name,)):
+            loader = self._lazy.pop(n, None)
+            if loader is not None:
+                loader()
+
     def register(self, name, klass=None, condition=True,
                  condition_message="Missing dependency for {}",
                  aliases=None):
@@ -55,6 +71,7 @@ class PluginRegistry:
             klass.type = name
             klass.type_aliases = aliases
             self._factories[name] = klass
+            self._lazy.pop(name, None)
             return klass
 
         # invoked as class decorator
@@ -62,12 +79,14 @@ class PluginRegistry:
             if not condition:
                 return klass
             self._factories[name] = klass
+            self._lazy.pop(name, None)
             klass.type = name
             klass.type_aliases = aliases
             return klass
         return _register_class
 
     def unregister(self, name):
+        self._lazy.pop(name, None)
         if name in self._factories:
             del self._factories[name]
 
@@ -76,6 +95,7 @@ class PluginRegistry:
             subscriber(self, key)
 
     def __contains__(self, key):
+        self._load_lazy(key)
         return key in self._factories
 
     def __getitem__(self, name):
@@ -85,9 +105,10 @@ class PluginRegistry:
         return v
 
     def __len__(self):
-        return len(self._factories)
+        return len(self._factories) + len(self._lazy)
 
     def get(self, name):
+        self._load_lazy(name)
         factory = self._factories.get(name)
 
         if factory:
@@ -98,10 +119,17 @@ class PluginRegistry:
                     None)
 
     def keys(self):
+        self._load_lazy()
+        return self._factories.keys()
+
+    def loaded_keys(self):
+        """Return the names of loaded plugins, without loading lazy ones."""
         return self._factories.keys()
 
     def values(self):
+        self._load_lazy()
         return self._factories.values()
 
     def items(self):
+        self._load_lazy()
         return self._factories.items()
@@ -62,12 +62,11 @@ def load_available(resources=True):
 def load_providers(provider_types):
     global LOADED
 
-    # Even though we're lazy loading resources we still need to import
-    # those that are making available generic filters/actions
+    # Modules making available generic modes/filters/actions are
+    # imported on first use, per the provider's lazy elements.
     if should_load_provider('aws', provider_types):
-        import c7n.resources.securityhub
-        import c7n.resources.sfn
-        import c7n.resources.ssm # NOQA
+        from c7n.resources.aws import AWS
+        AWS.register_lazy_modes()
 
     if should_load_provider('awscc', provider_types):
         from c7n_awscc.entry import initialize_awscc
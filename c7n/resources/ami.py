@@ -61,6 +61,14 @@ class AMI(QueryResourceManager):
         name = 'Name'
         date = 'CreationDate'
         id_prefix = "ami-"
+        filter_pushdown = {
+            'State': 'state',
+            'Architecture': 'architecture',
+            'ImageType': 'image-type',
+            'RootDeviceType': 'root-device-type',
+            'VirtualizationType': 'virtualization-type',
+            'tag:': 'tag:',
+        }
 
     source_mapping = {
         'describe': DescribeImageSource
@@ -592,14 +600,15 @@ class ImageUnusedFilter(Filter):
             for m in ('asg', 'launch-config', 'ec2')]))
 
     def _pull_asg_images(self):
-        asgs = self.manager.get_resource_manager('asg').resources()
+        graph = self.manager.ctx.graph
+        asgs = graph.resources(self.manager.get_resource_manager('asg'))
         image_ids = set()
         lcfgs = set(a['LaunchConfigurationName'] for a in asgs if 'LaunchConfigurationName' in a)
         lcfg_mgr = self.manager.get_resource_manager('launch-config')
 
         if lcfgs:
             image_ids.update([
-                lcfg['ImageId'] for lcfg in lcfg_mgr.resources()
+                lcfg['ImageId'] for lcfg in graph.resources(lcfg_mgr)
                 if lcfg['LaunchConfigurationName'] in lcfgs])
 
         tmpl_mgr = self.manager.get_resource_manager('launch-template-version')
@@ -609,8 +618,8 @@ class ImageUnusedFilter(Filter):
         return image_ids
 
     def _pull_ec2_images(self):
-        ec2_manager = self.manager.get_resource_manager('ec2')
-        return {i['ImageId'] for i in ec2_manager.resources()}
+        return self.manager.ctx.graph.get_referenced(
+            self.manager.get_resource_manager('ec2'), 'images', lambda i: [i['ImageId']])
 
     def process(self, resources, event=None):
         images = self._pull_ec2_images().union(self._pull_asg_images())
@@ -1843,9 +1843,10 @@ class UnusedLaunchConfig(Filter):
         return self.manager.get_resource_manager('asg').get_permissions()
 
     def process(self, configs, event=None):
-        asgs = self.manager.get_resource_manager('asg').resources()
-        used = {a.get('LaunchConfigurationName', a['AutoScalingGroupName'])
-                for a in asgs if not a.get('LaunchTemplate')}
+        used = self.manager.ctx.graph.get_referenced(
+            self.manager.get_resource_manager('asg'), 'launch-configs',
+            lambda a: not a.get('LaunchTemplate') and [
+                a.get('LaunchConfigurationName', a['AutoScalingGroupName'])] or ())
         return [c for c in configs if c['LaunchConfigurationName'] not in used]
 
 
@@ -16,6 +16,7 @@ import sys
 import time
 import threading
 import traceback
+import weakref
 from urllib import parse as urlparse
 from urllib.request import urlopen, Request
 from urllib.error import HTTPError, URLError
@@ -51,7 +52,7 @@ from c7n.output import (
 )
 
 from c7n.registry import PluginRegistry
-from c7n import credentials, utils
+from c7n import credentials, ratelimit, utils
 
 log = logging.getLogger('custodian.aws')
 
@@ -647,12 +648,23 @@ class XrayTracer:
         self.metadata.clear()
 
 
+# connections opened per urllib3 pool, as of the last response seen from it
+_pool_connections = weakref.WeakKeyDictionary()
+_pool_lock = threading.Lock()
+
+
 @api_stats_outputs.register('aws')
 class ApiStats(DeltaStats):
 
     def __init__(self, ctx, config=None):
         super(ApiStats, self).__init__(ctx, config)
         self.api_calls = Counter()
+        # new connections opened per service
+        self.connections = Counter()
+        # timed calls of, seconds spent in, and botocore retries of each operation
+        self.timed = Counter()
+        self.latency = Counter()
+        self.retries = Counter()
 
     def get_snapshot(self):
         return dict(self.api_calls)
@@ -671,20 +683,88 @@ class ApiStats(DeltaStats):
 
         # With cached sessions, we need to unregister any events subscribers
         # on extant sessions to allow for the next registration.
-        utils.local_session(self.ctx.session_factory).events.unregister(
+        session = utils.local_session(self.ctx.session_factory)
+        session.events.unregister(
+            'before-call.*.*', self._start, unique_id='c7n-api-stats-start')
+        session.events.unregister(
             'after-call.*.*', self._record, unique_id='c7n-api-stats')
 
         self.ctx.metrics.put_metric(
             "ApiCalls", sum(self.api_calls.values()), "Count")
+        if self.connections:
+            self.ctx.metrics.put_metric(
+                "ApiConnections", sum(self.connections.values()), "Count")
         self.pop_snapshot()
 
     def __call__(self, s):
+        s.events.register(
+            'before-call.*.*', self._start, unique_id='c7n-api-stats-start')
         s.events.register(
             'after-call.*.*', self._record, unique_id='c7n-api-stats')
 
-    def _record(self, http_response, parsed, model, **kwargs):
-        self.api_calls["%s.%s" % (
-            model.service_model.endpoint_prefix, model.name)] += 1
+    def _start(self, context, **kwargs):
+        context['c7n-api-start'] = time.monotonic()
+
+    def _record(self, http_response, parsed, model, context=None, **kwargs):
+        service = model.service_model.endpoint_prefix
+        operation = "%s.%s" % (service, model.name)
+        self.api_calls[operation] += 1
+
+        start = (context or {}).get('c7n-api-start')
+        if start is not None:
+            self.timed[operation] += 1
+            self.latency[operation] += time.monotonic() - start
+        retries = (parsed or {}).get('ResponseMetadata', {}).get('RetryAttempts', 0)
+        if retries:
+            self.retries[operation] += retries
+
+        pool = getattr(getattr(http_response, 'raw', None), '_pool', None)
+        if pool is None:
+            return
+        with _pool_lock:
+            opened = pool.num_connections
+            if opened > _pool_connections.get(pool, 0):
+                self.connections[service] += opened - _pool_connections.get(pool, 0)
+                _pool_connections[pool] = opened
+
+    def get_operation_stats(self):
+        """Return the calls, mean latency (ms) and retries per timed operation."""
+        return {
+            operation: {
+                'calls': self.api_calls[operation],
+                'latency': round(elapsed * 1000 / self.timed[operation], 2),
+                'retries': self.retries[operation]}
+            for operation, elapsed in self.latency.items()}
+
+    def get_connection_stats(self):
+        """Return the api calls, and new and reused connections per service.
+
+        Connections are reused for calls on a client's pooled, kept alive
+        connections, while new connections require a tcp and tls handshake.
+        """
+        calls = Counter()
+        for k, v in self.api_calls.items():
+            calls[k.split('.', 1)[0]] += v
+        return {
+            service: {
+                'calls': count,
+                'connections': self.connections[service],
+                'reused': max(0, count - self.connections[service])}
+            for service, count in calls.items()}
+
+    def get_augment_stats(self):
+        """Return the augment concurrency and latency of detail operations.
+
+        Limited to operations in the run's account and region.
+        """
+        from c7n.query import AUGMENT_SCHEDULER
+        return AUGMENT_SCHEDULER.get_snapshot(
+            self.ctx.options.account_id, self.ctx.options.region)
+
+    def get_rate_limit_stats(self):
+        """Return the learned rates of throttled operations called in the run."""
+        return {k: rate for k, rate in ratelimit.RATE_LIMITER.get_stats().items()
+                if k.split('.', 1)[-1] in self.api_calls}
 
 
 @blob_outputs.register('s3')
@@ -731,6 +811,17 @@ class AWS(Provider):
     resources = PluginRegistry('resources')
     # import paths for resources
     resource_map = ResourceMap
+    lazy_elements = {
+        'c7n.resources.securityhub': {
+            'modes': ('hub-finding', 'hub-action'),
+            'filters': ('finding',),
+            'actions': ('post-finding',)},
+        'c7n.resources.sfn': {
+            'actions': ('invoke-sfn',)},
+        'c7n.resources.ssm': {
+            'filters': ('ops-item',),
+            'actions': ('post-item', 'send-command')},
+    }
 
     def initialize(self, options):
         """
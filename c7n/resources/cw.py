@@ -557,18 +557,21 @@ class EventRuleTargetQuery(query.ChildResourceQuery):
             parent_resources.append((p))
 
         # Have to query separately for each parent's children.
-        results = []
-        for parent in parent_resources:
-            params['EventBusName'] = parent['EventBusName']
-            merged_params = self.get_parent_parameters(params, parent['Name'], parent_key)
-            subset = self._invoke_client_enum(
-                client, enum_op, merged_params, path, retry=self.manager.retry)
+        def get_children(parent):
+            merged_params = self.get_parent_parameters(
+                dict(params, EventBusName=parent['EventBusName']), parent['Name'], parent_key)
+            subset = self.get_children(
+                client, enum_op, merged_params, path,
+                "%s/%s" % (parent['EventBusName'], parent['Name']))
             if annotate_parent:
                 for r in subset:
                     r[self.parent_key] = parent['Name']
                     r[parent_key] = parent
-            if subset:
-                results.extend(subset)
+            return subset
+
+        results = []
+        for subset in self.map_parents(get_children, parent_resources):
+            results.extend(subset)
         return results
 
     def get_parent_parameters(self, params, parent_id, parent_key):
@@ -54,6 +54,11 @@ class Snapshot(QueryResourceManager):
         filter_type = 'list'
         name = 'SnapshotId'
         date = 'StartTime'
+        filter_pushdown = {
+            'State': 'status',
+            'VolumeId': 'volume-id',
+            'tag:': 'tag:',
+        }
 
         default_report_fields = (
             'SnapshotId',
@@ -260,6 +265,12 @@ class SnapshotCrossAccountAccess(CrossAccountAccessFilter):
         return results
 
 
+def get_block_device_snapshots(resource):
+    """Return the ids of snapshots referenced by a resource's block device mappings."""
+    return [b['Ebs']['SnapshotId'] for b in resource.get('BlockDeviceMappings') or ()
+            if 'Ebs' in b and 'SnapshotId' in b['Ebs']]
+
+
 @Snapshot.filter_registry.register('unused')
 class SnapshotUnusedFilter(Filter):
     """Filters snapshots based on usage
@@ -288,33 +299,26 @@ class SnapshotUnusedFilter(Filter):
             for m in ('asg', 'launch-config', 'ami')]))
 
     def _pull_asg_snapshots(self):
-        asgs = self.manager.get_resource_manager('asg').resources()
+        graph = self.manager.ctx.graph
+        asgs = graph.resources(self.manager.get_resource_manager('asg'))
         snap_ids = set()
         lcfgs = set(a['LaunchConfigurationName'] for a in asgs if 'LaunchConfigurationName' in a)
         lcfg_mgr = self.manager.get_resource_manager('launch-config')
 
         if lcfgs:
-            for lc in lcfg_mgr.resources():
-                for b in lc.get('BlockDeviceMappings'):
-                    if 'Ebs' in b and 'SnapshotId' in b['Ebs']:
-                        snap_ids.add(b['Ebs']['SnapshotId'])
+            snap_ids.update(graph.get_referenced(
+                lcfg_mgr, 'block-device-snapshots', get_block_device_snapshots))
 
         tmpl_mgr = self.manager.get_resource_manager('launch-template-version')
         for tversion in tmpl_mgr.get_resources(
                 list(tmpl_mgr.get_asg_templates(asgs).keys())):
-            for bd in tversion['LaunchTemplateData'].get('BlockDeviceMappings', ()):
-                if 'Ebs' in bd and 'SnapshotId' in bd['Ebs']:
-                    snap_ids.add(bd['Ebs']['SnapshotId'])
+            snap_ids.update(get_block_device_snapshots(tversion['LaunchTemplateData']))
         return snap_ids
 
     def _pull_ami_snapshots(self):
-        amis = self.manager.get_resource_manager('ami').resources()
-        ami_snaps = set()
-        for i in amis:
-            for dev in i.get('BlockDeviceMappings'):
-                if 'Ebs' in dev and 'SnapshotId' in dev['Ebs']:
-                    ami_snaps.add(dev['Ebs']['SnapshotId'])
-        return ami_snaps
+        return self.manager.ctx.graph.get_referenced(
+            self.manager.get_resource_manager('ami'),
+            'block-device-snapshots', get_block_device_snapshots)
 
     def process(self, resources, event=None):
         snaps = self._pull_asg_snapshots().union(self._pull_ami_snapshots())
@@ -655,6 +659,13 @@ class EBS(QueryResourceManager):
         dimension = 'VolumeId'
         metrics_namespace = 'AWS/EBS'
         cfn_type = config_type = "AWS::EC2::Volume"
+        filter_pushdown = {
+            'State': 'status',
+            'VolumeType': 'volume-type',
+            'AvailabilityZone': 'availability-zone',
+            'SnapshotId': 'snapshot-id',
+            'tag:': 'tag:',
+        }
         default_report_fields = (
             'VolumeId',
             'Attachments[0].InstanceId',
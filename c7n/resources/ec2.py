@@ -127,6 +127,16 @@ class EC2(query.QueryResourceManager):
         cfn_type = config_type = "AWS::EC2::Instance"
         id_prefix = 'i-'
         permissions_augment = ('ec2:DescribeTags',)
+        filter_pushdown = {
+            'State.Name': 'instance-state-name',
+            'InstanceType': 'instance-type',
+            'ImageId': 'image-id',
+            'KeyName': 'key-name',
+            'VpcId': 'vpc-id',
+            'SubnetId': 'subnet-id',
+            'Placement.AvailabilityZone': 'availability-zone',
+            'tag:': 'tag:',
+        }
 
         default_report_fields = (
             'CustodianDate',
@@ -816,8 +816,9 @@ class IamRoleUsage(Filter):
         return results
 
     def scan_lambda_roles(self):
-        manager = self.manager.get_resource_manager('lambda')
-        return [r['Role'] for r in manager.resources() if 'Role' in r]
+        return self.manager.ctx.graph.get_referenced(
+            self.manager.get_resource_manager('lambda'), 'roles',
+            lambda r: 'Role' in r and [r['Role']] or ())
 
     def scan_ecs_roles(self):
         results = []
@@ -850,23 +851,22 @@ class IamRoleUsage(Filter):
         return results
 
     def scan_asg_roles(self):
-        manager = self.manager.get_resource_manager('launch-config')
-        return [r['IamInstanceProfile'] for r in manager.resources() if (
-            'IamInstanceProfile' in r)]
+        return self.manager.ctx.graph.get_referenced(
+            self.manager.get_resource_manager('launch-config'), 'instance-profiles',
+            lambda r: 'IamInstanceProfile' in r and [r['IamInstanceProfile']] or ())
 
     def scan_ec2_roles(self):
-        manager = self.manager.get_resource_manager('ec2')
-        results = []
-        for e in manager.resources():
+        def refs(e):
             # do not include instances that have been recently terminated
             if e['State']['Name'] == 'terminated':
-                continue
+                return ()
             profile_arn = e.get('IamInstanceProfile', {}).get('Arn', None)
             if not profile_arn:
-                continue
+                return ()
             # split arn to get the profile name
-            results.append(profile_arn.split('/')[-1])
-        return results
+            return [profile_arn.split('/')[-1]]
+        return self.manager.ctx.graph.get_referenced(
+            self.manager.get_resource_manager('ec2'), 'instance-profiles', refs)
 
 
 ###################
@@ -33,6 +33,7 @@ import itertools
 import logging
 import math
 import os
+import re
 import time
 import ssl
 
@@ -54,6 +55,7 @@ from c7n.exceptions import PolicyValidationError, PolicyExecutionError
 from c7n.filters import (
     FilterRegistry, Filter, CrossAccountAccessFilter, MetricsFilter,
     ValueFilter, ListItemFilter)
+from c7n.filters.core import BooleanGroupFilter, EventFilter
 from .aws import shape_validate
 from c7n.filters.policystatement import HasStatementFilter
 from c7n.manager import resources
@@ -76,14 +78,18 @@ actions.register('put-metric', PutMetric)
 
 MAX_COPY_SIZE = 1024 * 1024 * 1024 * 2
 
+# Only fetch the bucket attributes referenced by a policy's filters and actions.
+LAZY_AUGMENT = os.environ.get('C7N_S3_LAZY_AUGMENT', 'yes').lower() not in ('no', 'false')
+
 
 class DescribeS3(query.DescribeSource):
 
     def augment(self, buckets):
+        keys = self.manager.get_augment_keys()
         with self.manager.executor_factory(
                 max_workers=min((10, len(buckets) + 1))) as w:
             results = w.map(
-                assemble_bucket,
+                functools.partial(assemble_bucket, keys=keys),
                 zip(itertools.repeat(self.manager.session_factory), buckets))
             results = list(filter(None, results))
             return results
@@ -393,6 +399,30 @@ class S3(query.QueryResourceManager):
     def get_arns(self, resources):
         return ["arn:aws:s3:::{}".format(r["Name"]) for r in resources]
 
+    def get_augment_keys(self):
+        """Return the augment table keys the policy's filters and actions
+        reference, or None if all of them are needed.
+
+        Only the policy's own resources are partially augmented, resources
+        fetched on behalf of another resource's filters, or for policies
+        without filters or actions that just record them, are augmented
+        in full.
+        """
+        policy = getattr(self.ctx, 'policy', None)
+        if (not LAZY_AUGMENT or self.source_type != 'describe' or
+                policy is None or self.data != policy.data or
+                not (self.filters or self.actions)):
+            return None
+        return get_augment_keys(itertools.chain(self.filters, self.actions))
+
+    def get_cache_key(self, query):
+        key = super().get_cache_key(query)
+        keys = self.get_augment_keys()
+        # partially augmented buckets can't be shared with other policies
+        if keys is not None:
+            key['augment'] = sorted(keys)
+        return key
+
     @classmethod
     def get_permissions(cls):
         perms = ["s3:ListAllMyBuckets"]
@@ -431,9 +461,73 @@ S3_AUGMENT_TABLE = (
 )
 
 
-def assemble_bucket(item):
+def get_augment_keys(elements):
+    """Return the augment table keys referenced by filters and actions.
+
+    Value filters reference the attribute their key starts with, other
+    elements the keys listed for their class in S3_AUGMENT_REFERENCES.
+    Returns None if any element may reference any key.
+    """
+    keys = set()
+    for e in elements:
+        if isinstance(e, BooleanGroupFilter):
+            refs = get_augment_keys(e.filters)
+        elif type(e) in (ValueFilter, ListItemFilter):
+            refs = get_value_filter_augment_keys(e.data)
+        else:
+            refs = S3_AUGMENT_REFERENCES.get(type(e))
+        if refs is None:
+            return None
+        keys.update(refs)
+    return keys
+
+
+def get_value_filter_augment_keys(data):
+    """Return the augment table keys a value filter evaluates on the bucket.
+
+    Besides its key, an expr value type and a value_path are evaluated
+    against the bucket as well.
+    """
+    # including the {key: value} shorthand
+    if len(data) == 1:
+        return get_value_augment_keys(list(data)[0])
+    paths = [data.get('key')]
+    if data.get('value_type') == 'expr':
+        paths.append(data.get('value'))
+    if 'value_path' in data:
+        paths.append(data['value_path'])
+    keys = set()
+    for path in paths:
+        refs = get_value_augment_keys(path)
+        if refs is None:
+            return None
+        keys.update(refs)
+    return keys
+
+
+# a single attribute path, ie. Versioning.Status or Acl.Grants[0].Permission
+VALUE_PATH = re.compile(r'^([A-Za-z_]\w*)(\.[A-Za-z_]\w*|\[-?\d*\]|\[\*\])*$')
+
+
+def get_value_augment_keys(key):
+    if not isinstance(key, str):
+        return None
+    if key.startswith('tag:'):
+        return ('Tags',)
+    match = VALUE_PATH.match(key)
+    # functions, multiple paths, filter projections and quoted identifiers
+    # may reference anything
+    if match is None:
+        return None
+    return [m[1] for m in S3_AUGMENT_TABLE if m[1] == match.group(1)]
+
+
+def assemble_bucket(item, keys=None):
     """Assemble a document representing all the config state around a bucket.
 
+    With keys, only those attributes of the augment table are fetched,
+    along with the bucket location.
+
     TODO: Refactor this, the logic here feels quite muddled.
     """
     factory, b = item
@@ -441,7 +535,8 @@ def assemble_bucket(item):
     c = s.client('s3')
     # Bucket Location, Current Client Location, Default Location
     b_location = c_location = location = "us-east-1"
-    methods = list(S3_AUGMENT_TABLE)
+    methods = [m for m in S3_AUGMENT_TABLE
+               if keys is None or m[1] == 'Location' or m[1] in keys]
     for minfo in methods:
         m, k, default, select = minfo[:4]
         try:
@@ -3881,6 +3976,53 @@ class BucketReplication(ListItemFilter):
         replication['CrossRegion'] = destination_region != source_region
 
 
+# Augment table keys referenced by filters and actions other than value
+# filters, elements not listed here may reference any key.
+S3_AUGMENT_REFERENCES = {
+    # filters
+    EventFilter: (),
+    TagActionFilter: ('Tags',),
+    S3Metrics: (),
+    S3CrossAccountFilter: ('Policy',),
+    GlobalGrantsFilter: ('Acl', 'Website'),
+    S3HasStatementFilter: ('Policy',),
+    S3LockConfigurationFilter: (),
+    EncryptionEnabledFilter: ('Policy',),
+    MissingPolicyStatementFilter: ('Policy',),
+    BucketNotificationFilter: ('Notification',),
+    BucketLoggingFilter: ('Logging',),
+    FilterPublicBlock: (),
+    LogTarget: ('Logging',),
+    DataEvents: (),
+    Inventory: (),
+    IntelligentTiering: (),
+    BucketEncryption: (),
+    BucketOwnershipControls: (),
+    BucketReplication: ('Replication',),
+    # actions
+    NoOp: (),
+    DeleteBucketNotification: ('Notification',),
+    SetPolicyStatement: ('Policy',),
+    RemovePolicyStatement: ('Policy',),
+    SetBucketReplicationConfig: (),
+    SetPublicBlock: (),
+    ToggleVersioning: ('Versioning',),
+    ToggleLogging: ('Logging',),
+    EncryptionRequiredPolicy: ('Policy',),
+    EncryptExtantKeys: ('Versioning',),
+    RemoveWebsiteHosting: (),
+    DeleteGlobalGrants: ('Acl', 'Website'),
+    BucketTag: ('Tags',),
+    MarkBucketForOp: ('Tags',),
+    RemoveBucketTag: ('Tags',),
+    SetInventory: (),
+    ConfigureIntelligentTiering: (),
+    DeleteBucket: ('Replication', 'Versioning'),
+    Lifecycle: ('Lifecycle',),
+    SetBucketEncryption: (),
+}
+
+
 @resources.register('s3-directory')
 class S3Directory(query.QueryResourceManager):
 
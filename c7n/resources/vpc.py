@@ -978,6 +978,15 @@ class SGUsage(Filter):
             ("batch", self.get_batch_sgs),
         )
 
+    def get_graph_resources(self, resource_type, augment=True):
+        return self.manager.ctx.graph.resources(
+            self.manager.get_resource_manager(resource_type), augment=augment)
+
+    def get_referenced(self, resource_type, refs, augment=True):
+        return self.manager.ctx.graph.get_referenced(
+            self.manager.get_resource_manager(resource_type),
+            'security-groups', refs, augment=augment)
+
     def scan_groups(self):
         used = set()
         for kind, scanner in self.get_scanners():
@@ -993,63 +1002,44 @@ class SGUsage(Filter):
     def get_launch_config_sgs(self):
         # Note assuming we also have launch config garbage collection
         # enabled.
-        sg_ids = set()
-        for cfg in self.manager.get_resource_manager('launch-config').resources():
-            for g in cfg['SecurityGroups']:
-                sg_ids.add(g)
-            for g in cfg['ClassicLinkVPCSecurityGroups']:
-                sg_ids.add(g)
-        return sg_ids
+        return self.get_referenced(
+            'launch-config',
+            lambda cfg: cfg['SecurityGroups'] + cfg['ClassicLinkVPCSecurityGroups'])
 
     def get_lambda_sgs(self):
-        sg_ids = set()
-        for func in self.manager.get_resource_manager('lambda').resources(augment=False):
-            if 'VpcConfig' not in func:
-                continue
-            for g in func['VpcConfig']['SecurityGroupIds']:
-                sg_ids.add(g)
-        return sg_ids
+        return self.get_referenced(
+            'lambda',
+            lambda func: func.get('VpcConfig', {}).get('SecurityGroupIds'),
+            augment=False)
 
     def get_eni_sgs(self):
-        sg_ids = set()
-        self.nics = self.manager.get_resource_manager('eni').resources()
-        for nic in self.nics:
-            for g in nic['Groups']:
-                sg_ids.add(g['GroupId'])
-        return sg_ids
+        return self.get_referenced(
+            'eni', lambda nic: [g['GroupId'] for g in nic['Groups']])
 
     def get_codebuild_sgs(self):
-        sg_ids = set()
-        for cb in self.manager.get_resource_manager('codebuild').resources():
-            sg_ids |= set(cb.get('vpcConfig', {}).get('securityGroupIds', []))
-        return sg_ids
+        return self.get_referenced(
+            'codebuild', lambda cb: cb.get('vpcConfig', {}).get('securityGroupIds'))
 
     def get_sg_refs(self):
-        sg_ids = set()
-        for sg in self.manager.get_resource_manager('security-group').resources():
+        def refs(sg):
+            sg_ids = set()
             for perm_type in ('IpPermissions', 'IpPermissionsEgress'):
                 for p in sg.get(perm_type, []):
                     for g in p.get('UserIdGroupPairs', ()):
                         # self references aren't usage.
                         if g['GroupId'] != sg['GroupId']:
                             sg_ids.add(g['GroupId'])
-        return sg_ids
+            return sg_ids
+        return self.get_referenced('security-group', refs)
 
     def get_ecs_cwe_sgs(self):
-        sg_ids = set()
         expr = jmespath_compile(
             'EcsParameters.NetworkConfiguration.awsvpcConfiguration.SecurityGroups[]')
-        for rule in self.manager.get_resource_manager(
-                'event-rule-target').resources(augment=False):
-            ids = expr.search(rule)
-            if ids:
-                sg_ids.update(ids)
-        return sg_ids
+        return self.get_referenced('event-rule-target', expr.search, augment=False)
 
     def get_batch_sgs(self):
-        expr = jmespath_compile('[].computeResources.securityGroupIds[]')
-        resources = self.manager.get_resource_manager('aws.batch-compute').resources(augment=False)
-        return set(expr.search(resources) or [])
+        expr = jmespath_compile('computeResources.securityGroupIds[]')
+        return self.get_referenced('aws.batch-compute', expr.search, augment=False)
 
 
 @SecurityGroup.filter_registry.register('unused')
@@ -1144,6 +1134,11 @@ class UsedSecurityGroup(SGUsage):
     interface_type_key = 'c7n:InterfaceTypes'
     interface_resource_type_key = 'c7n:InterfaceResourceTypes'
 
+    def get_eni_sgs(self):
+        # eni attributes are annotated for used groups.
+        self.nics = self.get_graph_resources('eni')
+        return super().get_eni_sgs()
+
     def _get_eni_attributes(self):
         group_enis = {}
         for nic in self.nics:
@@ -0,0 +1,97 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Concurrent policy execution.
+
+Policy execution time is typically dominated by waiting on the network,
+the scheduler runs independent policies on a worker pool while bounding
+the number of policies concurrently querying a given service in a
+region, to avoid throttling ourselves.
+"""
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, wait
+import copy
+import logging
+
+from c7n.executor import ThreadPoolExecutor
+
+log = logging.getLogger('custodian.scheduler')
+
+
+class PolicyScheduler:
+    """Run policies on a worker pool with per (service, region) budgets.
+
+    Policies which don't execute in pull mode (ie. provisioning
+    serverless policies) share a single budget and are executed one at
+    a time.
+    """
+
+    executor_factory = ThreadPoolExecutor
+
+    def __init__(self, policies, max_workers=4, service_limit=2):
+        self.policies = policies
+        self.max_workers = max_workers
+        self.service_limit = service_limit
+
+    @staticmethod
+    def get_budget_key(policy):
+        if not (policy.execution_mode == 'pull' or policy.options.dryrun):
+            return None
+        service = getattr(
+            policy.resource_manager.resource_type, 'service', None) or policy.resource_type
+        return (policy.provider_name, service, policy.options.region)
+
+    def get_budget(self, key):
+        if key is None:
+            return 1
+        return self.service_limit
+
+    @staticmethod
+    def isolate(policy):
+        """Give the policy its own session factory.
+
+        Execution contexts set the policy name and api stats subscribers
+        on the session factory, which is otherwise shared by all policies
+        in a collection.
+
+        The policy's resource manager is kept, as its filters and actions
+        hold state set during validation, only its references to the
+        session factory are updated.
+        """
+        policy.session_factory = copy.copy(policy.session_factory)
+        policy.ctx.session_factory = policy.session_factory
+        manager = policy.resource_manager
+        manager.session_factory = policy.session_factory
+        if getattr(manager, 'source', None) is not None:
+            manager.source = manager.get_source(manager.source_type)
+
+    def run(self, func):
+        """Execute func on each policy, yields (policy, future) as each completes.
+
+        Closing the generator stops scheduling of pending policies, after
+        waiting on any that are currently executing.
+        """
+        for p in self.policies:
+            self.isolate(p)
+
+        pending = deque(self.policies)
+        running = {}
+        active = Counter()
+
+        with self.executor_factory(max_workers=self.max_workers) as w:
+            while pending or running:
+                for p in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    key = self.get_budget_key(p)
+                    if active[key] >= self.get_budget(key):
+                        continue
+                    pending.remove(p)
+                    active[key] += 1
+                    running[w.submit(func, p)] = (p, key)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for f in done:
+                    p, key = running.pop(f)
+                    active[key] -= 1
+                    yield p, f
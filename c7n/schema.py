@@ -15,9 +15,14 @@ All filters and actions are annotated with schema typically using
 the utils.type_schema function.
 """
 from collections import Counter
+import functools
+import glob
+import hashlib
 import json
 import inspect
 import logging
+import os
+import sys
 
 from jsonschema import Draft7Validator as JsonSchemaValidator
 from jsonschema.exceptions import best_match
@@ -25,8 +30,9 @@ from jsonschema.exceptions import best_match
 from c7n.policy import execution
 from c7n.provider import clouds
 from c7n.query import sources
-from c7n.resources import load_available
+from c7n.resources import load_available, load_resources
 from c7n.resolver import ValuesFrom
+from c7n.version import version
 from c7n.filters.core import (
     ValueFilter,
     EventFilter,
@@ -36,6 +42,13 @@ from c7n.filters.core import (
 )
 from c7n.structure import StructureParser # noqa
 
+log = logging.getLogger('custodian.schema')
+
+# per provider schemas, built at packaging time
+ARTIFACT_DIR = os.path.join(os.path.dirname(__file__), 'schemas')
+USE_ARTIFACT = os.environ.get(
+    'C7N_SCHEMA_ARTIFACT', 'yes').lower() not in ('no', 'false')
+
 
 def is_c7n_placeholder(instance):
     """Is this schema element a Custodian variable placeholder?
@@ -55,12 +68,11 @@ def is_c7n_placeholder(instance):
 
 def validate(data, schema=None, resource_types=()):
     if schema is None:
-        schema = generate(resource_types)
-        JsonSchemaValidator.check_schema(schema)
-
-    validator = JsonSchemaValidator(schema)
+        found = iter_errors(data, resource_types)
+    else:
+        found = JsonSchemaValidator(schema).iter_errors(data)
     errors = []
-    for error in validator.iter_errors(data):
+    for error in found:
         try:
             error = specific_error(error)
 
@@ -111,6 +123,15 @@ def policy_error_scope(error, data):
     return error
 
 
+def policy_error_name(error, data):
+    """Return the name of the policy a schema error is within."""
+    err_path = list(error.absolute_path)
+    if len(err_path) < 2 or err_path[0] != 'policies':
+        return 'unknown'
+    pdata = data['policies'][err_path[1]]
+    return isinstance(pdata, dict) and pdata.get('name', 'unknown') or 'unknown'
+
+
 def specific_error(error):
     """Try to find the best error for humans to resolve
 
@@ -356,6 +377,220 @@ def get_default_definitions(resource_defs):
     }
 
 
+def get_validator(resource_types=()):
+    """Return a validator for the given resource types, or all loaded ones.
+
+    Validators are cached, per resource types and the vocabulary of
+    the registries. The schema is loaded from the provider's artifact
+    when its vocabulary matches, and generated otherwise, ie. when
+    plugins register additional resources, filters or actions.
+    """
+    if not resource_types:
+        resource_types = ["%s.%s" % (cname, rname) for cname, ctype in clouds.items()
+                          for rname in ctype.resources.keys()]
+    vocabulary = get_vocabulary(resource_types)
+    return _get_validator(
+        tuple(sorted(resource_types)), json.dumps(vocabulary, sort_keys=True))
+
+
+@functools.lru_cache(maxsize=32)
+def _get_validator(resource_types, vocabulary):
+    return JsonSchemaValidator(_get_schema(resource_types, vocabulary))
+
+
+def _get_schema(resource_types, vocabulary):
+    schema = USE_ARTIFACT and load_artifact(json.loads(vocabulary)) or None
+    if schema is None:
+        schema = generate(resource_types)
+        JsonSchemaValidator.check_schema(schema)
+    return schema
+
+
+def get_policy_validator(resource_type):
+    """Return a validator for policies of a qualified resource type."""
+    vocabulary = get_vocabulary((resource_type,))
+    return _get_policy_validator(resource_type, json.dumps(vocabulary, sort_keys=True))
+
+
+@functools.lru_cache(maxsize=256)
+def _get_policy_validator(resource_type, vocabulary):
+    schema = _get_schema((resource_type,), vocabulary)
+    ref = '#/definitions/resources/%s/policy' % resource_type
+    if {'$ref': ref} not in schema['properties']['policies']['items'].get('anyOf', ()):
+        return None
+    return JsonSchemaValidator({'definitions': schema['definitions'], '$ref': ref})
+
+
+def get_resource_map():
+    """Map the resource names and aliases usable in policies to qualified types."""
+    resource_map = {}
+    for cname, ctype in clouds.items():
+        for rname, resource_type in ctype.resources.items():
+            qualified = "%s.%s" % (cname, rname)
+            for name in (rname,) + tuple(resource_type.type_aliases or ()):
+                resource_map["%s.%s" % (cname, name)] = qualified
+                # aws gets legacy names with no cloud prefix
+                if cname == 'aws':
+                    resource_map[name] = qualified
+    return resource_map
+
+
+def iter_errors(data, resource_types=()):
+    """Yield the schema errors of policy data.
+
+    Rather than validating each policy against the anyOf of every
+    resource type's policy schema, policies are dispatched on their
+    resource to a validator for that type. Besides being faster, errors
+    are then specific to the policy's resource type. Policies whose
+    resource isn't a loaded type are validated against the anyOf.
+    """
+    validator = get_validator(resource_types)
+    policies = isinstance(data, dict) and data.get('policies') or None
+    if not isinstance(policies, list):
+        yield from validator.iter_errors(data)
+        return
+
+    yield from validator.iter_errors(dict(data, policies=[]))
+    resource_map = get_resource_map()
+    for idx, policy in enumerate(policies):
+        resource = isinstance(policy, dict) and policy.get('resource') or None
+        policy_validator = isinstance(resource, str) and resource in resource_map and (
+            get_policy_validator(resource_map[resource])) or None
+        if policy_validator is None:
+            for error in validator.iter_errors({'policies': [policy]}):
+                if len(error.path) > 1:
+                    error.path[1] = idx
+                yield error
+            continue
+        for error in policy_validator.iter_errors(policy):
+            error.path.extendleft((idx, 'policies'))
+            yield error
+
+
+def get_vocabulary(resource_types):
+    """Return the modes, sources and resource elements loaded for resource types.
+
+    Lazy registry entries aren't loaded, they're either in a provider's
+    artifact or don't register for the resource type.
+    """
+    resources = {}
+    for rtype in resource_types:
+        cname, rname = rtype.split('.', 1)
+        resource_type = cname in clouds and clouds[cname].resources.get(rname) or None
+        if resource_type is None:
+            continue
+        filters = getattr(resource_type, 'filter_registry', None)
+        actions = getattr(resource_type, 'action_registry', None)
+        resources["%s.%s" % (cname, resource_type.type)] = {
+            'aliases': sorted(resource_type.type_aliases or ()),
+            'filters': sorted(filters is not None and filters.loaded_keys() or ()),
+            'actions': sorted(actions is not None and actions.loaded_keys() or ())}
+    return {
+        'modes': sorted(execution.loaded_keys()),
+        'sources': sorted(sources.loaded_keys()),
+        'resources': resources}
+
+
+def write_artifact(provider_name, path=None):
+    """Write a provider's schema and vocabulary for loading at validation.
+
+    Expects a fresh process, as the policy modes of any other providers
+    loaded would be included.
+    """
+    load_resources(("%s.*" % provider_name,))
+    resource_types = ["%s.%s" % (provider_name, rname)
+                      for rname in clouds[provider_name].resources.keys()]
+    schema = generate(resource_types)
+    JsonSchemaValidator.check_schema(schema)
+
+    path = path or ARTIFACT_DIR
+    os.makedirs(path, exist_ok=True)
+    artifact_path = os.path.join(path, "%s.json" % provider_name)
+    with open(artifact_path, 'w') as fh:
+        json.dump({
+            'version': version,
+            'fingerprint': get_source_fingerprint(provider_name),
+            'vocabulary': get_vocabulary(resource_types),
+            'schema': schema}, fh)
+    return artifact_path
+
+
+def read_artifact(provider_name, path=None):
+    return _read_artifact(provider_name, path or ARTIFACT_DIR)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_artifact(provider_name, path):
+    artifact_path = os.path.join(path, "%s.json" % provider_name)
+    if not os.path.exists(artifact_path):
+        return None
+    with open(artifact_path) as fh:
+        artifact = json.load(fh)
+    if artifact.get('version') != version:
+        log.debug("Ignoring schema artifact %s for version %s",
+                  artifact_path, artifact.get('version'))
+        return None
+    if artifact.get('fingerprint') != get_source_fingerprint(provider_name):
+        log.debug("Ignoring schema artifact %s for modified sources", artifact_path)
+        return None
+    return artifact
+
+
+@functools.lru_cache(maxsize=None)
+def get_source_fingerprint(provider_name):
+    """Return a digest of the sources the provider's schema is generated from.
+
+    Element schemas can change without a version change, ie. in a
+    development checkout, so the artifact is only used when the
+    sources of c7n and the provider's package are unchanged.
+    """
+    packages = {'c7n', clouds[provider_name].__module__.split('.', 1)[0]}
+    digest = hashlib.sha256()
+    for package in sorted(packages):
+        root = os.path.dirname(sys.modules[package].__file__)
+        for path in sorted(glob.glob(os.path.join(root, '**', '*.py'), recursive=True)):
+            digest.update(os.path.relpath(path, root).encode('utf8'))
+            with open(path, 'rb') as fh:
+                digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def load_artifact(vocabulary, path=None):
+    """Return a schema for a vocabulary from its provider's artifact, if current.
+
+    The artifact is generated with all of the provider's modules loaded,
+    so it's used when the vocabulary is a subset of its own, ie. modules
+    not yet imported may register further elements, while elements
+    registered by plugins invalidate it.
+    """
+    providers = {rtype.split('.', 1)[0] for rtype in vocabulary['resources']}
+    if len(providers) != 1:
+        return None
+    artifact = read_artifact(providers.pop(), path)
+    if artifact is None:
+        return None
+    extant = artifact['vocabulary']
+    if not (set(vocabulary['modes']).issubset(extant['modes']) and
+            set(vocabulary['sources']).issubset(extant['sources']) and
+            all(is_element_subset(elements, extant['resources'].get(rtype))
+                for rtype, elements in vocabulary['resources'].items())):
+        return None
+
+    schema = dict(artifact['schema'])
+    schema['properties'] = dict(schema['properties'])
+    schema['properties']['policies'] = dict(
+        schema['properties']['policies'],
+        items={'anyOf': [{'$ref': '#/definitions/resources/%s/policy' % rtype}
+                         for rtype in sorted(vocabulary['resources'])]})
+    return schema
+
+
+def is_element_subset(elements, extant):
+    return extant is not None and elements['aliases'] == extant['aliases'] and (
+        set(elements['filters']).issubset(extant['filters'])) and (
+        set(elements['actions']).issubset(extant['actions']))
+
+
 def generate(resource_types=()):
     resource_defs = {}
     definitions = get_default_definitions(resource_defs)
@@ -15,15 +15,19 @@ from datetime import datetime, timedelta
 from dateutil import tz as tzutil
 from dateutil.parser import parse
 
+import re
+import threading
 import time
 
 from c7n.manager import resources as aws_resources
 from c7n.actions import BaseAction as Action, AutoTagUser
-from c7n.exceptions import PolicyValidationError, PolicyExecutionError
+from c7n.exceptions import ClientError, PolicyValidationError, PolicyExecutionError
 from c7n.resources import load_resources
 from c7n.filters import Filter, OPERATORS
 from c7n.filters.offhours import Time
 from c7n import deprecated, utils
+from c7n.credentials import get_client_config
+from c7n.ratelimit import THROTTLE_CODES
 
 DEFAULT_TAG = "maid_status"
 
@@ -65,6 +69,14 @@ def register_universal_tags(filters, actions, compatibility=True):
     actions.register('rename-tag', UniversalTagRename)
 
 
+# chunks of arns per resource tagging api call.
+UNIVERSAL_AUGMENT_CHUNK = 100
+UNIVERSAL_AUGMENT_WORKERS = 4
+# populations at least this large fetch all tags for the resource type
+# in a single paginated sweep, rather than by arn.
+UNIVERSAL_SWEEP_SIZE = 1000
+
+
 def universal_augment(self, resources):
     # Resource Tagging API Support
     # https://docs.aws.amazon.com/awsconsolehelpdocs/latest/gsg/supported-resources.html
@@ -72,30 +84,133 @@ def universal_augment(self, resources):
     if not resources:
         return resources
 
+    rfetch = [r for r in resources if 'Tags' not in r]
+    if not rfetch:
+        return resources
+
     region = utils.get_resource_tagging_region(self.resource_type, self.region)
     self.log.debug("Using region %s for resource tagging" % region)
-    client = utils.local_session(
-        self.session_factory).client('resourcegroupstaggingapi', region_name=region)
+    client = utils.local_session(self.session_factory).client(
+        'resourcegroupstaggingapi', region_name=region,
+        config=get_client_config(UNIVERSAL_AUGMENT_WORKERS))
+
+    arns = self.get_arns(rfetch)
+    type_filter = get_tagging_type_filter(self)
+    tag_map = None
+    if type_filter and len(rfetch) >= UNIVERSAL_SWEEP_SIZE:
+        try:
+            tag_map = sweep_tags(client, type_filter)
+        except ClientError as e:
+            self.log.debug(
+                "Resource tagging sweep of %s failed, fetching by arn: %s", type_filter, e)
+            tag_map = None
+        # guard against arns we generate not matching the api's.
+        if tag_map and tag_map.keys().isdisjoint(arns):
+            self.log.debug("Resource tagging sweep of %s matched no arns", type_filter)
+            tag_map = None
+    if tag_map is None:
+        tag_map = fetch_tags(self.executor_factory, client, arns)
+
+    for arn, r in zip(arns, rfetch):
+        r['Tags'] = tag_map.get(arn, [])
+    return resources
+
 
+def get_tagging_type_filter(manager):
+    """Return the resource tagging api resource type filter for a manager, or None."""
+    m = manager.get_model()
+    if not m.arn_type or getattr(m, 'arn', None) is False:
+        return None
+    # path style arn types, ie. apigateway's /restapis, aren't valid filters.
+    if not re.match(r'^[\w-]+$', m.arn_type):
+        return None
+    return "%s:%s" % (m.arn_service or m.service, m.arn_type)
+
+
+def sweep_tags(client, type_filter):
+    """Fetch the tags of all resources of a type, returns a map of arn to tags."""
     # Lazy for non circular :-(
     from c7n.query import RetryPageIterator
     paginator = client.get_paginator('get_resources')
     paginator.PAGE_ITERATOR_CLS = RetryPageIterator
 
-    rfetch = [r for r in resources if 'Tags' not in r]
+    tag_map = {}
+    for page in paginator.paginate(ResourceTypeFilters=[type_filter], ResourcesPerPage=100):
+        for r in page.get('ResourceTagMappingList', ()):
+            tag_map[r['ResourceARN']] = r['Tags']
+    return tag_map
 
-    for arn_resource_set in utils.chunks(
-            zip(self.get_arns(rfetch), rfetch), 100):
-        arn_resource_map = dict(arn_resource_set)
-        resource_tag_results = client.get_resources(
-            ResourceARNList=list(arn_resource_map.keys())).get(
-                'ResourceTagMappingList', ())
-        resource_tag_map = {
-            r['ResourceARN']: r['Tags'] for r in resource_tag_results}
-        for arn, r in arn_resource_map.items():
-            r['Tags'] = resource_tag_map.get(arn, [])
 
-    return resources
+def fetch_tags(executor_factory, client, arns):
+    """Fetch the tags for a set of arns, returns a map of arn to tags.
+
+    Chunks of arns are fetched concurrently, with concurrency adapting
+    to throttling.
+    """
+    arn_sets = list(utils.chunks(arns, UNIVERSAL_AUGMENT_CHUNK))
+    limit = AdaptiveConcurrency(min(len(arn_sets), UNIVERSAL_AUGMENT_WORKERS))
+
+    def fetch(arn_set):
+        return limit.call(client.get_resources, ResourceARNList=arn_set).get(
+            'ResourceTagMappingList', ())
+
+    if len(arn_sets) == 1:
+        results = [fetch(arn_sets[0])]
+    else:
+        with executor_factory(max_workers=limit.max_concurrency) as w:
+            results = list(w.map(fetch, arn_sets))
+
+    tag_map = {}
+    for result in results:
+        for r in result:
+            tag_map[r['ResourceARN']] = r['Tags']
+    return tag_map
+
+
+class AdaptiveConcurrency:
+    """Bound concurrent api calls, backing off on throttling.
+
+    The bound is halved on a throttled call and increased by one on a
+    successful call, up to the initial maximum.
+    """
+
+    max_attempts = 7
+
+    def __init__(self, max_concurrency):
+        self.max_concurrency = self.limit = max(1, max_concurrency)
+        self.active = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while self.active >= self.limit:
+                self.cond.wait()
+            self.active += 1
+
+    def release(self, throttled=False):
+        with self.cond:
+            self.active -= 1
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1)
+            self.cond.notify_all()
+
+    def call(self, func, *args, **kw):
+        """Invoke func within the bound, retrying throttled calls with backoff."""
+        for idx, delay in enumerate(utils.backoff_delays(1, 2 ** 8, jitter=True)):
+            self.acquire()
+            try:
+                result = func(*args, **kw)
+            except ClientError as e:
+                throttled = e.response['Error']['Code'] in THROTTLE_CODES
+                self.release(throttled)
+                if not throttled or idx == self.max_attempts - 1:
+                    raise
+            else:
+                self.release()
+                return result
+            time.sleep(delay)
 
 
 def _common_tag_processer(executor_factory, batch_size, concurrency, client,
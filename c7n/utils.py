@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 import copy
 from collections import UserString
+import functools
 from datetime import datetime, timedelta
 from dateutil.tz import tzutc
 import json
@@ -966,6 +967,9 @@ class C7NJmespathFunctions(functions.Functions):
             return None
 
 
+JMESPATH_OPTIONS = jmespath.Options(custom_functions=C7NJmespathFunctions())
+
+
 class C7NJMESPathParser(Parser):
     def parse(self, expression):
         result = super().parse(expression)
@@ -979,16 +983,35 @@ class ParsedResultWithOptions(ParsedResult):
     def search(self, value, options=None):
         # if options are explicitly passed in, we honor those
         if not options:
-            options = jmespath.Options(custom_functions=C7NJmespathFunctions())
+            options = JMESPATH_OPTIONS
         return super().search(value, options)
 
 
-def jmespath_search(*args, **kwargs):
-    return jmespath.search(
-        *args,
-        **kwargs,
-        options=jmespath.Options(custom_functions=C7NJmespathFunctions())
-    )
+class FieldPath(ParsedResultWithOptions):
+    """A compiled expression of dotted identifiers, ie. `State.Name`.
+
+    Evaluated with direct dictionary access, with the same semantics
+    as the equivalent jmespath expression.
+    """
+
+    def __init__(self, expression, parsed):
+        super().__init__(expression, parsed)
+        self.fields = expression.split('.')
+
+    def search(self, value, options=None):
+        for f in self.fields:
+            try:
+                value = value.get(f)
+            except AttributeError:
+                return None
+        return value
+
+
+FIELD_PATH = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+
+def jmespath_search(expression, data, **kwargs):
+    return jmespath_compile(expression).search(data, **kwargs)
 
 
 def get_path(path: str, resource: dict):
@@ -1007,6 +1030,10 @@ def get_path(path: str, resource: dict):
     return resource[path]
 
 
+@functools.lru_cache(maxsize=4096)
 def jmespath_compile(expression):
+    """Compile a jmespath expression, compiled expressions are cached process wide."""
     parsed = C7NJMESPathParser().parse(expression)
+    if FIELD_PATH.match(expression):
+        return FieldPath(expression, parsed.parsed)
     return parsed
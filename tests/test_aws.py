@@ -12,7 +12,7 @@ from unittest.mock import Mock, patch
 from c7n.config import Bag, Config
 from c7n.exceptions import PolicyValidationError, InvalidOutputConfig
 from c7n.resources import aws, load_resources
-from c7n import output
+from c7n import output, query, ratelimit
 
 # resolver test needs to patch out thread usage
 from c7n.resources.sqs import SQS
@@ -293,6 +293,77 @@ class TracerTest(BaseTest):
             self.assertNotEqual(w.cause, {})
 
 
+class ApiStatsTest(BaseTest):
+
+    def test_connection_stats(self):
+        class Pool:
+            num_connections = 0
+
+        operation = Bag(name='DescribeInstances', service_model=Bag(endpoint_prefix='ec2'))
+        pool = Pool()
+        response = Bag(raw=Bag(_pool=pool))
+        stats = aws.ApiStats(Bag())
+        for opened in (1, 1, 1, 2):
+            pool.num_connections = opened
+            stats._record(response, {}, operation)
+        # responses without a connection pool, ie. placebo
+        stats._record(Bag(raw=None), {}, operation)
+
+        self.assertEqual(stats.get_snapshot(), {'ec2.DescribeInstances': 5})
+        self.assertEqual(
+            stats.get_connection_stats(),
+            {'ec2': {'calls': 5, 'connections': 2, 'reused': 3}})
+
+        # connections are counted once per pool across stats instances
+        other = aws.ApiStats(Bag())
+        other._record(response, {}, operation)
+        self.assertEqual(other.connections, {})
+
+    def test_operation_stats(self):
+        operation = Bag(name='ListFunctions', service_model=Bag(endpoint_prefix='lambda'))
+        stats = aws.ApiStats(Bag())
+        for retries in (0, 2):
+            context = {}
+            stats._start(context)
+            context['c7n-api-start'] -= 0.5
+            stats._record(
+                Bag(raw=None), {'ResponseMetadata': {'RetryAttempts': retries}},
+                operation, context=context)
+        # calls from sessions registered before timing started
+        stats._record(Bag(raw=None), {}, operation, context={})
+        op_stats = stats.get_operation_stats()['lambda.ListFunctions']
+        self.assertEqual((op_stats['calls'], op_stats['retries']), (3, 2))
+        self.assertTrue(500 <= op_stats['latency'] < 600)
+
+    def test_augment_stats(self):
+        scheduler = query.AugmentScheduler()
+        self.patch(query, 'AUGMENT_SCHEDULER', scheduler)
+        for key in (('111111111111', 'us-east-1', 'lambda', 'get_function'),
+                    ('111111111111', 'us-west-2', 'lambda', 'get_function'),
+                    (None, 'us-east-1', 'dlm', 'get_lifecycle_policy')):
+            scheduler.get_stats(key, 3)
+        stats = aws.ApiStats(
+            Bag(options=Bag(account_id='111111111111', region='us-east-1')))
+        self.assertEqual(stats.get_augment_stats(), {
+            '111111111111.us-east-1.lambda.get_function': {'workers': 3, 'latency': None}})
+        self.assertEqual(scheduler.get_snapshot(region='us-east-1'), {
+            '111111111111.us-east-1.lambda.get_function': {'workers': 3, 'latency': None},
+            'us-east-1.dlm.get_lifecycle_policy': {'workers': 3, 'latency': None}})
+
+    def test_rate_limit_stats(self):
+        limiter = ratelimit.RateLimiter()
+        self.patch(ratelimit, 'RATE_LIMITER', limiter)
+        limiter.get_bucket(('key', 'us-east-1', 'ec2', 'DescribeInstances')).throttled()
+        limiter.get_bucket(('key', 'us-east-1', 'lambda', 'ListFunctions')).throttled()
+        limiter.get_bucket(('key', 'us-east-1', 'ec2', 'DescribeVolumes'))
+
+        stats = aws.ApiStats(Bag())
+        stats.api_calls['ec2.DescribeInstances'] += 1
+        stats.api_calls['ec2.DescribeVolumes'] += 1
+        self.assertEqual(
+            stats.get_rate_limit_stats(), {'us-east-1.ec2.DescribeInstances': 0.5})
+
+
 class OutputMetricsTest(BaseTest):
 
     def test_metrics_destination_dims(self):
@@ -8,6 +8,8 @@ import sqlite3
 import sys
 from unittest import TestCase
 
+from dateutil.tz import tzutc
+
 import pytest
 
 from c7n import cache, config
@@ -33,7 +35,8 @@ class MemCacheTest(TestCase):
     def test_get_set(self):
         mem_cache = cache.InMemoryCache({})
         mem_cache.save({'region': 'us-east-1'}, {'hello': 'world'})
-        self.assertEqual(mem_cache.size(), 1)
+        self.assertEqual(
+            mem_cache.size(), cache.approximate_size({'hello': 'world'}))
         self.assertEqual(mem_cache.load(), True)
 
         mem_cache = cache.InMemoryCache({})
@@ -42,6 +45,40 @@ class MemCacheTest(TestCase):
             {'hello': 'world'})
         mem_cache.close()
 
+    def tearDown(self):
+        mem_cache = cache.InMemoryCache({})
+        for k in list(mem_cache.data):
+            mem_cache._remove(k)
+
+    def test_lru_eviction(self):
+        value = ['x' * 100]
+        size = cache.approximate_size(value)
+        mem_cache = cache.InMemoryCache(config.Bag(cache_max_size=size * 2))
+        mem_cache.save({'k': 1}, value)
+        mem_cache.save({'k': 2}, value)
+        # touch k1 so k2 is the least recently used.
+        self.assertEqual(mem_cache.get({'k': 1}), value)
+        mem_cache.save({'k': 3}, value)
+        self.assertIsNone(mem_cache.get({'k': 2}))
+        self.assertEqual(mem_cache.get({'k': 3}), value)
+        self.assertEqual(mem_cache.size(), size * 2)
+        self.assertEqual(
+            mem_cache.get_stats(), {'hit': 2, 'miss': 1, 'eviction': 1})
+
+        # entries larger than the budget aren't cached
+        mem_cache.save({'k': 4}, ['y' * 1000])
+        self.assertIsNone(mem_cache.get({'k': 4}))
+        self.assertEqual(mem_cache.size(), size * 2)
+
+    def test_entry_ttl(self):
+        mem_cache = cache.InMemoryCache(config.Bag(cache_period=5))
+        mem_cache.save({'k': 1}, [1])
+        key = cache.key_hash({'k': 1})
+        value, size, created = mem_cache.data[key]
+        mem_cache.data[key] = (value, size, created - 600)
+        self.assertIsNone(mem_cache.get({'k': 1}))
+        self.assertEqual(mem_cache.size(), 0)
+
 
 def test_sqlkv(tmp_path):
     kv = cache.SqlKvCache(config.Bag(cache=tmp_path / "cache.db", cache_period=60))
@@ -99,3 +136,132 @@ def test_sqlkv_convert(tmp_path):
     kv.close()
     with open(cache_path, 'rb') as fh:
         assert fh.read(15) == b"SQLite format 3"
+
+
+def test_resource_cache_factory():
+    assert isinstance(
+        cache.factory(config.Bag(cache='x.db', cache_period=5, cache_store='resource')),
+        cache.SqlResourceCache)
+
+
+def test_resource_cache(tmp_path):
+    rc = cache.SqlResourceCache(config.Bag(cache=tmp_path / "cache.db", cache_period=60))
+    rc.load()
+    k1 = {"account": "12345678901234", "region": "us-west-2", "resource": "ec2", "q": None}
+    v1 = [{'id': 'a', 'v': 1}, {'id': 'b', 'v': 2}, {'id': 'c', 'v': 3}]
+
+    assert rc.get(k1) is None
+    assert rc.get_resources(k1, ['a'], 'id') is None
+    rc.save_resources(k1, v1, 'id')
+    assert rc.get(k1) == v1
+    assert rc.get_resources(k1, ['c', 'a', 'z'], 'id') == [v1[0], v1[2]]
+    assert rc.get_stats() == {'hit': 2, 'miss': 2, 'rows': 2}
+
+    # partial refresh replaces and appends without touching the rest.
+    assert rc.save_resources(k1, [{'id': 'b', 'v': 4}, {'id': 'd', 'v': 5}], 'id', partial=True)
+    assert rc.get(k1) == [
+        {'id': 'a', 'v': 1}, {'id': 'b', 'v': 4}, {'id': 'c', 'v': 3}, {'id': 'd', 'v': 5}]
+
+    # partial refresh of a missing set is a no-op
+    k2 = dict(k1, resource='ebs')
+    assert rc.save_resources(k2, v1, 'id', partial=True) is False
+    assert rc.get(k2) is None
+    rc.close()
+
+
+def test_resource_cache_untyped_set(tmp_path):
+    rc = cache.SqlResourceCache(config.Bag(cache=tmp_path / "cache.db", cache_period=60))
+    rc.load()
+    k1 = {'a': 'b'}
+    rc.save(k1, [{'id': 'a'}, {'id': 'b'}])
+    assert rc.get_resources(k1, ['b'], 'id') == [{'id': 'b'}]
+    rc.save(k1, ['x', 'y'])
+    assert rc.get(k1) == ['x', 'y']
+
+
+def test_resource_cache_gc(tmp_path):
+    rc = cache.SqlResourceCache(config.Bag(cache=tmp_path / "cache.db", cache_period=60))
+    rc.load()
+    k1, k2 = {'a': 'b'}, {'b': 'a'}
+    rc.save_resources(k1, [{'id': 'a'}], 'id', datetime.utcnow() - timedelta(days=10))
+    rc.save_resources(k2, [{'id': 'b'}], 'id')
+    rc.close()
+
+    rc.load()
+    assert rc.conn.execute('select count(*) from c7n_resources').fetchone()[0] == 1
+    assert rc.get(k1) is None
+    assert rc.get(k2) == [{'id': 'b'}]
+    rc.close()
+
+
+SAMPLE_RESOURCES = [
+    {'InstanceId': 'i-1', 'LaunchTime': datetime(2024, 1, 2, 3, 4, 5, tzinfo=tzutc()),
+     'Tags': [{'Key': 'Env', 'Value': 'prod'}], 'UserData': b'\x00\x01', 'Count': 3},
+    {'InstanceId': 'i-2', 'LaunchTime': datetime(2024, 1, 2, 3, 4, 5), 'Tags': []},
+]
+
+
+@pytest.mark.parametrize("name", cache.Codec.available())
+def test_codec_round_trip(name):
+    codec = cache.get_codec(name)
+    assert codec.decode(codec.encode(SAMPLE_RESOURCES)) == SAMPLE_RESOURCES
+
+
+def test_codec_invalid():
+    with pytest.raises(ValueError):
+        cache.Codec('xml')
+    with pytest.raises(ValueError):
+        cache.Codec('json+rar')
+
+
+def test_key_hash_stable():
+    assert cache.key_hash({'a': 1, 'b': [1, 2]}) == cache.key_hash({'b': [1, 2], 'a': 1})
+    assert cache.key_hash({'a': 1}) != cache.key_hash({'a': 2})
+    assert cache.key_hash({'a': 1}) == (
+        '015abd7f5cc57a2dd94b7590f04ad8084273905ee33ec5cebeae62276a97f862')
+
+
+def test_sqlkv_codec(tmp_path):
+    kv = cache.SqlKvCache(
+        config.Bag(cache=tmp_path / "cache.db", cache_period=60, cache_codec='json+zlib'))
+    kv.load()
+    kv.save({'a': 'b'}, SAMPLE_RESOURCES)
+    assert kv.get({'a': 'b'}) == SAMPLE_RESOURCES
+    kv.close()
+
+    # values remain readable after switching codecs
+    kv = cache.SqlKvCache(config.Bag(cache=tmp_path / "cache.db", cache_period=60))
+    kv.load()
+    assert kv.get({'a': 'b'}) == SAMPLE_RESOURCES
+    kv.close()
+
+
+def test_sqlkv_migrate(tmp_path):
+    cache_path = tmp_path / "cache.db"
+    conn = sqlite3.connect(cache_path)
+    conn.execute(
+        "create table c7n_cache (key blob primary key, value blob, create_date timestamp)")
+    for k, v, t in (
+            ({'a': 'b'}, [1, 2], datetime.utcnow()),
+            ({'b': 'a'}, [3], datetime.utcnow() - timedelta(days=10))):
+        conn.execute(
+            'insert into c7n_cache values (?, ?, ?)',
+            (pickle.dumps(k), pickle.dumps(v), t))
+    conn.commit()
+    conn.close()
+
+    kv = cache.SqlKvCache(
+        config.Bag(cache=cache_path, cache_period=60, cache_codec='json'))
+    kv.load()
+    assert kv.get({'a': 'b'}) == [1, 2]
+    assert kv.get({'b': 'a'}) is None
+    assert kv.conn.execute(
+        "select count(*) from sqlite_master where name = 'c7n_cache'").fetchone()[0] == 0
+    kv.close()
+
+
+def test_mem_codec():
+    mem_cache = cache.InMemoryCache(config.Bag(cache_codec='json'))
+    mem_cache.save({'codec': 'json'}, SAMPLE_RESOURCES)
+    assert isinstance(mem_cache.data[cache.key_hash({'codec': 'json'})][0], bytes)
+    assert mem_cache.get({'codec': 'json'}) == SAMPLE_RESOURCES
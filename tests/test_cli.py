@@ -86,6 +86,12 @@ class UtilsTest(BaseTest):
         param = "day=today"
         self.assertIs(cli._key_val_pair(param), param)
 
+    def test_augment_option(self):
+        for value in ("lambda", "lambda=0", "lambda=4:0", "lambda=-1"):
+            self.assertRaises(ArgumentTypeError, cli._augment_option, value)
+        for value in ("lambda=4", "aws.lambda=8:5", "app-elb=10:20"):
+            self.assertIs(cli._augment_option(value), value)
+
 
 class VersionTest(CliTest):
 
@@ -538,6 +544,67 @@ class RunTest(CliTest):
             ]
         )
 
+    def test_ec2_shared_enumeration(self):
+        session_factory = self.replay_flight_data(
+            "test_ec2_state_transition_age_filter"
+        )
+
+        from c7n.policy import PolicyCollection
+
+        self.patch(
+            PolicyCollection,
+            "session_factory",
+            staticmethod(lambda x=None: session_factory),
+        )
+
+        temp_dir = self.get_temp_dir()
+        yaml_file = self.write_policy_file(
+            {
+                "policies": [
+                    {"name": "ec2-running", "resource": "ec2",
+                     "filters": [{"State.Name": "running"}]},
+                    {"name": "ec2-stopped", "resource": "ec2",
+                     "filters": [{"State.Name": "stopped"}]},
+                ]
+            }
+        )
+        self.run_and_expect_success(
+            ["custodian", "run", "--shared-enumeration", "-s", temp_dir, yaml_file]
+        )
+        self.assertEqual(
+            len(json.load(open(os.path.join(temp_dir, "ec2-running", "resources.json")))), 2)
+
+    def test_ec2_parallel(self):
+        session_factory = self.replay_flight_data(
+            "test_ec2_state_transition_age_filter"
+        )
+
+        from c7n.policy import PolicyCollection
+
+        self.patch(
+            PolicyCollection,
+            "session_factory",
+            staticmethod(lambda x=None: session_factory),
+        )
+
+        temp_dir = self.get_temp_dir()
+        yaml_file = self.write_policy_file(
+            {
+                "policies": [
+                    {"name": "ec2-running", "resource": "ec2",
+                     "filters": [{"State.Name": "running"}]},
+                    {"name": "ec2-stopped", "resource": "ec2",
+                     "filters": [{"State.Name": "stopped"}]},
+                ]
+            }
+        )
+        self.run_and_expect_success(
+            ["custodian", "run", "--parallel", "2", "-s", temp_dir, yaml_file]
+        )
+        for name in ("ec2-running", "ec2-stopped"):
+            self.assertTrue(
+                os.path.exists(os.path.join(temp_dir, name, "metadata.json")))
+
     def test_error(self):
         from c7n.policy import Policy
 
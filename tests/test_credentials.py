@@ -6,7 +6,7 @@ import placebo
 
 from c7n import credentials
 from c7n.credentials import (
-    CustodianSession, SessionFactory, assumed_session, get_sts_client
+    CustodianSession, SessionFactory, assumed_session, get_client_config, get_sts_client
 )
 from c7n.version import version
 from c7n.utils import local_session
@@ -26,6 +26,14 @@ class Credential(BaseTest):
             session._session.user_agent().startswith("c7n/%s" % version)
         )
 
+    def test_session_factory_client_config(self):
+        session = SessionFactory("us-east-1")()
+        config = session.client('ec2').meta.config
+        self.assertEqual(config.max_pool_connections, 10)
+        self.assertTrue(config.tcp_keepalive)
+        config = session.client('ec2', config=get_client_config(20)).meta.config
+        self.assertEqual(config.max_pool_connections, 20)
+
     def test_regional_sts(self):
         factory = self.replay_flight_data('test_credential_sts_regional')
 
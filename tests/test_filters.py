@@ -11,14 +11,18 @@ import unittest
 import os
 
 from c7n.exceptions import PolicyValidationError, PolicyExecutionError
+from c7n import cache
 from c7n.executor import MainThreadExecutor
 from c7n import filters as base_filters
+from c7n.filters import core
 from c7n.resources.ec2 import filters
 from c7n.resources.elb import ELB
 from c7n.testing import mock_datetime_now
 from c7n.utils import annotation
 from .common import instance, event_data, Bag, BaseTest
-from c7n.filters.core import AnnotationSweeper, ValueRegex, parse_date as core_parse_date
+from c7n.filters.core import (
+    AnnotationSweeper, ValueRegex, compile_filter, is_streamable,
+    parse_date as core_parse_date)
 
 
 class BaseFilterTest(unittest.TestCase):
@@ -54,6 +58,15 @@ class TestFilter(unittest.TestCase):
         filter_instance = base_filters.Filter({})
         self.assertIsInstance(filter_instance, base_filters.Filter)
 
+    def test_is_streamable(self):
+        self.assertTrue(is_streamable(filters.factory({"State.Name": "running"})))
+        self.assertTrue(is_streamable(filters.factory(
+            {"or": [{"tag:ASV": "absent"}, {"not": [{"Color": "green"}]}]})))
+        self.assertFalse(is_streamable(filters.factory(
+            {"type": "value", "value_type": "resource_count", "op": "gt", "value": 1})))
+        self.assertFalse(is_streamable(filters.factory(
+            {"and": [{"Color": "green"}, {"type": "event", "key": "detail", "value": 1}]})))
+
     def test_merge_annotation(self):
         filter_instance1 = base_filters.Filter({})
         filter_instance2 = base_filters.Filter({})
@@ -304,6 +317,174 @@ class TestValueFilter(unittest.TestCase):
         self.assertEqual(res, False)
 
 
+class TestCompiledValueFilter(BaseTest):
+
+    resources = [
+        instance(InstanceId="i-a", Tags=[{"Key": "Env", "Value": " Prod "}], Cidr="10.0.1.0/24",
+                 Version="1.10.2", Ips=["10.0.0.1", "10.0.0.1"]),
+        instance(InstanceId="i-b", Tags=[], State={"Name": "stopped"}, Cidr="10.0.0.5",
+                 LaunchTime="2010-01-01T00:00:00Z", Version="1.9"),
+        instance(InstanceId="i-c", Tags=[{"Key": "Other", "Value": ""}], Cidr="bad",
+                 Version=None, InstanceType=None),
+        {"InstanceId": "i-1", "labels": {"Env": "prod"}, "tag:Env": "direct"},
+    ]
+
+    specs = [
+        {"tag:Env": "absent"},
+        {"tag:Env": "present"},
+        {"State.Name": "running"},
+        {"type": "value", "key": "State.Name", "value": "not-null"},
+        {"type": "value", "key": "Tags", "value": "empty"},
+        {"type": "value", "key": "tag:Env", "value": "prod", "value_type": "normalize"},
+        {"type": "value", "key": "InstanceType", "op": "in", "value": ["m1.small"]},
+        {"type": "value", "key": "InstanceType", "op": "not-in", "value": ["m1.small"]},
+        {"type": "value", "key": "InstanceType", "op": "regex", "value": "M1.*"},
+        {"type": "value", "key": "InstanceType", "op": "regex-case", "value": "M1.*"},
+        {"type": "value", "key": "InstanceType", "op": "glob", "value": "m1*"},
+        {"type": "value", "key": "LaunchTime", "value_type": "age", "op": "gt", "value": 30},
+        {"type": "value", "key": "LaunchTime", "value_type": "date", "op": "lt",
+         "value": "2015-01-01"},
+        {"type": "value", "key": "LaunchTime", "value_type": "expiration", "op": "lt",
+         "value": 30},
+        {"type": "value", "key": "Cidr", "value_type": "cidr", "op": "in",
+         "value": "10.0.0.0/16"},
+        {"type": "value", "key": "Cidr", "value_type": "cidr_size", "op": "ge", "value": 24},
+        {"type": "value", "key": "Version", "value_type": "version", "op": "ge",
+         "value": "1.10"},
+        {"type": "value", "key": "Ips", "value_type": "size", "value": 2},
+        {"type": "value", "key": "Ips", "value_type": "unique_size", "value": 1},
+        {"type": "value", "key": "AmiLaunchIndex", "value_type": "integer", "op": "lt",
+         "value": 1},
+        {"type": "value", "key": "AmiLaunchIndex", "value_type": "float", "op": "lt",
+         "value": 0.5},
+        {"type": "value", "key": "InstanceType", "value_type": "swap", "op": "in",
+         "value": "m1.small,m1.large"},
+        {"type": "value", "key": "ImageId", "value_type": "expr", "value": "ImageId"},
+        {"type": "value", "key": "tag:Env", "value_regex": "^ *(\\w+)", "value": "Prod"},
+        {"type": "value", "key": "Placement.AvailabilityZone", "value_regex": "us-(\\w+)-",
+         "value": "east"},
+    ]
+
+    @staticmethod
+    def outcome(func, r):
+        try:
+            return func(r)
+        except Exception as e:
+            return type(e)
+
+    def test_compiled_match(self):
+        for spec in self.specs:
+            for r in self.resources:
+                f = filters.factory(spec)
+                self.assertEqual(
+                    self.outcome(f.compile(), r), self.outcome(f.match, r), (spec, r))
+
+    def test_compile_unsupported(self):
+        self.assertIsNone(filters.factory(
+            {"type": "value", "key": "a", "value_path": "b"}).compile())
+        # filters with their own processing aren't compiled into trees
+        self.assertIsNone(compile_filter(filters.factory(
+            {"type": "instance-attribute", "attribute": "kernel", "key": "Value",
+             "value": "absent"})))
+
+    def test_compiled_filter_tree(self):
+        policy = {
+            "name": "compiled", "resource": "ec2",
+            "filters": [{"or": [
+                {"State.Name": "running"},
+                {"InstanceType": "m1.small"},
+                {"and": [{"tag:Env": "present"}, {"tag:Env": "Missing"}]},
+                {"not": [{"tag:Env": "absent"}]}]}]}
+        p = self.load_policy(policy)
+        self.assertIsNotNone(compile_filter(p.resource_manager.filters[0]))
+        compiled = p.resource_manager.filter_resources(copy.deepcopy(self.resources))
+
+        self.patch(base_filters.ValueFilter, 'is_compilable', lambda self: False)
+        p = self.load_policy(policy)
+        self.assertIsNone(compile_filter(p.resource_manager.filters[0]))
+        expected = p.resource_manager.filter_resources(copy.deepcopy(self.resources))
+
+        self.assertEqual(
+            {r["InstanceId"]: r.get(base_filters.ANNOTATION_KEY) for r in compiled},
+            {r["InstanceId"]: r.get(base_filters.ANNOTATION_KEY) for r in expected})
+
+
+@unittest.skipIf(core.numpy is None, "numpy not installed")
+class TestVectorValueFilter(BaseTest):
+
+    resources = [
+        {"InstanceId": "i-%d" % idx,
+         "State": {"Name": ("running", "stopped")[idx % 2]},
+         "CpuCount": idx % 3 and idx or None,
+         "Ips": ["10.0.0.%d" % i for i in range(idx % 4)],
+         "LaunchTime": "2024-01-%02dT00:00:00+00:00" % (idx + 1)}
+        for idx in range(12)]
+
+    specs = [
+        {"State.Name": "running"},
+        {"type": "value", "key": "State.Name", "op": "ne", "value": "running"},
+        {"type": "value", "key": "State.Name", "op": "in", "value": ["stopped", "x"]},
+        {"type": "value", "key": "CpuCount", "op": "gt", "value": 4},
+        {"type": "value", "key": "CpuCount", "op": "ne", "value": 4},
+        {"type": "value", "key": "CpuCount", "op": "not-in", "value": [1, 2]},
+        {"type": "value", "key": "Ips", "value_type": "size", "op": "gte", "value": 2},
+        {"type": "value", "key": "LaunchTime", "value_type": "date", "op": "lt",
+         "value": "2024-01-05"},
+        {"type": "value", "key": "LaunchTime", "value_type": "age", "op": "gt",
+         "value": 1},
+    ]
+
+    def test_vector_matches_compiled(self):
+        for spec in self.specs:
+            f = filters.factory(spec)
+            self.assertIsNotNone(f.compile_vector(), spec)
+            vector = f.process_vector(copy.deepcopy(self.resources))
+            self.assertIsNotNone(vector, spec)
+            f = filters.factory(spec)
+            compiled = [r for r in copy.deepcopy(self.resources) if f.compile()(r)]
+            self.assertEqual(
+                [r["InstanceId"] for r in vector],
+                [r["InstanceId"] for r in compiled], spec)
+
+    def test_vector_fallback(self):
+        self.assertIsNone(filters.factory(
+            {"type": "value", "key": "State.Name", "op": "regex", "value": "run.*"}
+        ).compile_vector())
+        self.assertIsNone(filters.factory({"State.Name": "absent"}).compile_vector())
+        # mixed values aren't vectorized
+        f = filters.factory({"type": "value", "key": "Value", "op": "gt", "value": 1})
+        self.assertIsNone(f.process_vector([{"Value": 2}, {"Value": "3"}]))
+
+    def test_vector_value_shapes(self):
+        # list operators with scalar values and scalar operators with list
+        # values fall back to evaluating each resource.
+        self.patch(base_filters.ValueFilter, 'vector_min_size', 2)
+        resources = [{"Name": "web-%d" % idx, "Count": idx} for idx in range(6)]
+        specs = [
+            {"type": "value", "key": "Name", "op": "in", "value": "web-1-web-2"},
+            {"type": "value", "key": "Count", "op": "in", "value": 2},
+            {"type": "value", "key": "Count", "op": "eq", "value": [1, 2]},
+            {"type": "value", "key": "Count", "op": "in", "value": [1, 2]},
+        ]
+        for spec in specs:
+            f = filters.factory(spec)
+            scalar = [r["Name"] for r in resources if f.compile()(r)]
+            f = filters.factory(spec)
+            self.assertEqual(
+                [r["Name"] for r in f.process(copy.deepcopy(resources))], scalar, spec)
+        self.assertEqual(scalar, ["web-1", "web-2"])
+
+    def test_process_vector(self):
+        self.patch(base_filters.ValueFilter, 'vector_min_size', 2)
+        f = filters.factory({"type": "value", "key": "CpuCount", "op": "gt", "value": 4})
+        resources = copy.deepcopy(self.resources)
+        self.patch(f, 'compile', None)
+        matched = f.process(resources)
+        self.assertEqual(
+            [r["InstanceId"] for r in matched], ["i-5", "i-7", "i-8", "i-10", "i-11"])
+        self.assertEqual(matched[0][base_filters.ANNOTATION_KEY], ["CpuCount"])
+
+
 class TestAgeFilter(unittest.TestCase):
 
     def test_age_filter(self):
@@ -1165,6 +1346,125 @@ class TestMetricsFilter(BaseTest):
                 for res in resources)
         )
 
+    def test_metrics_batch(self):
+        self.patch(ELB, "executor_factory", MainThreadExecutor)
+        self.patch(base_filters.MetricsFilter, "batch_min_size", 1)
+        session_factory = self.replay_flight_data("test_metrics_batch")
+
+        p = self.load_policy(
+            {
+                "name": "elb-metrics-batch",
+                "resource": "elb",
+                "filters": [
+                    {
+                        "type": "metrics",
+                        "value": 0,
+                        "name": "RequestCount",
+                        "op": "eq",
+                        "statistics": "Sum",
+                        "missing-value": 0.0,
+                    }
+                ],
+            },
+            config={"account_id": "644160558196"},
+            session_factory=session_factory,
+        )
+        resources = p.run()
+        self.assertEqual(
+            sorted(r["LoadBalancerName"] for r in resources),
+            ["test-elb-missing-metrics", "test-elb-zero-metrics"])
+        metrics = {r["LoadBalancerName"]: r["c7n.metrics"]["AWS/ELB.RequestCount.Sum.14"]
+                   for r in resources}
+        self.assertEqual(metrics["test-elb-zero-metrics"][0]["Sum"], 0.0)
+        self.assertEqual(
+            metrics["test-elb-missing-metrics"][0]["c7n:detail"],
+            "Fill value for missing data")
+
+    def test_metrics_cache(self):
+        self.patch(ELB, "executor_factory", MainThreadExecutor)
+        session_factory = self.replay_flight_data("test_missing_metrics")
+        policy = {
+            "name": "elb-metrics-cache",
+            "resource": "elb",
+            "filters": [
+                {
+                    "type": "metrics",
+                    "value": 0,
+                    "name": "RequestCount",
+                    "op": "eq",
+                    "statistics": "Sum",
+                    "missing-value": 0.0,
+                }
+            ],
+        }
+
+        with mock_datetime_now(parse_date("2019-07-09T15:36:00+00:00"), base_filters.metrics):
+            p = self.load_policy(
+                policy, config={"account_id": "644160558196"}, cache=True,
+                session_factory=session_factory)
+            self.assertEqual(len(p.run()), 2)
+
+            # a separate policy on the same cache reuses the datapoints.
+            policy["name"] = "elb-metrics-cache-reuse"
+            policy["filters"][0]["op"] = "gt"
+            p = self.load_policy(policy, config=p.options, session_factory=session_factory)
+            resources = p.run()
+
+        self.assertEqual(
+            [r["LoadBalancerName"] for r in resources], ["test-elb-nonzero-metrics"])
+        # one hit for the resources, and one per resource's metric.
+        self.assertEqual(p.resource_manager._cache.stats, {"hit": 4})
+
+        f = p.resource_manager.filters[0]
+        with p.resource_manager._cache as cache:
+            self.assertEqual(
+                cache.get(f.get_metric_cache_key(resources[0])),
+                resources[0]["c7n.metrics"]["AWS/ELB.RequestCount.Sum.14"])
+            # fill values for missing data aren't cached.
+            self.assertEqual(
+                cache.get(f.get_metric_cache_key(
+                    {"LoadBalancerName": "test-elb-missing-metrics"})), [])
+
+    def test_metrics_memory_cache(self):
+        p = self.load_policy({
+            "name": "elb-metrics-memory-cache",
+            "resource": "elb",
+            "filters": [{"type": "metrics", "name": "RequestCount", "value": 0,
+                         "op": "eq", "statistics": "Sum", "missing-value": 0.0}]})
+        f = p.resource_manager.filters[0]
+        mem_cache = p.resource_manager._cache = cache.InMemoryCache(Bag(cache_period=5))
+
+        def process_resource_set(resources):
+            # no datapoints for uncached resources
+            key = f.get_metric_key()
+            for r in resources:
+                r["c7n.metrics"].setdefault(key, [])
+            return [r for r in resources if f.match_metrics(r, r["c7n.metrics"][key])]
+
+        self.patch(f, "process_resource_set", process_resource_set)
+        with mock_datetime_now(parse_date("2019-07-09T15:36:00+00:00"), base_filters.metrics):
+            for i in range(2):
+                resource = {"LoadBalancerName": "test-elb-missing-metrics"}
+                self.assertEqual(f.process([resource]), [resource])
+        cache_key = f.get_metric_cache_key(resource)
+        self.addCleanup(mem_cache._remove, cache.key_hash(cache_key))
+        self.assertEqual(mem_cache.stats, {"miss": 1, "hit": 1})
+        # the missing value fill isn't added to the cached datapoints.
+        self.assertEqual(mem_cache.get(cache_key), [])
+
+    def test_metrics_batch_size(self):
+        p = self.load_policy({
+            "name": "ec2-metrics-batch-size",
+            "resource": "ec2",
+            "filters": [{"type": "metrics", "name": "CPUUtilization", "value": 30,
+                         "days": 14, "period": 3600}]})
+        f = p.resource_manager.filters[0]
+        f.start, f.end = f.get_metric_window()
+        f.period = 3600
+        self.assertEqual(f.get_batch_size(), 100800 // 336)
+        f.period = int((f.end - f.start).total_seconds())
+        self.assertEqual(f.get_batch_size(), 500)
+
     def test_metric_period_rounding(self):
         """Round metrics start and end times to align with CloudWatch retention periods"""
 
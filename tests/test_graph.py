@@ -0,0 +1,160 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+from collections import Counter
+
+from c7n.graph import ReferenceStore, ResourceGraph
+
+from .common import BaseTest
+
+
+class Manager:
+
+    type = 'test'
+
+    def __init__(self, resources, data=None, config=None):
+        self.data = data or {}
+        self.config = config or {}
+        self.fetched = Counter()
+        self._resources = resources
+
+    def get_cache_key(self, query):
+        return {'resource': 'test', 'q': query, 'filters': bool(self.data.get('filters'))}
+
+    def get_model(self):
+        return type('Model', (), {'id': 'Id'})
+
+    def resources(self, augment=True):
+        self.fetched[augment] += 1
+        return list(self._resources)
+
+    def get_resources(self, ids, cache=True):
+        self.fetched['ids'] += len(ids)
+        return [r for r in self._resources if r['Id'] in ids]
+
+
+class ResourceGraphTest(BaseTest):
+
+    def test_resources_fetched_once(self):
+        graph = ResourceGraph()
+        manager = Manager([{'Id': 'a'}, {'Id': 'b'}])
+        self.assertEqual(graph.resources(manager), graph.resources(manager))
+        graph.resources(manager, augment=False)
+        self.assertEqual(manager.fetched, {True: 1, False: 1})
+
+        self.assertEqual(set(graph.get_resource_map(manager)), {'a', 'b'})
+        self.assertIs(graph.get_resource_map(manager), graph.get_resource_map(manager))
+        self.assertEqual(manager.fetched, {True: 1, False: 1})
+
+    def test_filtered_manager_not_shared(self):
+        graph = ResourceGraph()
+        manager = Manager([{'Id': 'a'}], {'filters': [{'Id': 'a'}]})
+        graph.resources(manager)
+        graph.get_resource_map(manager)
+        self.assertEqual(manager.fetched, {True: 2})
+        self.assertEqual(graph.sets, {})
+
+    def test_children_not_shared(self):
+        graph = ResourceGraph()
+        fetched = []
+
+        def fetch():
+            fetched.append(True)
+            return [{'Id': 'c-1', 'Parent': 'p-1'}]
+
+        # two policies on the same child resource type
+        p1, p2 = Manager([], {'name': 'p1'}), Manager([], {'name': 'p2'})
+        children = graph.children(p1, 'p-1', ('list', {}), fetch)
+        children[0]['c7n:matched'] = True
+        self.assertEqual(
+            graph.children(p2, 'p-1', ('list', {}), fetch),
+            [{'Id': 'c-1', 'Parent': 'p-1'}])
+        self.assertEqual(fetched, [True])
+
+    def test_references(self):
+        graph = ResourceGraph()
+        manager = Manager([
+            {'Id': 'i-1', 'Groups': ['sg-1', 'sg-2']},
+            {'Id': 'i-2', 'Groups': ['sg-2']},
+            {'Id': 'i-3'}])
+        refs = graph.get_references(manager, 'groups', lambda r: r.get('Groups'))
+        self.assertEqual(
+            {k: [r['Id'] for r in v] for k, v in refs.items()},
+            {'sg-1': ['i-1'], 'sg-2': ['i-1', 'i-2']})
+
+    def test_security_group_usage_shared(self):
+        factory = self.replay_flight_data("test_security_group_used")
+        fetched = Counter()
+        fetch = ResourceGraph._fetch
+
+        def counted_fetch(graph, manager, augment):
+            fetched[manager.type] += 1
+            return fetch(graph, manager, augment)
+        self.patch(ResourceGraph, '_fetch', counted_fetch)
+
+        used = self.load_policy(
+            {"name": "sg-used", "resource": "security-group", "filters": ["used"]},
+            session_factory=factory)
+        unused = self.load_policy(
+            {"name": "sg-unused", "resource": "security-group", "filters": ["unused"]},
+            session_factory=factory)
+        unused.ctx.graph = used.ctx.graph
+
+        used_ids = {r['GroupId'] for r in used.run()}
+        unused_ids = {r['GroupId'] for r in unused.run()}
+        self.assertEqual(
+            used_ids, {"sg-f9cc4d9f", "sg-0a2cb503a229c31c1", "sg-1c8a186c"})
+        self.assertFalse(used_ids & unused_ids)
+        self.assertEqual(set(fetched.values()), {1})
+        self.assertIn('eni', fetched)
+
+    def test_reference_store(self):
+        with ReferenceStore(self.get_temp_dir() + '/refs/refs.db') as store:
+            self.assertIsNone(store.get_scan('ec2'))
+            store.replace('ec2', {'i-1': ['ami-1'], 'i-2': ['ami-1', 'ami-2']}, 10)
+            store.replace('lc', {'lc-1': ['ami-3']}, 10)
+            self.assertEqual(store.get_referenced('ec2'), {'ami-1', 'ami-2'})
+            store.update('ec2', {'i-3': ['ami-4'], 'i-2': []}, ['i-1'], 20)
+            self.assertEqual(store.get_referenced('ec2'), {'ami-4'})
+            self.assertEqual(store.get_scan('ec2'), (10, 20))
+            self.assertEqual(store.get_referenced('lc'), {'ami-3'})
+
+    def test_referenced_incremental(self):
+        config = {'reference_store': self.get_temp_dir() + '/refs.db'}
+        manager = Manager(
+            [{'Id': 'i-1', 'ImageId': 'ami-1'}, {'Id': 'i-2', 'ImageId': 'ami-2'}],
+            config=config)
+
+        def referenced(changed):
+            graph = ResourceGraph()
+            self.patch(graph, 'get_changed_ids', lambda manager, since: changed)
+            return graph.get_referenced(manager, 'images', lambda r: [r['ImageId']])
+
+        # initial full scan
+        self.assertEqual(referenced(set()), {'ami-1', 'ami-2'})
+        self.assertEqual(manager.fetched, {True: 1})
+
+        # subsequent runs only fetch changed resources
+        manager._resources = [
+            {'Id': 'i-2', 'ImageId': 'ami-3'}, {'Id': 'i-3', 'ImageId': 'ami-1'}]
+        self.assertEqual(referenced({'i-1', 'i-2'}), {'ami-3'})
+        self.assertEqual(manager.fetched, {True: 1, 'ids': 2})
+
+        # unknown changes fall back to a full scan
+        self.assertEqual(referenced(None), {'ami-1', 'ami-3'})
+        self.assertEqual(manager.fetched, {True: 2, 'ids': 2})
+
+        # as does a full scan older than the rescan period
+        config['reference_rescan'] = 1e-9
+        self.assertEqual(referenced(set()), {'ami-1', 'ami-3'})
+        self.assertEqual(manager.fetched, {True: 3, 'ids': 2})
+
+    def test_changed_ids(self):
+        factory = self.replay_flight_data("test_graph_changed_ids")
+        p = self.load_policy(
+            {"name": "ec2", "resource": "ec2"}, session_factory=factory)
+        self.assertEqual(
+            ResourceGraph().get_changed_ids(p.resource_manager, 0),
+            {"i-0aa1b2c3d4e5f6a7b", "i-0bb1b2c3d4e5f6a7b"})
+
+        self.patch(ResourceGraph, 'max_changes', 1)
+        self.assertIsNone(ResourceGraph().get_changed_ids(p.resource_manager, 0))
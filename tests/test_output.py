@@ -4,6 +4,7 @@ import datetime
 import gzip
 import logging
 import shutil
+import threading
 from unittest import mock
 import os
 
@@ -11,6 +12,7 @@ from dateutil.parser import parse as date_parse
 
 from c7n.ctx import ExecutionContext
 from c7n.config import Config
+from c7n.executor import ThreadPoolExecutor
 from c7n.output import DirectoryOutput, BlobOutput, LogFile, metrics_outputs
 from c7n.resources.aws import S3Output, MetricsOutput, inspect_bucket_region
 from c7n.testing import mock_datetime_now, TestUtils
@@ -121,6 +123,31 @@ class S3OutputTest(TestUtils):
             content = fh.read().strip()
             self.assertTrue(content.endswith("hello world"))
 
+    def test_parallel_policy_log(self):
+        temp_dir = self.get_temp_dir()
+        output = LogFile(Bag(log_dir=temp_dir, options=Bag(parallel=2)), {})
+        logging.getLogger('custodian').setLevel(logging.INFO)
+        log = logging.getLogger("custodian.s3")
+        v = log.manager.disable
+        log.manager.disable = 0
+        self.addCleanup(setattr, log.manager, 'disable', v)
+
+        output.join_log()
+        log.info("policy thread")
+        # records from the policy's own thread pools are kept, others are not
+        with ThreadPoolExecutor(max_workers=1) as w:
+            w.submit(log.info, "policy worker").result()
+        thread = threading.Thread(target=log.info, args=("other policy",))
+        thread.start()
+        thread.join()
+        output.leave_log()
+
+        with open(os.path.join(temp_dir, "custodian-run.log")) as fh:
+            content = fh.read()
+        self.assertIn("policy thread", content)
+        self.assertIn("policy worker", content)
+        self.assertNotIn("other policy", content)
+
     def test_compress(self):
         output = self.get_s3_output()
 
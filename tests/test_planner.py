@@ -0,0 +1,66 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+from c7n.executor import MainThreadExecutor
+from c7n.planner import EnumerationPlanner
+
+from .common import BaseTest
+
+
+class EnumerationPlannerTest(BaseTest):
+
+    def setUp(self):
+        super().setUp()
+        self.patch(EnumerationPlanner, 'executor_factory', MainThreadExecutor)
+
+    def get_policies(self, session_factory):
+        return [
+            self.load_policy({
+                'name': 'ec2-running',
+                'resource': 'ec2',
+                'filters': [{'State.Name': 'running'}]},
+                session_factory=session_factory),
+            self.load_policy({
+                'name': 'ec2-age',
+                'resource': 'ec2',
+                'filters': [{'State.Name': 'running'}, {'type': 'state-age', 'days': 30}]},
+                session_factory=session_factory),
+            self.load_policy({
+                'name': 'ec2-lambda',
+                'resource': 'ec2',
+                'mode': {'type': 'periodic', 'schedule': 'rate(1 day)'}},
+                session_factory=session_factory),
+        ]
+
+    def test_plan_groups_shared_enumeration(self):
+        policies = self.get_policies(None)
+        policies.append(self.load_policy({'name': 'vol', 'resource': 'ebs'}))
+        groups = EnumerationPlanner(policies).plan()
+        self.assertEqual(len(groups), 1)
+        key, grouped = groups[0]
+        self.assertEqual(key['resource'], 'EC2')
+        self.assertEqual([p.name for p in grouped], ['ec2-running', 'ec2-age'])
+
+    def test_shared_enumeration(self):
+        session_factory = self.replay_flight_data("test_ec2_state_transition_age_filter")
+        policies = self.get_policies(session_factory)
+        source_type = type(policies[0].resource_manager.source)
+        fetches = []
+        source_resources = source_type.resources
+
+        def resources(source, query):
+            fetches.append(query)
+            return source_resources(source, query)
+        self.patch(source_type, 'resources', resources)
+
+        shared = EnumerationPlanner(policies).execute()
+        self.assertEqual(len(shared), 1)
+        self.assertIsNone(policies[2].ctx.shared_resources)
+
+        running = policies[0].run()
+        aged = policies[1].run()
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(len(running), 2)
+        self.assertEqual(len(aged), 1)
+        self.assertEqual(running[0]['InstanceId'], aged[0]['InstanceId'])
+        # each policy operates on a private copy
+        self.assertIsNot(running[0], aged[0])
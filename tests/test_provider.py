@@ -4,8 +4,13 @@
 
 from .common import BaseTest
 
+from c7n import provider
+from c7n.actions import ActionRegistry
+from c7n.filters import Filter, FilterRegistry
 from c7n.provider import get_resource_class, import_resource_classes
+from c7n.registry import PluginRegistry
 from c7n.resources import load_resources
+from c7n.resources.aws import AWS
 from c7n.resources.resource_map import ResourceMap
 
 
@@ -33,3 +38,29 @@ class ProviderTest(BaseTest):
         load_resources(('aws.ec2',))
         ec2 = get_resource_class('aws.ec2')
         self.assertEqual(ec2.type, 'ec2')
+
+    def test_lazy_elements(self):
+        imported = []
+
+        class Resource:
+            filter_registry = FilterRegistry('lazy.filters')
+            action_registry = ActionRegistry('lazy.actions')
+
+        class LazyFilter(Filter):
+            pass
+
+        class LazyProvider(AWS):
+            resources = PluginRegistry('lazy')
+            resource_map = {'aws.lazy': Resource}
+            lazy_elements = {'c7n_lazy_elements': {'filters': ('lazy',)}}
+
+        def import_module(name):
+            imported.append(name)
+            LazyProvider.resources.subscribe(
+                lambda registry, rclass: rclass.filter_registry.register('lazy', LazyFilter))
+
+        self.patch(provider.importlib, 'import_module', import_module)
+        LazyProvider.get_resource_types(('aws.lazy',))
+        self.assertEqual(imported, [])
+        self.assertIs(Resource.filter_registry.get('lazy'), LazyFilter)
+        self.assertEqual(imported, ['c7n_lazy_elements'])
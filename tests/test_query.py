@@ -1,11 +1,18 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import itertools
 import json
 import logging
 import os
+from unittest import mock
 
 
-from c7n.query import ResourceQuery, RetryPageIterator, TypeInfo
+import c7n.query
+from c7n.config import Bag
+from c7n.exceptions import ClientError, PolicyExecutionError, PolicyValidationError
+from c7n.query import (
+    AugmentScheduler, ChildResourceQuery, DetailStats, QueryResourceManager,
+    ResourceQuery, RetryPageIterator, TypeInfo)
 from c7n.resources.vpc import InternetGateway
 
 from botocore.config import Config
@@ -99,6 +106,128 @@ class ResourceQueryTest(BaseTest):
         assert repr(TypeInfo) == "<TypeInfo TypeInfo>"
 
 
+class ChildResourceQueryTest(BaseTest):
+
+    def test_parents_concurrent(self):
+        calls = []
+
+        class Client:
+
+            def can_paginate(self, op):
+                return False
+
+            def list_resource_record_sets(self, HostedZoneId):
+                calls.append(HostedZoneId)
+                if HostedZoneId == 'z3':
+                    raise ClientError(
+                        {'Error': {'Code': 'NoSuchHostedZone'}}, 'ListResourceRecordSets')
+                return {'ResourceRecordSets': [
+                    {'Name': '%s.example.com' % HostedZoneId}]}
+
+        p = self.load_policy({'name': 'records', 'resource': 'rrset'})
+        manager = p.resource_manager
+        self.patch(manager, 'get_client', Client)
+        self.patch(manager, 'chunk_size', 2)
+        zones = ['z1', 'z2', 'z3', 'z4', 'z5']
+
+        records = ChildResourceQuery(manager.session_factory, manager).filter(
+            manager, parent_ids=zones)
+        self.assertEqual(
+            [(r['Name'], r['c7n:parent-id']) for r in records],
+            [('z1.example.com', 'z1'), ('z2.example.com', 'z2'),
+             ('z4.example.com', 'z4'), ('z5.example.com', 'z5')])
+        self.assertEqual(sorted(calls), zones)
+
+        # other queries in the run reuse children
+        query = ChildResourceQuery(manager.session_factory, manager, capture_parent_id=True)
+        self.assertEqual(
+            query.filter(manager, parent_ids=['z2'])[0], ('z2', records[1]))
+        self.assertEqual(len(calls), 5)
+
+        query.manager.ctx.graph = None
+        query.filter(manager, parent_ids=['z2'])
+        self.assertEqual(len(calls), 6)
+
+    def test_parent_errors(self):
+        class Client:
+
+            def can_paginate(self, op):
+                return False
+
+            def list_resource_record_sets(self, HostedZoneId):
+                raise ClientError(
+                    {'Error': {'Code': 'AccessDenied'}}, 'ListResourceRecordSets')
+
+        p = self.load_policy({'name': 'records', 'resource': 'rrset'})
+        manager = p.resource_manager
+        self.patch(manager, 'get_client', Client)
+        with self.assertRaises(ClientError):
+            ChildResourceQuery(manager.session_factory, manager).filter(
+                manager, parent_ids=['z1'])
+
+
+class AugmentSchedulerTest(BaseTest):
+
+    def test_schedule(self):
+        scheduler = AugmentScheduler()
+        manager = Bag(type='lambda', max_workers=3, chunk_size=20, config=Bag())
+        key = ('123456789012', 'us-east-1', 'lambda', 'get_function')
+        self.assertEqual(scheduler.schedule(manager, key, 10), (20, 3))
+        self.assertEqual(scheduler.schedule(manager, key, 40), (14, 3))
+
+        # concurrency grows with successful calls, chunks shrink with latency
+        stats = scheduler.get_stats(key, 3)
+        stats.record(0.5)
+        self.assertEqual(scheduler.schedule(manager, key, 100), (4, 4))
+        self.assertEqual(scheduler.schedule(manager, key, 100, batch=True), (20, 4))
+
+        # and concurrency halves on throttling
+        stats.record(None, throttled=True)
+        self.assertEqual(scheduler.schedule(manager, key, 100, batch=True), (20, 2))
+        self.assertEqual(scheduler.get_snapshot(), {
+            '123456789012.us-east-1.lambda.get_function': {'workers': 2, 'latency': 0.5}})
+
+        manager.config['augment'] = ['aws.lambda=8:5']
+        self.assertEqual(scheduler.schedule(manager, key, 100), (5, 8))
+        manager.config['augment'] = ['sqs=1', 'lambda=6']
+        self.assertEqual(scheduler.schedule(manager, key, 100, batch=True), (20, 6))
+        for value in ('lambda=0', 'lambda=4:0'):
+            manager.config['augment'] = [value]
+            with self.assertRaises(PolicyExecutionError):
+                scheduler.schedule(manager, key, 100)
+
+    def test_augment_key_account(self):
+        scheduler = AugmentScheduler()
+        self.patch(c7n.query, 'AUGMENT_SCHEDULER', scheduler)
+        self.patch(c7n.query, '_scalar_augment', lambda *args, **kw: [])
+        for account_id in ('111111111111', '222222222222'):
+            p = self.load_policy(
+                {'name': 'augment', 'resource': 'dlm-policy'},
+                config={'account_id': account_id, 'region': 'us-east-1'})
+            p.resource_manager.get_client = lambda: None
+            p.resource_manager.source.augment([{'PolicyId': 'p'}])
+        self.assertEqual(sorted(scheduler.ops), [
+            ('111111111111', 'us-east-1', 'dlm', 'get_lifecycle_policy'),
+            ('222222222222', 'us-east-1', 'dlm', 'get_lifecycle_policy')])
+
+    def test_detail_stats(self):
+        stats = DetailStats(3)
+
+        def detail(retries=0, error=None):
+            if error:
+                raise ClientError({'Error': {'Code': error}}, 'GetFunction')
+            return {'ResponseMetadata': {'RetryAttempts': retries}}
+
+        timed = stats.timed(detail)
+        timed()
+        timed(retries=1)
+        for error in ('Throttling', 'ResourceNotFoundException'):
+            with self.assertRaises(ClientError):
+                timed(error=error)
+        self.assertEqual((stats.calls, stats.throttles), (3, 2))
+        self.assertIsNotNone(stats.latency)
+
+
 class ConfigSourceTest(BaseTest):
 
     def test_config_select(self):
@@ -128,6 +257,161 @@ class ConfigSourceTest(BaseTest):
         p.data['query'] = [{'clause': "configuration.imageId = 'xyz'"}]
         self.assertIn("imageId = 'xyz'", source.get_query_params(None)['expr'])
 
+    def test_config_batch_get(self):
+        p = self.load_policy({'name': 'x', 'resource': 'ec2'})
+        source = p.resource_manager.get_source('config')
+        client = mock.MagicMock()
+        client.batch_get_resource_config.side_effect = [
+            {'baseConfigurationItems': [{'resourceId': 'i-1'}],
+             'unprocessedResourceKeys': [
+                 {'resourceType': 'AWS::EC2::Instance', 'resourceId': 'i-2'}]},
+            {'baseConfigurationItems': [{'resourceId': 'i-2'}]}]
+        self.patch(source, 'get_select_pages', lambda client, query: [])
+        self.assertEqual(
+            source.get_resource_batch(client, ['i-1', 'i-2']),
+            [{'resourceId': 'i-1', 'tags': {}}, {'resourceId': 'i-2', 'tags': {}}])
+        self.assertEqual(
+            client.batch_get_resource_config.call_args_list[-1],
+            mock.call(resourceKeys=[
+                {'resourceType': 'AWS::EC2::Instance', 'resourceId': 'i-2'}]))
+
+    def test_config_batch_get_error(self):
+        p = self.load_policy({'name': 'x', 'resource': 'ec2'})
+        source = p.resource_manager.get_source('config')
+        self.patch(c7n.query, 'local_session', mock.MagicMock())
+
+        def get_resource_batch(client, ids):
+            if 'i-2' in ids:
+                raise ValueError('batch failed')
+            return [{'resourceId': i, 'configuration': {'instanceId': i},
+                     'supplementaryConfiguration': {}} for i in ids]
+
+        self.patch(source, 'get_resource_batch', get_resource_batch)
+        self.patch(source, 'batch_size', 1)
+        with self.assertRaises(ValueError):
+            source.get_resources(['i-1', 'i-2'])
+
+        # the list fallback skips failed batches
+        output = self.capture_logging(name=p.resource_manager.log.name)
+        self.assertEqual(
+            list(itertools.chain.from_iterable(
+                source.iter_resource_batches(['i-1', 'i-2'], ignore_errors=True))),
+            [{'InstanceId': 'i-1'}])
+        self.assertIn('batch failed', output.getvalue())
+
+    def test_config_batch_get_tags(self):
+        p = self.load_policy({'name': 'x', 'resource': 'ebs'})
+        source = p.resource_manager.get_source('config')
+        client = mock.MagicMock()
+        client.batch_get_resource_config.return_value = {
+            'baseConfigurationItems': [
+                {'resourceId': 'vol-1', 'configuration': '{"volumeId": "vol-1"}',
+                 'supplementaryConfiguration': {}}]}
+        queries = []
+
+        def get_select_pages(client, query):
+            queries.append(query)
+            return [{'Results': [json.dumps({'resourceId': 'vol-1', 'tags': [
+                {'key': 'App', 'value': 'Dev', 'tag': 'App=Dev'}]})]}]
+
+        self.patch(source, 'get_select_pages', get_select_pages)
+        resources = [source.load_resource(i) for i in
+                     source.get_resource_batch(client, ['vol-1'])]
+        self.assertEqual(
+            resources, [{'VolumeId': 'vol-1', 'Tags': [{'Key': 'App', 'Value': 'Dev'}]}])
+        self.assertEqual(queries, [{'expr': (
+            "select resourceId, tags where resourceType = 'AWS::EC2::Volume' "
+            "AND resourceId IN ('vol-1')")}])
+
+    def test_config_aggregator(self):
+        p = self.load_policy(
+            {'name': 'x', 'resource': 'ec2', 'source': 'config',
+             'query': [{'aggregator': 'org'}]},
+            config={'account_id': '123456789012', 'region': 'us-west-2'})
+        source = p.resource_manager.source
+        self.assertIn('config:SelectAggregateResourceConfig', source.get_permissions())
+        query = source.get_query_params(None)
+        self.assertEqual(query['aggregator'], 'org')
+        self.assertTrue(query['expr'].endswith(
+            "AND accountId = '123456789012' AND awsRegion = 'us-west-2'"))
+
+        client = mock.MagicMock()
+        client.batch_get_aggregate_resource_config.return_value = {
+            'BaseConfigurationItems': [{'resourceId': 'i-1'}]}
+        queries = []
+        self.patch(source, 'get_select_pages',
+                   lambda client, query: queries.append(query) or [])
+        self.assertEqual(
+            source.get_resource_batch(client, ['i-1']), [{'resourceId': 'i-1', 'tags': {}}])
+        self.assertEqual(queries[0]['aggregator'], 'org')
+        self.assertTrue(queries[0]['expr'].endswith(
+            "AND accountId = '123456789012' AND awsRegion = 'us-west-2'"))
+        client.batch_get_aggregate_resource_config.assert_called_once_with(
+            ConfigurationAggregatorName='org',
+            ResourceIdentifiers=[{
+                'SourceAccountId': '123456789012', 'SourceRegion': 'us-west-2',
+                'ResourceId': 'i-1', 'ResourceType': 'AWS::EC2::Instance'}])
+
+    def test_config_aggregator_source(self):
+        policy = {'name': 'x', 'resource': 'ebs', 'source': 'config-aggregator',
+                  'query': [{'aggregator': 'org'}]}
+        p = self.load_policy(policy, config={'account_id': '123456789012'})
+        source = p.resource_manager.source
+        query = source.get_query_params(None)
+        self.assertEqual(query, {
+            'aggregator': 'org',
+            'expr': ("select resourceId, accountId, awsRegion, configuration, "
+                     "supplementaryConfiguration where resourceType = 'AWS::EC2::Volume'")})
+
+        def item(volume_id, account_id, region):
+            return json.dumps({
+                'resourceId': volume_id, 'accountId': account_id, 'awsRegion': region,
+                'configuration': {'volumeId': volume_id}, 'supplementaryConfiguration': {}})
+
+        self.patch(source, 'get_select_pages', lambda client, query: [{'Results': [
+            item('vol-1', '111111111111', 'us-east-1'),
+            item('vol-2', '222222222222', 'eu-west-1'),
+            item('vol-3', '111111111111', 'us-east-1')]}])
+        resource_sets = list(source.iter_resources())
+        self.assertEqual(
+            [[r['VolumeId'] for r in rset] for rset in resource_sets],
+            [['vol-1', 'vol-3'], ['vol-2']])
+        self.assertEqual(
+            p.resource_manager.get_arns(resource_sets[1]),
+            ['arn:aws:ec2:eu-west-1:222222222222:volume/vol-2'])
+
+        with self.assertRaises(PolicyValidationError):
+            self.load_policy(dict(policy, query=[]))
+        with self.assertRaises(PolicyValidationError):
+            self.load_policy(dict(policy, actions=['delete']))
+        self.load_policy(dict(policy, actions=[
+            {'type': 'notify', 'to': ['a@example.com'],
+             'transport': {'type': 'sqs', 'queue': 'abc'}}]))
+        self.load_policy(dict(policy, filters=[
+            {'or': [{'VolumeType': 'gp2'}, {'not': [{'Encrypted': True}]}]},
+            {'type': 'list-item', 'key': 'Attachments', 'attrs': [{'State': 'attached'}]}]))
+        with self.assertRaises(PolicyValidationError):
+            self.load_policy(dict(policy, filters=[{'not': [{'type': 'instance'}]}]))
+
+        # full expressions query the aggregator as is
+        expr = "select resourceId where resourceType = 'AWS::EC2::Volume'"
+        p = self.load_policy(
+            dict(policy, query=[{'aggregator': 'org'}, {'expr': expr}]))
+        self.assertEqual(
+            p.resource_manager.source.get_query_params(None),
+            {'expr': expr, 'aggregator': 'org'})
+
+    def test_config_aggregator_expr(self):
+        policy = {'name': 'x', 'resource': 'ebs', 'source': 'config',
+                  'query': [{'aggregator': 'org'},
+                            {'expr': "select resourceId where resourceType = 'AWS::EC2::Volume'"}]}
+        with self.assertRaises(PolicyValidationError):
+            self.load_policy(policy)
+        p = self.load_policy(dict(policy, query=[{'aggregator': 'org'}]))
+        self.assertEqual(
+            p.resource_manager.source.get_query_params({'expr': 'select resourceId'}),
+            {'expr': 'select resourceId', 'aggregator': 'org'})
+
 
 class QueryResourceManagerTest(BaseTest):
 
@@ -165,6 +449,115 @@ class QueryResourceManagerTest(BaseTest):
         resources = p.resource_manager.get_resources(["igw-5bce113f"])
         self.assertEqual(resources, [])
 
+    def test_get_resources_resource_cache(self):
+        session_factory = self.replay_flight_data("test_query_manager")
+        p = self.load_policy(
+            {"name": "igw-check", "resource": "internet-gateway"},
+            config={'cache_store': 'resource'},
+            session_factory=session_factory,
+            cache=True,
+        )
+        self.assertEqual(len(p.run()), 1)
+        resources = p.resource_manager.get_resources(["igw-2e65104a", "igw-xyz"])
+        self.assertEqual([r['InternetGatewayId'] for r in resources], ["igw-2e65104a"])
+        self.assertEqual(
+            p.resource_manager._cache.get_stats(), {'miss': 1, 'hit': 1, 'rows': 1})
+        with open(os.path.join(p.ctx.log_dir, 'metadata.json')) as fh:
+            metadata = json.load(fh)
+        self.assertEqual(metadata['cache-stats'], {'miss': 1})
+        self.assertIn('augment-stats', metadata)
+        self.assertIn(
+            'CacheMisses', [m['MetricName'] for m in metadata['metrics']])
+
+        # resources fetched by id are refreshed in the cached set
+        fetched = [dict(resources[0], Tags=[{'Key': 'App', 'Value': 'Dev'}])]
+        self.patch(p.resource_manager.source, 'get_resources', lambda ids: fetched)
+        p.resource_manager.get_resources(["igw-2e65104a"], cache=False)
+        self.assertEqual(
+            p.resource_manager.get_resources(["igw-2e65104a"]), fetched)
+
+    def test_stream_resources(self):
+        session_factory = self.replay_flight_data("test_ec2_state_transition_age_filter")
+        self.patch(QueryResourceManager, 'stream_chunk_size', 1)
+        p = self.load_policy(
+            {"name": "ec2-stream", "resource": "ec2",
+             "filters": [
+                 {"State.Name": "running"},
+                 {"type": "value", "value_type": "resource_count", "op": "gte", "value": 2},
+                 {"type": "state-age", "days": 30}]},
+            config={'stream': True},
+            session_factory=session_factory)
+        self.assertEqual(
+            [f.type for f in p.resource_manager.get_stream_filters()], ['value'])
+        augmented = []
+        augment = p.resource_manager.augment
+
+        def chunk_augment(resources):
+            augmented.append(len(resources))
+            return augment(resources)
+        p.resource_manager.augment = chunk_augment
+
+        resources = p.run()
+        self.assertEqual(augmented, [1, 1, 1])
+        self.assertEqual(len(resources), 1)
+
+    def test_pushdown_filters(self):
+        p = self.load_policy(
+            {"name": "ec2-pushdown", "resource": "ec2",
+             "query": [{"instance-state-name": "stopped"}],
+             "filters": [
+                 {"tag:Env": "prod"},
+                 {"type": "value", "key": "InstanceType", "op": "in",
+                  "value": ["m5.large", "m5.xlarge"]},
+                 {"State.Name": "running"},
+                 {"type": "value", "key": "VpcId", "value": "absent"},
+                 {"type": "value", "key": "ImageId", "op": "ne", "value": "ami-1"},
+                 {"type": "value", "value_type": "resource_count", "op": "gte", "value": 2},
+                 {"SubnetId": "subnet-1"}]})
+        self.assertEqual(
+            p.resource_manager.get_pushdown_query(
+                p.resource_manager.source.get_query_params(None)),
+            {"Filters": [
+                {"Name": "instance-state-name", "Values": ["stopped"]},
+                {"Name": "tag:Env", "Values": ["prod"]},
+                {"Name": "instance-type", "Values": ["m5.large", "m5.xlarge"]}]})
+
+        p = self.load_policy(
+            {"name": "ec2-pushdown", "resource": "ec2",
+             "max-resources-percent": 10,
+             "filters": [{"State.Name": "running"}]})
+        self.assertEqual(p.resource_manager.get_pushdown_filters(), [])
+
+    def test_pushdown_resources(self):
+        session_factory = self.replay_flight_data("test_ec2_state_transition_age_filter")
+        p = self.load_policy(
+            {"name": "ec2-pushdown", "resource": "ec2",
+             "filters": [{"State.Name": "running"}]},
+            session_factory=session_factory)
+        queries = []
+        resources = p.resource_manager.source.resources
+
+        def fetch(query):
+            queries.append(query)
+            return resources(query)
+        p.resource_manager.source.resources = fetch
+        self.assertEqual(len(p.run()), 2)
+        self.assertEqual(
+            queries,
+            [{"Filters": [{"Name": "instance-state-name", "Values": ["running"]}]}])
+
+    def test_stream_filter_barrier(self):
+        p = self.load_policy(
+            {"name": "ec2-stream", "resource": "ec2",
+             "filters": [
+                 {"tag:Env": "prod"},
+                 {"or": [{"State.Name": "running"}, {"type": "state-age", "days": 30}]},
+                 {"type": "value", "value_type": "resource_count", "op": "gte", "value": 2},
+                 {"State.Name": "running"}]},
+            config={'stream': True})
+        self.assertEqual(
+            [f.type for f in p.resource_manager.get_stream_filters()], ['value', 'or'])
+
     def test_detail_spec_resource_not_found(self):
         # Test the case where List* API returns a resource that
         # is not found with the Get* API.
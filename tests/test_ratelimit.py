@@ -0,0 +1,103 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+from unittest import mock
+
+from botocore.awsrequest import AWSResponse
+
+from c7n import ratelimit
+from c7n.credentials import SessionFactory
+from c7n.ratelimit import RateLimiter, TokenBucket
+
+from .common import BaseTest
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.now += delay
+
+
+class TokenBucketTest(BaseTest):
+
+    def setUp(self):
+        super().setUp()
+        self.clock = Clock()
+        self.patch(ratelimit, 'time', self.clock)
+
+    def test_unlimited_until_throttled(self):
+        bucket = TokenBucket()
+        self.assertEqual([bucket.acquire() for _ in range(10)], [0] * 10)
+        bucket.succeeded()
+        self.assertIsNone(bucket.rate)
+
+        # initial rate is half the observed rate
+        bucket.throttled()
+        self.assertEqual(bucket.rate, 5)
+        self.assertAlmostEqual(bucket.acquire(), 0.2)
+        self.assertAlmostEqual(bucket.acquire(), 0.2)
+        self.clock.now += 2
+        # up to a second's worth of tokens accumulates
+        self.assertEqual([bucket.acquire() for _ in range(5)], [0] * 5)
+        self.assertAlmostEqual(bucket.acquire(), 0.2)
+
+    def test_aimd(self):
+        bucket = TokenBucket()
+        bucket.throttled()
+        self.assertEqual(bucket.rate, bucket.min_rate)
+        bucket.rate = 8
+        bucket.throttled()
+        self.assertEqual(bucket.rate, 4)
+        # roughly one more call per second, per second of calls
+        for _ in range(4):
+            bucket.succeeded()
+        self.assertTrue(4.9 < bucket.rate < 5)
+        bucket.rate = bucket.max_rate
+        bucket.succeeded()
+        self.assertEqual(bucket.rate, bucket.max_rate)
+
+
+class RateLimiterTest(BaseTest):
+
+    def test_install(self):
+        limiter = RateLimiter()
+        self.patch(ratelimit, 'RATE_LIMITER', limiter)
+        session = SessionFactory('us-east-1')()
+        client = session.client('ec2', region_name='us-west-2')
+        operation = client.meta.service_model.operation_model('DescribeInstances')
+        context = {'client_region': 'us-west-2'}
+
+        def response(status, code=None):
+            parsed = code and {'Error': {'Code': code}} or {}
+            return (AWSResponse('https://ec2', status, {}, None), parsed)
+
+        with mock.patch.object(TokenBucket, 'acquire') as acquire:
+            client.meta.events.emit(
+                'before-call.ec2.DescribeInstances', model=operation, params={},
+                request_signer=None, context=context)
+            acquire.assert_called_once()
+
+        credentials = session.get_credentials()
+        bucket = limiter.get_bucket((
+            credentials and credentials.access_key, 'us-west-2', 'ec2', 'DescribeInstances'))
+        self.assertIsNone(bucket.rate)
+
+        def needs_retry(response):
+            client.meta.events.emit(
+                'needs-retry.ec2.DescribeInstances', response=response, endpoint=None,
+                operation=operation, attempts=1, caught_exception=None,
+                request_dict={'context': context})
+
+        with mock.patch.object(TokenBucket, 'acquire') as acquire:
+            needs_retry(response(400, 'RequestLimitExceeded'))
+            acquire.assert_called_once()
+        self.assertEqual(limiter.get_stats(), {'us-west-2.ec2.DescribeInstances': 0.5})
+        needs_retry(response(200))
+        self.assertEqual(bucket.rate, 2.5)
+        needs_retry(response(400, 'InvalidParameterValue'))
+        self.assertEqual(bucket.rate, 2.5)
@@ -67,3 +67,28 @@ class RegistryTest(unittest.TestCase):
 
         registry.register('concrete', _plugin_impl_func, condition=False)
         self.assertEqual(list(registry.keys()), [])
+
+    def test_lazy(self):
+        registry = PluginRegistry('dummy')
+        loaded = []
+
+        class _plugin_impl:
+            pass
+
+        def loader():
+            loaded.append(True)
+            registry.register('lazy', _plugin_impl)
+
+        registry.register_lazy('lazy', loader)
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(list(registry.loaded_keys()), [])
+        self.assertEqual(loaded, [])
+        self.assertIs(registry.get('lazy'), _plugin_impl)
+        self.assertIn('lazy', registry)
+        self.assertEqual(loaded, [True])
+
+        # names that don't register are only loaded once
+        registry.register_lazy('missing', lambda: loaded.append(False))
+        self.assertEqual(list(registry.keys()), ['lazy'])
+        self.assertIsNone(registry.get('missing'))
+        self.assertEqual(loaded, [True, False])
@@ -832,7 +832,7 @@ class S3ConfigSource(ConfigTest):
         client.create_bucket(Bucket=bname)
         self.addCleanup(destroyBucket, client, bname)
         p = self.load_policy(
-            {"name": "s3-inv", "resource": "s3", "filters": [{"Name": bname}]},
+            {"name": "s3-inv", "resource": "s3"},
             session_factory=session_factory,
         )
 
@@ -986,7 +986,7 @@ class S3ConfigSource(ConfigTest):
         )
 
         p = self.load_policy(
-            {"name": "s3-inv", "resource": "s3", "filters": [{"Name": bname}]},
+            {"name": "s3-inv", "resource": "s3"},
             session_factory=session_factory,
         )
 
@@ -1390,6 +1390,70 @@ class S3Test(BaseTest):
                 'Retention': '2', 'Retention2': '3', 'test': 'test'})
         self.assertTrue("CreationDate" in resources[0])
 
+    def test_bucket_lazy_augment(self):
+        self.patch(s3.S3, "executor_factory", MainThreadExecutor)
+        self.patch(s3, "S3_AUGMENT_TABLE", [
+            ('get_bucket_tagging', 'Tags', [], 'TagSet'),
+            ('get_bucket_policy', 'Policy', None, 'Policy')])
+        session_factory = self.replay_flight_data("test_s3_get_resources")
+        p = self.load_policy(
+            {"name": "bucket-lazy", "resource": "s3",
+             "filters": [{"Name": "c7n-codebuild"}, {"tag:Owner": "nicholase"}]},
+            session_factory=session_factory)
+        self.assertEqual(p.resource_manager.get_augment_keys(), {'Tags'})
+        self.assertEqual(p.resource_manager.get_cache_key({})['augment'], ['Tags'])
+        resources = p.run()
+        self.assertEqual(len(resources), 1)
+        self.assertIn('Tags', resources[0])
+        self.assertNotIn('Policy', resources[0])
+
+    def test_bucket_augment_keys(self):
+        def get_augment_keys(filters=None, actions=None):
+            p = self.load_policy(
+                {"name": "bucket-keys", "resource": "s3",
+                 "filters": filters or [], "actions": actions or []})
+            return p.resource_manager.get_augment_keys()
+
+        self.assertEqual(get_augment_keys([{"Name": "abc"}]), set())
+        self.assertEqual(
+            get_augment_keys(
+                [{"or": [{"type": "global-grants"},
+                         {"not": [{"Versioning.Status": "Enabled"}]}]}],
+                [{"type": "toggle-logging", "target_bucket": "logs"}]),
+            {'Acl', 'Website', 'Versioning', 'Logging'})
+        # unknown references fall back to fetching everything
+        self.assertIsNone(get_augment_keys())
+        self.assertIsNone(get_augment_keys(
+            [{"type": "value", "key": "length(Tags)", "value": 0}]))
+        self.assertIsNone(get_augment_keys(
+            [{"Name": "abc"}], [{"type": "notify", "to": ["a@example.com"],
+                                 "transport": {"type": "sqs", "queue": "abc"}}]))
+        self.assertIsNone(get_augment_keys(
+            [{"type": "value", "key": "Versioning.Status || Logging", "value": "x"}]))
+
+    def test_bucket_augment_keys_resource_values(self):
+        def get_augment_keys(filters):
+            p = self.load_policy(
+                {"name": "bucket-keys", "resource": "s3", "filters": filters})
+            return p.resource_manager.get_augment_keys()
+
+        # expr values and value paths are evaluated against the bucket
+        self.assertEqual(get_augment_keys(
+            [{"type": "value", "key": "Name", "value_type": "expr",
+              "value": "Versioning.Status"}]), {"Versioning"})
+        self.assertEqual(get_augment_keys(
+            [{"type": "value", "key": "Logging.TargetBucket", "op": "in",
+              "value_path": "Acl.Grants[*].Grantee.ID"}]), {"Logging", "Acl"})
+        self.assertIsNone(get_augment_keys(
+            [{"type": "value", "key": "Name", "value_type": "expr",
+              "value": "join('-', [Name, Location.LocationConstraint])"}]))
+        self.assertIsNone(get_augment_keys(
+            [{"type": "value", "key": "Name", "op": "in",
+              "value_path": "Policy || Acl"}]))
+        # other values are literals
+        self.assertEqual(get_augment_keys(
+            [{"type": "value", "key": "Name", "value": "Versioning.Status"}]), set())
+
     def test_multipart_large_file(self):
         self.patch(s3.S3, "executor_factory", MainThreadExecutor)
         self.patch(s3.EncryptExtantKeys, "executor_factory", MainThreadExecutor)
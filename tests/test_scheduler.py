@@ -0,0 +1,80 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+from collections import Counter
+import threading
+import time
+
+from c7n.config import Bag, Config
+from c7n.scheduler import PolicyScheduler
+
+from .common import BaseTest
+
+
+def fake_policy(name, service, region='us-east-1', mode='pull'):
+    return Bag(
+        name=name,
+        execution_mode=mode,
+        provider_name='aws',
+        resource_type=service,
+        session_factory=None,
+        ctx=Bag(session_factory=None),
+        options=Config.empty(region=region),
+        resource_manager=Bag(resource_type=Bag(service=service)))
+
+
+class PolicySchedulerTest(BaseTest):
+
+    def test_budget_key(self):
+        self.assertEqual(
+            PolicyScheduler.get_budget_key(fake_policy('a', 'ec2', 'us-west-2')),
+            ('aws', 'ec2', 'us-west-2'))
+        self.assertIsNone(
+            PolicyScheduler.get_budget_key(fake_policy('a', 'ec2', mode='periodic')))
+
+    def test_service_budget(self):
+        policies = [fake_policy('ec2-%d' % i, 'ec2') for i in range(6)]
+        policies.extend([fake_policy('s3-%d' % i, 's3') for i in range(3)])
+        policies.append(fake_policy('lambda', 'ec2', mode='periodic'))
+
+        lock = threading.Lock()
+        active = Counter()
+        peak = Counter()
+
+        def execute(p):
+            key = PolicyScheduler.get_budget_key(p)
+            with lock:
+                active[key] += 1
+                peak[key] = max(peak[key], active[key])
+            time.sleep(0.01)
+            with lock:
+                active[key] -= 1
+            return p.name
+
+        scheduler = PolicyScheduler(policies, max_workers=4, service_limit=2)
+        results = [f.result() for p, f in scheduler.run(execute)]
+        self.assertEqual(sorted(results), sorted(p.name for p in policies))
+        self.assertEqual(peak[('aws', 'ec2', 'us-east-1')], 2)
+        self.assertEqual(peak[('aws', 's3', 'us-east-1')], 2)
+        self.assertEqual(peak[None], 1)
+
+    def test_isolated_session_factory(self):
+        p1 = self.load_policy({'name': 'ec2-a', 'resource': 'ec2'})
+        p2 = self.load_policy({'name': 'ec2-b', 'resource': 'ec2'})
+        p2.session_factory = p1.session_factory
+        scheduler = PolicyScheduler([p1, p2], max_workers=2)
+        results = dict(scheduler.run(lambda p: p.ctx.session_factory))
+        self.assertIsNot(results[p1].result(), results[p2].result())
+        self.assertIs(p1.resource_manager.session_factory, p1.session_factory)
+        self.assertIs(
+            p1.resource_manager.source.query.session_factory, p1.session_factory)
+
+    def test_isolate_keeps_validated_state(self):
+        p = self.load_policy({
+            'name': 'ec2-mark', 'resource': 'ec2',
+            'actions': [{'type': 'mark-for-op', 'op': 'stop', 'days': 1}]})
+        p.validate()
+        manager = p.resource_manager
+        scheduler = PolicyScheduler([p], max_workers=1)
+        results = dict(scheduler.run(lambda p: p.resource_manager.actions[0].tz))
+        self.assertIs(p.resource_manager, manager)
+        self.assertIsNotNone(results[p].result())
@@ -1,5 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import json
+import os
 from unittest import mock
 from jsonschema.exceptions import best_match, ValidationError
 
@@ -661,3 +663,110 @@ class SchemaTest(BaseTest):
                 for err in validate(data, validator.schema)
             )
             self.assertEqual(failed, expect_failure)
+
+
+class SchemaArtifactTest(BaseTest):
+
+    def test_artifact(self):
+        path = self.get_temp_dir()
+        schema.write_artifact('aws', path)
+        vocabulary = schema.get_vocabulary(('aws.ec2', 'aws.app-elb'))
+        artifact_schema = schema.load_artifact(vocabulary, path)
+        self.assertEqual(
+            artifact_schema['properties']['policies']['items'],
+            {'anyOf': [{'$ref': '#/definitions/resources/aws.app-elb/policy'},
+                       {'$ref': '#/definitions/resources/aws.ec2/policy'}]})
+
+        validator = JsonSchemaValidator(artifact_schema)
+        self.assertEqual(list(validator.iter_errors({'policies': [
+            {'name': 'ec2', 'resource': 'ec2', 'filters': ['instance-age']},
+            {'name': 'alb', 'resource': 'aws.app-elb', 'actions': ['delete']}]})), [])
+        self.assertTrue(list(validator.iter_errors({'policies': [
+            {'name': 'ec2', 'resource': 'ec2', 'filters': ['instance-size']}]})))
+        self.assertTrue(list(validator.iter_errors({'policies': [
+            {'name': 'sqs', 'resource': 'aws.sqs'}]})))
+
+        # plugins registering additional elements invalidate the artifact
+        class ArtifactFilter(ValueFilter):
+            pass
+
+        ec2 = schema.clouds['aws'].resources['ec2']
+        ec2.filter_registry.register('artifact-test', ArtifactFilter)
+        self.addCleanup(ec2.filter_registry.unregister, 'artifact-test')
+        self.assertIsNone(schema.load_artifact(
+            schema.get_vocabulary(('aws.ec2',)), path))
+        self.assertIsNotNone(schema.load_artifact(
+            schema.get_vocabulary(('aws.app-elb',)), path))
+
+    def test_vocabulary_lazy(self):
+        path = self.get_temp_dir()
+        schema.write_artifact('aws', path)
+        loaded = []
+        ec2 = schema.clouds['aws'].resources['ec2']
+        ec2.filter_registry.register_lazy('lazy-test', lambda: loaded.append(True))
+        self.addCleanup(ec2.filter_registry.unregister, 'lazy-test')
+        vocabulary = schema.get_vocabulary(('aws.ec2',))
+        self.assertNotIn('lazy-test', vocabulary['resources']['aws.ec2']['filters'])
+        self.assertIsNotNone(schema.load_artifact(vocabulary, path))
+        self.assertEqual(loaded, [])
+
+        # elements of modules not yet imported are in the artifact
+        vocabulary['resources']['aws.ec2']['filters'].remove('instance-age')
+        self.assertIsNotNone(schema.load_artifact(vocabulary, path))
+
+    def test_artifact_version(self):
+        path = self.get_temp_dir()
+        with open(os.path.join(path, 'aws.json'), 'w') as fh:
+            json.dump({'version': '0.0.1'}, fh)
+        self.assertIsNone(schema.read_artifact('aws', path))
+
+    def test_artifact_fingerprint(self):
+        path = self.get_temp_dir()
+        schema.write_artifact('aws', path)
+        self.assertIsNotNone(schema.read_artifact('aws', path))
+        schema._read_artifact.cache_clear()
+        self.addCleanup(schema._read_artifact.cache_clear)
+        self.patch(schema, 'get_source_fingerprint', lambda provider_name: 'modified')
+        self.assertIsNone(schema.read_artifact('aws', path))
+
+    def test_validator_cached(self):
+        load_resources(('aws.sqs',))
+        self.patch(schema, 'USE_ARTIFACT', False)
+        validator = schema.get_validator(('aws.sqs',))
+        self.assertIs(schema.get_validator(('aws.sqs',)), validator)
+        self.assertEqual(validate({'policies': [
+            {'name': 'sqs', 'resource': 'aws.sqs', 'filters': ['artifact-test']}]},
+            resource_types=('aws.sqs',))[0].validator, 'anyOf')
+
+
+class PolicyValidatorTest(BaseTest):
+
+    def test_dispatch_by_resource(self):
+        load_resources(('aws.ec2', 'aws.sqs'))
+        validator = schema.get_policy_validator('aws.ec2')
+        self.assertIs(schema.get_policy_validator('aws.ec2'), validator)
+        self.assertEqual(schema.get_resource_map()['ec2'], 'aws.ec2')
+
+        errors = list(schema.iter_errors({'policies': [
+            {'name': 'sqs', 'resource': 'sqs'},
+            {'name': 'ec2', 'resource': 'aws.ec2',
+             'actions': [{'type': 'terminate', 'force': 'asdf'}]}]}))
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(list(errors[0].absolute_path), ['policies', 1, 'actions', 0])
+        error = schema.specific_error(errors[0])
+        self.assertEqual(error.validator, 'type')
+        self.assertEqual(list(error.absolute_path), ['policies', 1, 'actions', 0, 'force'])
+
+    def test_unknown_resource(self):
+        errors = list(schema.iter_errors({'policies': [
+            {'name': 'ec2', 'resource': 'ec2'},
+            {'name': 'xyz', 'resource': 'aws.xyz'}]}))
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].validator, 'anyOf')
+        self.assertEqual(list(errors[0].absolute_path), ['policies', 1])
+        self.assertEqual(
+            schema.policy_error_name(errors[0], {'policies': [{}, {'name': 'xyz'}]}), 'xyz')
+
+    def test_document_errors(self):
+        errors = list(schema.iter_errors({'policies': [], 'extra': 1}))
+        self.assertEqual([e.validator for e in errors], ['additionalProperties'])
@@ -7,8 +7,10 @@ import time
 from freezegun import freeze_time
 from mock import MagicMock, call
 
-from c7n.tags import universal_retry, coalesce_copy_user_tags
-from c7n.exceptions import PolicyExecutionError, PolicyValidationError
+from c7n import tags
+from c7n.tags import AdaptiveConcurrency, universal_retry, coalesce_copy_user_tags
+from c7n.exceptions import ClientError, PolicyExecutionError, PolicyValidationError
+from c7n.executor import MainThreadExecutor
 from c7n.utils import yaml_load
 
 from .common import BaseTest
@@ -163,6 +165,92 @@ class UniversalTagTest(BaseTest):
         results = policy.run()
         self.assertTrue('Tags' in results[0])
 
+    def get_tagging_client(self):
+        client = MagicMock()
+        self.patch(tags.utils, 'local_session', lambda factory: MagicMock(
+            client=lambda service, region_name, **kw: client))
+        return client
+
+    def get_config_rules(self, count):
+        p = self.load_policy({'name': 'rules', 'resource': 'config-rule'})
+        p.resource_manager.executor_factory = MainThreadExecutor
+        rules = [{'ConfigRuleName': 'r%d' % i,
+                  'ConfigRuleArn': 'arn:aws:config:us-east-1:644160558196:config-rule/r%d' % i}
+                 for i in range(count)]
+        return p.resource_manager, rules
+
+    def test_universal_augment_arn_chunks(self):
+        client = self.get_tagging_client()
+        client.get_resources.side_effect = lambda ResourceARNList: {
+            'ResourceTagMappingList': [
+                {'ResourceARN': arn, 'Tags': [{'Key': 'Name', 'Value': arn[-3:]}]}
+                for arn in ResourceARNList[::2]]}
+        manager, rules = self.get_config_rules(250)
+        tags.universal_augment(manager, rules)
+        self.assertEqual(
+            [len(c.kwargs['ResourceARNList']) for c in client.get_resources.call_args_list],
+            [100, 100, 50])
+        self.assertEqual(rules[2]['Tags'], [{'Key': 'Name', 'Value': '/r2'}])
+        self.assertEqual(rules[3]['Tags'], [])
+        client.get_paginator.assert_not_called()
+
+    def test_universal_augment_sweep(self):
+        self.patch(tags, 'UNIVERSAL_SWEEP_SIZE', 2)
+        client = self.get_tagging_client()
+        manager, rules = self.get_config_rules(3)
+        paginator = client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'ResourceTagMappingList': [
+                {'ResourceARN': rules[0]['ConfigRuleArn'], 'Tags': [{'Key': 'A', 'Value': 'B'}]},
+                {'ResourceARN': 'arn:aws:config:us-east-1:644160558196:config-rule/x',
+                 'Tags': []}]}]
+        tags.universal_augment(manager, rules)
+        paginator.paginate.assert_called_once_with(
+            ResourceTypeFilters=['config:config-rule'], ResourcesPerPage=100)
+        client.get_resources.assert_not_called()
+        self.assertEqual(rules[0]['Tags'], [{'Key': 'A', 'Value': 'B'}])
+        self.assertEqual(rules[1]['Tags'], [])
+
+    def test_universal_augment_sweep_error(self):
+        self.patch(tags, 'UNIVERSAL_SWEEP_SIZE', 2)
+        client = self.get_tagging_client()
+        manager, rules = self.get_config_rules(3)
+        client.get_paginator.return_value.paginate.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDenied'}}, 'GetResources')
+        client.get_resources.return_value = {'ResourceTagMappingList': [
+            {'ResourceARN': rules[0]['ConfigRuleArn'], 'Tags': [{'Key': 'A', 'Value': 'B'}]}]}
+        tags.universal_augment(manager, rules)
+        client.get_resources.assert_called_once()
+        self.assertEqual(rules[0]['Tags'], [{'Key': 'A', 'Value': 'B'}])
+        self.assertEqual(rules[1]['Tags'], [])
+
+    def test_tagging_type_filter(self):
+        for resource, type_filter in (
+                ('config-rule', 'config:config-rule'),
+                ('rest-api', None),
+                ('apigw-domain-name', None),
+                ('apigwv2', None)):
+            p = self.load_policy({'name': 'type-filter', 'resource': resource})
+            self.assertEqual(tags.get_tagging_type_filter(p.resource_manager), type_filter)
+
+    def test_adaptive_concurrency(self):
+        sleep = MagicMock()
+        self.patch(time, "sleep", sleep)
+        throttle = ClientError({'Error': {'Code': 'ThrottlingException'}}, 'GetResources')
+        method = MagicMock(side_effect=[throttle, throttle, {'Result': 1}])
+        limit = AdaptiveConcurrency(4)
+        limit.limit = 3
+        self.assertEqual(limit.call(method, ResourceARNList=['arn:abc']), {'Result': 1})
+        self.assertEqual(sleep.call_count, 2)
+        # halved twice, then one additive increase.
+        self.assertEqual(limit.limit, 2)
+        self.assertEqual(limit.active, 0)
+
+        denied = ClientError({'Error': {'Code': 'AccessDenied'}}, 'GetResources')
+        self.assertRaises(
+            ClientError, limit.call, MagicMock(side_effect=[denied]), ResourceARNList=[])
+        self.assertEqual(limit.limit, 3)
+
     def test_retry_no_error(self):
         mock = MagicMock()
         mock.side_effect = [{"Result": 42}]
@@ -8,6 +8,8 @@ import time
 from unittest import mock
 
 from botocore.exceptions import ClientError
+import jmespath
+import pytest
 from dateutil.parser import parse as parse_date
 
 from c7n import query
@@ -748,6 +750,27 @@ def test_jmespath_parse_split():
     assert result == ['abc', 'xyz']
 
 
+def test_jmespath_compile_cache():
+    assert utils.jmespath_compile('foo[].bar') is utils.jmespath_compile('foo[].bar')
+    assert isinstance(utils.jmespath_compile('State.Name'), utils.FieldPath)
+    assert isinstance(utils.jmespath_compile('"State".Name'), utils.ParsedResultWithOptions)
+
+
+@pytest.mark.parametrize('data', [
+    {'State': {'Name': 'running'}},
+    {'State': {'Name': None}},
+    {'State': None},
+    {'State': ['running']},
+    {'State': 'running'},
+    {},
+    [],
+    None,
+])
+def test_jmespath_field_path(data):
+    assert utils.jmespath_compile('State.Name').search(data) == jmespath.search(
+        'State.Name', data)
+
+
 def test_jmespath_parse_to_json():
     result = utils.jmespath_search(
         'from_json(foo).bar',
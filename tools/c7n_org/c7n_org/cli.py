@@ -31,6 +31,7 @@ from c7n.config import Config
 from c7n.policy import PolicyCollection
 from c7n.provider import get_resource_class, clouds as cloud_providers
 from c7n.reports.csvout import Formatter, fs_record_set, record_set, strip_output_path
+from c7n.scheduler import PolicyScheduler
 from c7n.resources import load_available
 from c7n.utils import (
     CONN_CACHE, dumps, filter_empty, format_string_values, get_policy_provider, join_output_path)
@@ -662,8 +663,23 @@ def _update(old, new):
     return old
 
 
+def _policy_runs(policies, parallel):
+    """Yield (policy, callable returning the policy's resources).
+
+    With parallel, policies are executed concurrently and the callable
+    returns (or raises) the policy's result.
+    """
+    if parallel <= 1:
+        for p in policies:
+            yield p, p.run
+        return
+    scheduler = PolicyScheduler(policies, parallel)
+    for p, f in scheduler.run(lambda p: p.run()):
+        yield p, f.result
+
+
 def run_account(account, region, policies_config, output_path,
-                cache_period, cache_path, metrics, dryrun, debug):
+                cache_period, cache_path, metrics, dryrun, debug, parallel=0):
     """Execute a set of policies on an account.
     """
     logging.getLogger('custodian.output').setLevel(logging.ERROR + 1)
@@ -679,7 +695,7 @@ def run_account(account, region, policies_config, output_path,
         region=region, cache=cache_path,
         cache_period=cache_period, dryrun=dryrun, output_dir=output_path,
         account_id=account['account_id'], metrics_enabled=metrics,
-        log_group=None, profile=None, external_id=None)
+        log_group=None, profile=None, external_id=None, parallel=parallel)
 
     env_vars = account_tags(account)
 
@@ -726,11 +742,13 @@ def run_account(account, region, policies_config, output_path,
                 'policy_name': p.name,
             }))
             p.validate()
+
+        for p, run_policy in _policy_runs(policies, parallel):
             log.debug(
                 "Running policy:%s account:%s region:%s",
                 p.name, account['name'], region)
             try:
-                resources = p.run()
+                resources = run_policy()
                 policy_counts[p.name] = len(resources) if resources else 0
                 if not resources:
                     continue
@@ -809,11 +827,13 @@ def initialize_provider_output(policies_config, output_dir, regions):
 @click.option("--metrics", default=False, is_flag=True)
 @click.option("--metrics-uri", default=None, help="Configure provider metrics target")
 @click.option("--dryrun", default=False, is_flag=True)
+@click.option('--parallel', default=0, type=int,
+              help="Execute pull mode policies concurrently within an account region")
 @click.option('--debug', default=False, is_flag=True)
 @click.option('-v', '--verbose', default=False, help="Verbose", is_flag=True)
 def run(config, use, output_dir, accounts, not_accounts, tags, region,
         policy, policy_tags, cache_period, cache_path, metrics,
-        dryrun, debug, verbose, metrics_uri):
+        dryrun, debug, verbose, metrics_uri, parallel):
     """run a custodian policy across accounts"""
     accounts_config, custodian_config, executor = init(
         config, use, debug, verbose, accounts, tags, policy, policy_tags=policy_tags,
@@ -852,7 +872,8 @@ def run(config, use, output_dir, accounts, not_accounts, tags, region,
                     cache_path,
                     metrics,
                     dryrun,
-                    debug)] = (a, r)
+                    debug,
+                    parallel)] = (a, r)
 
         for f in as_completed(futures):
             a, r = futures[f]
@@ -0,0 +1,84 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Compare resource cache codecs on size, save and load time.
+
+Resources are synthesized from the ec2 instance test data, replicated
+to the requested population with unique ids and datetime launch times,
+then stored and loaded via the sqlite cache with each available codec.
+
+  python tools/dev/cachebench.py --count 20000
+"""
+import argparse
+import copy
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dateutil.tz import tzutc
+
+from c7n import cache
+from c7n.config import Bag
+
+
+SAMPLE_PATH = Path(__file__).parent.parent.parent / "tests" / "data" / "ec2-instances.json"
+
+
+def get_resources(count):
+    samples = json.loads(SAMPLE_PATH.read_text())
+    launched = datetime(2024, 1, 1, tzinfo=tzutc())
+    resources = []
+    for idx in range(count):
+        r = copy.deepcopy(samples[idx % len(samples)])
+        r['InstanceId'] = 'i-%017x' % idx
+        r['LaunchTime'] = launched + timedelta(minutes=idx)
+        resources.append(r)
+    return resources
+
+
+def bench(codec, resources, rounds):
+    key = {'account': '123456789012', 'region': 'us-east-1', 'resource': 'EC2',
+           'source': 'describe', 'q': {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = Bag(cache=os.path.join(tmp_dir, 'cache.db'),
+                     cache_period=60, cache_codec=codec)
+        with cache.SqlKvCache(config) as kv:
+            t = time.perf_counter()
+            kv.save(key, resources)
+            save_time = time.perf_counter() - t
+            size = kv.size()
+
+            t = time.perf_counter()
+            for _ in range(rounds):
+                assert len(kv.get(key)) == len(resources)
+            load_time = (time.perf_counter() - t) / rounds
+    return size, save_time, load_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=10000, help="Resource population")
+    parser.add_argument('--rounds', type=int, default=3, help="Loads per codec")
+    parser.add_argument('--codec', action='append', default=[],
+                        help="Codecs to compare (default all available)")
+    args = parser.parse_args()
+
+    resources = get_resources(args.count)
+    codecs = args.codec or cache.Codec.available()
+    results = {c: bench(c, resources, args.rounds) for c in codecs}
+    baseline_size, _, baseline_load = results.get('pickle') or bench(
+        'pickle', resources, args.rounds)
+
+    print("%-16s %12s %8s %10s %10s %8s" % (
+        'codec', 'size', 'ratio', 'save (s)', 'load (s)', 'load x'))
+    for codec, (size, save_time, load_time) in results.items():
+        print("%-16s %12d %8.2f %10.3f %10.3f %8.2f" % (
+            codec, size, size / baseline_size, save_time, load_time,
+            load_time / baseline_load))
+
+
+if __name__ == '__main__':
+    main()
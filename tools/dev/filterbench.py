@@ -0,0 +1,117 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Compare per resource cost of interpreted, compiled and vectorized value filter evaluation.
+
+Resources are synthesized from the ec2 instance test data with varied
+states, types, tags and launch times, then run through a set of filter
+trees with each evaluation mode. Vectorized evaluation requires numpy.
+
+  python tools/dev/filterbench.py --count 100000
+"""
+import argparse
+import copy
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from dateutil.tz import tzutc
+
+from c7n.config import Bag
+from c7n.filters import ValueFilter
+from c7n.filters import core
+from c7n.filters.core import FilterRegistry
+
+
+SAMPLE_PATH = Path(__file__).parent.parent.parent / "tests" / "data" / "ec2-instance.json"
+
+FILTERS = {
+    'eq': [{'State.Name': 'running'}],
+    'tag': [{'tag:Env': 'prod'}],
+    'age': [{'type': 'value', 'key': 'LaunchTime', 'value_type': 'age',
+             'op': 'gt', 'value': 30}],
+    'regex': [{'type': 'value', 'key': 'InstanceType', 'op': 'regex',
+               'value': '^m5\\..*'}],
+    'number': [{'type': 'value', 'key': 'CpuOptions.CoreCount', 'op': 'gte', 'value': 4}],
+    'in': [{'type': 'value', 'key': 'InstanceType', 'op': 'in',
+            'value': ['t3.micro', 't3.small']}],
+    'tree': [{'or': [
+        {'and': [{'State.Name': 'running'}, {'tag:Env': 'present'}]},
+        {'not': [{'type': 'value', 'key': 'InstanceType', 'op': 'in',
+                  'value': ['t3.micro', 't3.small']}]}]}],
+}
+
+
+def get_resources(count):
+    sample = json.loads(SAMPLE_PATH.read_text())
+    launched = datetime(2024, 1, 1, tzinfo=tzutc())
+    states = ('running', 'stopped', 'pending')
+    types = ('m5.large', 't3.micro', 't3.small', 'c5.xlarge')
+    resources = []
+    for idx in range(count):
+        r = copy.deepcopy(sample)
+        r['InstanceId'] = 'i-%017x' % idx
+        r['State'] = {'Name': states[idx % len(states)]}
+        r['InstanceType'] = types[idx % len(types)]
+        r['CpuOptions'] = {'CoreCount': 2 ** (idx % 4), 'ThreadsPerCore': 2}
+        r['LaunchTime'] = (launched + timedelta(minutes=idx)).isoformat()
+        r['Tags'] = [{'Key': 'Name', 'Value': 'i%d' % idx}]
+        if idx % 2:
+            r['Tags'].append({'Key': 'Env', 'Value': idx % 4 == 1 and 'prod' or 'dev'})
+        resources.append(r)
+    return resources
+
+
+class Manager(Bag):
+
+    def get_model(self):
+        return Bag(id='InstanceId')
+
+    def iter_filters(self, block_end=False):
+        return []
+
+
+MODES = ('interpreted', 'compiled', 'vector')
+
+
+def bench(filter_data, resources, rounds, mode):
+    registry = FilterRegistry('bench')
+    manager = Manager(resource_type='ec2')
+    elapsed = 0
+    compilable = mode != 'interpreted' and ValueFilter.is_compilable or (lambda self: False)
+    vector_min_size = mode == 'vector' and 1 or len(resources) + 1
+    for _ in range(rounds):
+        filters = registry.parse(filter_data, manager)
+        batch = copy.deepcopy(resources)
+        with mock.patch.object(ValueFilter, 'is_compilable', compilable), \
+                mock.patch.object(ValueFilter, 'vector_min_size', vector_min_size):
+            t = time.perf_counter()
+            for f in filters:
+                batch = f.process(batch)
+            elapsed += time.perf_counter() - t
+    return elapsed / rounds, len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000, help="Resource population")
+    parser.add_argument('--rounds', type=int, default=3, help="Evaluations per filter")
+    parser.add_argument('--filter', action='append', default=[], choices=sorted(FILTERS),
+                        help="Filters to compare (default all)")
+    args = parser.parse_args()
+
+    resources = get_resources(args.count)
+    modes = [m for m in MODES if m != 'vector' or core.numpy is not None]
+    print("%-8s %8s" % ('filter', 'matched') + "".join(
+        " %12s" % m for m in modes) + "   (us per resource)")
+    for name in args.filter or FILTERS:
+        results = [bench(FILTERS[name], resources, args.rounds, m) for m in modes]
+        assert len({matched for _, matched in results}) == 1
+        print("%-8s %8d" % (name, results[0][1]) + "".join(
+            " %12.3f" % (elapsed * 1e6 / args.count) for elapsed, _ in results))
+
+
+if __name__ == '__main__':
+    main()
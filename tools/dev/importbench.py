@@ -0,0 +1,83 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Measure custodian import time for a policy file, via python -X importtime.
+
+Each round loads the policies in a fresh interpreter, as the cli does
+before running them, and reports the elapsed time, the custodian
+modules imported, and the cumulative import time of the slowest
+modules. Resource modules imported via importlib are not reported
+by importtime, but are included in the elapsed time. With a budget,
+exits non zero if the median elapsed time exceeds it, for use as a
+regression check.
+
+  python tools/dev/importbench.py policy.yml --budget 1500
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+SCRIPT = """
+import time
+t = time.perf_counter()
+
+import json, sys
+from c7n.config import Config
+from c7n.loader import PolicyLoader
+from c7n.utils import load_file
+
+loader = PolicyLoader(Config.empty())
+loader.load_data(load_file(sys.argv[1]), sys.argv[1], validate=%s)
+print(json.dumps({
+    'elapsed': (time.perf_counter() - t) * 1000,
+    'modules': sorted(m for m in sys.modules if m.startswith('c7n'))}))
+"""
+
+
+def measure(policy_path, validate):
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', SCRIPT % validate, policy_path],
+        capture_output=True, text=True, check=True)
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+
+    # import time: self [us] | cumulative | imported package
+    timings = {}
+    for line in output.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        timings[name.strip()] = int(cumulative) / 1000.0
+    return result['elapsed'], result['modules'], timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('policy', help="Policy file to load")
+    parser.add_argument('--rounds', type=int, default=3, help="Interpreters to measure")
+    parser.add_argument('--top', type=int, default=15, help="Slowest modules to report")
+    parser.add_argument('--validate', action='store_true', help="Schema validate policies")
+    parser.add_argument('--budget', type=float, help="Maximum total import time (ms)")
+    args = parser.parse_args()
+
+    results = [measure(args.policy, args.validate) for _ in range(args.rounds)]
+    total = statistics.median(t for t, _, _ in results)
+    _, modules, timings = results[-1]
+
+    print("%-50s %10s" % ('module', 'cumulative (ms)'))
+    for name, elapsed in sorted(timings.items(), key=lambda i: -i[1])[:args.top]:
+        print("%-50s %10.1f" % (name, elapsed))
+    print("\n%d c7n modules, resources: %s" % (
+        len(modules), ', '.join(
+            n.rsplit('.', 1)[-1] for n in modules if n.startswith('c7n.resources.'))))
+    print("elapsed (median of %d): %0.1f ms" % (args.rounds, total))
+
+    if args.budget and total > args.budget:
+        print("import time budget of %0.1f ms exceeded" % args.budget)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
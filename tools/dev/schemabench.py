@@ -0,0 +1,106 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""
+Compare policy schema validation against the whole schema and per resource type.
+
+The corpus is the example policies from the docstrings of every filter
+and action of the loaded providers, as exercised by the test suite's
+doc example tests, plus any policy files given. Each policy is
+validated as is, and with an invalid filter to measure the cost of
+finding a relevant error.
+
+  python tools/dev/schemabench.py --provider aws --limit 100
+"""
+import argparse
+import itertools
+import json
+import time
+
+from c7n import schema
+from c7n.provider import clouds
+from c7n.resources import load_resources
+from c7n.schema import ElementSchema
+from c7n.utils import load_file, yaml_load
+
+
+def get_corpus(provider_names, paths):
+    policies = []
+    for pname in provider_names:
+        for rtype in clouds[pname].resources.values():
+            elements = itertools.chain(
+                rtype.filter_registry.values(), rtype.action_registry.values())
+            for element in elements:
+                doc = ElementSchema.doc(element) or ''
+                for item in itertools.chain.from_iterable(
+                        b.split('\n\n') for b in doc.split('yaml')):
+                    if 'resource:' not in item:
+                        continue
+                    if 'policies:\n' not in item:
+                        item = 'policies:\n' + item
+                    try:
+                        policies.extend(yaml_load(item).get('policies', ()))
+                    except Exception:
+                        continue
+    for path in paths:
+        policies.extend(load_file(path).get('policies', ()))
+
+    corpus = {}
+    for p in policies:
+        if isinstance(p, dict) and isinstance(p.get('resource'), str):
+            corpus.setdefault(json.dumps(p, sort_keys=True, default=str), p)
+    return list(corpus.values())
+
+
+def invalidate(policy):
+    return dict(policy, filters=list(policy.get('filters', ())) + [
+        {'type': 'value', 'key': 'Id', 'op': 'schemabench'}])
+
+
+def whole(data):
+    return list(schema.get_validator().iter_errors(data))
+
+
+def dispatched(data):
+    return list(schema.iter_errors(data))
+
+
+def bench(method, policies, rounds):
+    elapsed = 0
+    for _ in range(rounds):
+        t = time.perf_counter()
+        errors = method({'policies': policies})
+        for e in errors:
+            schema.specific_error(e)
+        elapsed += time.perf_counter() - t
+    return elapsed / rounds, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--provider', action='append', default=[],
+                        help="Providers to load (default aws)")
+    parser.add_argument('--rounds', type=int, default=1, help="Validations of the corpus")
+    parser.add_argument('--limit', type=int, default=50, help="Policies to validate")
+    parser.add_argument('policies', nargs='*', help="Additional policy files")
+    args = parser.parse_args()
+
+    providers = args.provider or ['aws']
+    load_resources(["%s.*" % p for p in providers])
+    policies = get_corpus(providers, args.policies)[:args.limit]
+
+    # compile validators outside of the measurement
+    for method in (whole, dispatched):
+        bench(method, policies, 1)
+
+    print("%d policies" % len(policies))
+    print("%-10s %-10s %8s %12s" % ('policies', 'schema', 'errors', 'ms/policy'))
+    for label, corpus in (('valid', policies),
+                          ('invalid', [invalidate(p) for p in policies])):
+        for method in (whole, dispatched):
+            elapsed, errors = bench(method, corpus, args.rounds)
+            print("%-10s %-10s %8d %12.2f" % (
+                label, method.__name__, errors, elapsed * 1000 / len(policies)))
+
+
+if __name__ == '__main__':
+    main()